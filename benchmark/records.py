@@ -0,0 +1,197 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+'''Measure memory held by application records against dictionaries.
+
+Records are built for a number of configurations, each loaded from JSON
+with its own copy of the same integrations as configuration files are, and
+a number of installed versions of each. They are built twice: once as
+applications were discovered originally, as a dictionary holding a
+:class:`LooseVersion` each, and once with
+:meth:`ftrack_application_launcher.ApplicationStore._create_application`.
+Memory allocated for the records is traced with :mod:`tracemalloc`.
+
+Exit with status 1 if records take more memory than the dictionaries. Run
+from the repository root with the package importable, e.g.::
+
+    PYTHONPATH=source python benchmark/records.py
+
+'''
+
+import sys
+import json
+import types
+import argparse
+import warnings
+import tracemalloc
+
+from ftrack_application_launcher import ApplicationStore
+from ftrack_application_launcher.version import Version
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        from distutils.version import LooseVersion
+except ImportError:
+    # Removed from the standard library in Python 3.12.
+    try:
+        from setuptools._distutils.version import LooseVersion
+    except ImportError:
+        LooseVersion = None
+
+
+#: Server URL icon URLs are built from.
+SERVER_URL = 'https://studio.ftrackapp.com'
+
+#: Integrations requested by each configuration.
+INTEGRATIONS = {
+    'pipeline': [
+        'ftrack-connect-pipeline-definition',
+        'ftrack-connect-pipeline',
+        'ftrack-connect-pipeline-qt',
+        'ftrack-connect-pipeline-nuke',
+    ]
+}
+
+
+def load_configurations(count):
+    '''Return *count* configurations as loaded from JSON files.'''
+    return [
+        json.loads(
+            json.dumps(
+                {
+                    'label': 'Nuke',
+                    'icon': 'nuke',
+                    'variant': '{version}',
+                    'applicationIdentifier': 'nuke{}_{{variant}}'.format(
+                        index
+                    ),
+                    'integrations': INTEGRATIONS,
+                }
+            )
+        )
+        for index in range(count)
+    ]
+
+
+def get_versions(count):
+    '''Return *count* distinct version strings.'''
+    return [
+        '{}.{}v{}'.format(10 + index // 50, (index // 10) % 5, index % 10)
+        for index in range(count)
+    ]
+
+
+def create_baseline(configuration, path, version):
+    '''Return application dictionary as originally built.'''
+    version = LooseVersion(version)
+
+    variant = configuration['variant'].format(version=str(version))
+    variant = '{} [{}]'.format(
+        variant, ':'.join(list(configuration['integrations'].keys()))
+    )
+
+    return {
+        'identifier': configuration['applicationIdentifier'].format(
+            variant=variant
+        ),
+        'path': path,
+        'launchArguments': None,
+        'version': version,
+        'label': configuration['label'].format(version=str(version)),
+        'icon': '{}/application_icons/{}.png'.format(
+            SERVER_URL, configuration['icon']
+        ),
+        'variant': variant,
+        'description': None,
+        'integrations': configuration['integrations'],
+    }
+
+
+def build(configurations, versions, create):
+    '''Return records built with *create* for *configurations*.'''
+    records = []
+
+    for index, configuration in enumerate(configurations):
+        for version in versions:
+            path = '/opt/Nuke{0}/Nuke{1}'.format(version, index)
+            records.append(create(configuration, path, version))
+
+    return records
+
+
+def measure(configurations, versions, create):
+    '''Return number of bytes allocated by records built with *create*.'''
+    tracemalloc.start()
+    try:
+        records = build(configurations, versions, create)
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del records
+    return size
+
+
+def main(arguments=None):
+    '''Run benchmark with command line *arguments*.'''
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--configurations', type=int, default=20)
+    parser.add_argument('--versions', type=int, default=500)
+    namespace = parser.parse_args(arguments)
+
+    if LooseVersion is None:
+        print('LooseVersion is not available, skipping benchmark.')
+        return 0
+
+    # LooseVersion warns on each instantiation.
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    store = ApplicationStore(
+        types.SimpleNamespace(server_url=SERVER_URL), loader=lambda: None
+    )
+
+    # Executables of the same install share their version.
+    parsed = {}
+
+    def create_record(configuration, path, version):
+        '''Return application record built by *store*.'''
+        if version not in parsed:
+            parsed[version] = Version(version)
+
+        return store._create_application(
+            path,
+            configuration['label'],
+            configuration['applicationIdentifier'],
+            parsed[version],
+            icon=configuration['icon'],
+            variant=configuration['variant'],
+            integrations=configuration['integrations'],
+        )
+
+    versions = get_versions(namespace.versions)
+
+    sizes = []
+    for name, create in (
+        ('dictionary', create_baseline),
+        ('record', create_record),
+    ):
+        # Configurations are loaded again for each run as integrations are
+        # shared between runs once built into records.
+        configurations = load_configurations(namespace.configurations)
+        sizes.append((name, measure(configurations, versions, create)))
+
+    count = namespace.configurations * namespace.versions
+    print('{} applications:'.format(count))
+    for name, size in sizes:
+        print(
+            '  {:10} {:8.2f} MiB {:6.0f} bytes each'.format(
+                name, size / 2.0**20, size / float(count)
+            )
+        )
+
+    return int(sizes[1][1] > sizes[0][1])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
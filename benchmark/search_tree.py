@@ -0,0 +1,175 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+'''Time filesystem discovery against the original os.walk search.
+
+A synthetic tree of vendor directories is built in a temporary directory
+and searched with the expressions of :data:`EXPRESSIONS`, once with
+:func:`walk_baseline`, the os.walk search applications were discovered with
+originally, and once with
+:func:`ftrack_application_launcher.search.find_executables`. Both must find
+the same executables.
+
+Exit with status 1 if the search is slower than the baseline by more than
+the given tolerance, as timings of small trees are noisy. Run from the
+repository root with the package importable, e.g.::
+
+    PYTHONPATH=source python benchmark/search_tree.py
+
+'''
+
+import os
+import re
+import sys
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+
+from ftrack_application_launcher.search import find_executables
+
+
+#: Expressions searched, relative to the root of the synthetic tree.
+EXPRESSIONS = [
+    ['Program Files.*', 'Autodesk', 'Maya.+', 'bin', 'maya.exe'],
+    ['Program Files.*', 'Vendor.*', 'App', 'lib0.dll'],
+]
+
+
+def build_tree(root, vendors=2000):
+    '''Build synthetic tree of *vendors* directories below *root*.'''
+    program_files = os.path.join(root, 'Program Files')
+
+    for index in range(vendors):
+        vendor = os.path.join(program_files, 'Vendor{:04d}'.format(index))
+        application = os.path.join(vendor, 'App')
+        os.makedirs(application)
+
+        for position in range(5):
+            open(
+                os.path.join(application, 'lib{}.dll'.format(position)), 'w'
+            ).close()
+            open(
+                os.path.join(vendor, 'f{}.txt'.format(position)), 'w'
+            ).close()
+
+    for version in range(2015, 2025):
+        directory = os.path.join(
+            program_files, 'Autodesk', 'Maya{}'.format(version), 'bin'
+        )
+        os.makedirs(directory)
+        open(os.path.join(directory, 'maya.exe'), 'w').close()
+
+        for position in range(200):
+            open(
+                os.path.join(directory, 'plugin{}.dll'.format(position)), 'w'
+            ).close()
+
+
+def walk_baseline(expression):
+    '''Return paths matching *expression* found with :func:`os.walk`.
+
+    This is the original search, levels being counted from the root of
+    *expression* rather than from the filesystem root.
+
+    '''
+    pieces = list(expression)
+    start = pieces.pop(0)
+
+    expressions = list(map(re.compile, pieces))
+    depth = start.rstrip(os.path.sep).count(os.path.sep)
+
+    paths = []
+    for location, folders, files in os.walk(
+        start, topdown=True, followlinks=True
+    ):
+        level = location.rstrip(os.path.sep).count(os.path.sep) - depth
+        expression = expressions[level]
+
+        if level < (len(expressions) - 1):
+            folders[:] = [
+                folder for folder in folders if expression.match(folder)
+            ]
+        else:
+            for entry in folders + files:
+                if expression.match(entry):
+                    paths.append(os.path.join(location, entry))
+
+    return sorted(paths)
+
+
+def measure(function, repeat):
+    '''Return best time in seconds of *repeat* calls to *function*.'''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+
+        if best is None or duration < best:
+            best = duration
+
+    return best
+
+
+def main(arguments=None):
+    '''Run benchmark with command line *arguments*.'''
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--vendors', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    namespace = parser.parse_args(arguments)
+
+    logging.disable(logging.CRITICAL)
+    current_os = platform.system().lower()
+
+    root = tempfile.mkdtemp(prefix='ftrack-application-launcher-benchmark-')
+    try:
+        build_tree(root, namespace.vendors)
+        expressions = [[root] + expression for expression in EXPRESSIONS]
+
+        baseline = [walk_baseline(expression) for expression in expressions]
+        found = [
+            sorted(paths)
+            for paths in find_executables(
+                expressions, current_os, max_workers=namespace.workers
+            )
+        ]
+        if found != baseline:
+            print('Search results differ from the baseline.')
+            return 1
+
+        baseline_time = measure(
+            lambda: [walk_baseline(expression) for expression in expressions],
+            namespace.repeat,
+        )
+        search_time = measure(
+            lambda: find_executables(
+                expressions, current_os, max_workers=namespace.workers
+            ),
+            namespace.repeat,
+        )
+
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(
+        'Found {} executables, best of {}:'.format(
+            sum(len(paths) for paths in found), namespace.repeat
+        )
+    )
+    print('  os.walk baseline  {:8.1f} ms'.format(baseline_time * 1e3))
+    print(
+        '  search tree       {:8.1f} ms ({} workers)'.format(
+            search_time * 1e3, namespace.workers
+        )
+    )
+
+    return int(search_time > baseline_time * (1 + namespace.tolerance))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
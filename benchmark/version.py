@@ -0,0 +1,189 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+'''Time version parsing and sorting against LooseVersion.
+
+Paths of synthetic installs are generated for a number of candidates and
+their versions extracted, parsed and sorted twice: once as applications were
+discovered originally, searching the default version expression over the
+whole path and building a :class:`LooseVersion` for each of them, and
+once as
+:meth:`ftrack_application_launcher.ApplicationStore._create_applications`
+does with :class:`ftrack_application_launcher.version.Version`. Both must
+sort the candidates in the same order.
+
+Exit with status 1 if parsing and sorting is slower than the baseline. Run
+from the repository root with the package importable, e.g.::
+
+    PYTHONPATH=source python benchmark/version.py
+
+'''
+
+import sys
+import time
+import random
+import argparse
+import warnings
+
+from ftrack_application_launcher import DEFAULT_VERSION_EXPRESSION
+from ftrack_application_launcher.search import get_version_offset
+from ftrack_application_launcher.version import Version
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        from distutils.version import LooseVersion
+except ImportError:
+    # Removed from the standard library in Python 3.12.
+    try:
+        from setuptools._distutils.version import LooseVersion
+    except ImportError:
+        LooseVersion = None
+
+
+#: Search expression the synthetic paths match.
+EXPRESSION = ['/', 'opt', 'Foundry', 'Nuke.+', 'Nuke.+']
+
+
+def generate_versions(count, seed=0):
+    '''Return *count* random version strings LooseVersion can compare.'''
+    generator = random.Random(seed)
+    versions = []
+
+    for _ in range(count):
+        kind = generator.random()
+        if kind < 0.5:
+            version = '{}.{}v{}'.format(
+                generator.randint(10, 15),
+                generator.randint(0, 5),
+                generator.randint(1, 9),
+            )
+        elif kind < 0.8:
+            version = str(generator.randint(2015, 2025))
+        else:
+            version = '{}.{}.{}'.format(
+                generator.randint(4, 5),
+                generator.randint(0, 3),
+                generator.randint(0, 20),
+            )
+
+        versions.append(version)
+
+    return versions
+
+
+def sort_baseline(paths):
+    '''Return versions of *paths* sorted as originally, newest first.'''
+    versions = []
+    for path in paths:
+        match = DEFAULT_VERSION_EXPRESSION.search(path)
+        versions.append(LooseVersion(match.group('version')))
+
+    return sorted(versions, reverse=True)
+
+
+def sort_versions(paths):
+    '''Return versions of *paths* sorted with Version, newest first.'''
+    offset = get_version_offset(EXPRESSION, 'linux')
+
+    parsed = {}
+    versions = []
+    for path in paths:
+        version = DEFAULT_VERSION_EXPRESSION.search(path, offset).group(
+            'version'
+        )
+        if version not in parsed:
+            parsed[version] = Version(version)
+
+        versions.append(parsed[version])
+
+    return sorted(versions, key=lambda version: version.key, reverse=True)
+
+
+def measure(function, repeat):
+    '''Return best time in seconds of *repeat* calls to *function*.'''
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+
+        if best is None or duration < best:
+            best = duration
+
+    return best
+
+
+def main(arguments=None):
+    '''Run benchmark with command line *arguments*.'''
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--count', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=10)
+    namespace = parser.parse_args(arguments)
+
+    if LooseVersion is None:
+        print('LooseVersion is not available, skipping benchmark.')
+        return 0
+
+    # LooseVersion warns on each instantiation.
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    paths = [
+        '/opt/Foundry/Nuke{0}/Nuke{0}'.format(version)
+        for version in generate_versions(namespace.count)
+    ]
+
+    expected = [str(version) for version in sort_baseline(paths)]
+    found = [str(version) for version in sort_versions(paths)]
+    if found != expected:
+        print('Versions are not sorted as with LooseVersion.')
+        return 1
+
+    versions = list(set(expected))
+    loose_versions = [LooseVersion(version) for version in versions]
+    parsed_versions = [Version(version) for version in versions]
+
+    timings = [
+        (
+            'parse',
+            measure(
+                lambda: list(map(LooseVersion, versions)), namespace.repeat
+            ),
+            measure(lambda: list(map(Version, versions)), namespace.repeat),
+        ),
+        (
+            'sort',
+            measure(lambda: sorted(loose_versions), namespace.repeat),
+            measure(
+                lambda: sorted(
+                    parsed_versions, key=lambda version: version.key
+                ),
+                namespace.repeat,
+            ),
+        ),
+        (
+            'paths',
+            measure(lambda: sort_baseline(paths), namespace.repeat),
+            measure(lambda: sort_versions(paths), namespace.repeat),
+        ),
+    ]
+
+    print(
+        '{} paths, {} distinct versions, best of {}:'.format(
+            len(paths), len(versions), namespace.repeat
+        )
+    )
+    print('  {:10} {:>12} {:>12}'.format('', 'LooseVersion', 'Version'))
+    for name, baseline_time, version_time in timings:
+        print(
+            '  {:10} {:9.2f} ms {:9.2f} ms'.format(
+                name, baseline_time * 1e3, version_time * 1e3
+            )
+        )
+
+    _, baseline_time, version_time = timings[-1]
+    return int(version_time > baseline_time)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,11 +10,56 @@ import ftrack_api
 from ftrack_application_launcher.discover_applications import (
     DiscoverApplications,
 )
+from ftrack_application_launcher.context import (
+    DELIVERIES,
+    remove_expired_contexts,
+)
 from ftrack_application_launcher._version import __version__
 
 logging.basicConfig(level=logging.INFO)
 
 
+def get_number(variable, convert, default=None):
+    '''Return environment *variable* converted with *convert*.
+
+    Return *default* if *variable* is not set, or if its value can not be
+    converted, in which case a warning is logged.
+
+    '''
+    value = os.environ.get(variable)
+    if not value:
+        return default
+
+    try:
+        return convert(value)
+    except ValueError:
+        logging.warning(
+            'Ignoring invalid value {!r} of {}, using {}.'.format(
+                value, variable, default
+            )
+        )
+        return default
+
+
+def get_interval(variable):
+    '''Return number of seconds set in environment *variable*.
+
+    Return None if *variable* is not set, or if its value is not a positive
+    number, in which case a warning is logged.
+
+    '''
+    value = get_number(variable, float)
+    if value is not None and not value > 0:
+        logging.warning(
+            'Ignoring invalid value {!r} of {}, using {}.'.format(
+                value, variable, None
+            )
+        )
+        return None
+
+    return value
+
+
 def register(api_object, **kw):
     '''Register hooks.'''
     # Validate that registry is the event handler registry. If not,
@@ -36,6 +81,84 @@ def register(api_object, **kw):
             __version__, config_paths
         )
     )
+    # Optional location of the discovery cache, use the default one if unset.
+    cache_path = os.environ.get('FTRACK_APPLICATION_LAUNCHER_CACHE_PATH')
+
+    # Optional number of threads used to discover applications.
+    max_workers = get_number(
+        'FTRACK_APPLICATION_LAUNCHER_DISCOVERY_WORKERS', int
+    )
+
+    # Optionally watch application folders to pick up new installs.
+    watch = os.environ.get('FTRACK_APPLICATION_LAUNCHER_WATCH', '')
+    watch = watch.lower() in ('1', 'true')
+
+    # Optionally defer discovery so registering does not wait for it.
+    lazy = os.environ.get('FTRACK_APPLICATION_LAUNCHER_LAZY', '')
+    lazy = lazy.lower() in ('1', 'true')
+
+    # Optional number of seconds allowed to search below each root folder
+    # and for each configuration, so broken mounts can not stall discovery.
+    budgets = {}
+    for key, variable in (
+        ('root_budget', 'FTRACK_APPLICATION_LAUNCHER_ROOT_BUDGET'),
+        ('config_budget', 'FTRACK_APPLICATION_LAUNCHER_CONFIG_BUDGET'),
+    ):
+        value = get_number(variable, float)
+        if value is not None:
+            budgets[key] = value
+
+    # Optional number of seconds between background refreshes of the
+    # applications, so long running sessions pick up new installs.
+    refresh_interval = get_interval(
+        'FTRACK_APPLICATION_LAUNCHER_REFRESH_INTERVAL'
+    )
+
+    # Optional number of seconds between checks of the configuration files,
+    # so changed configurations are reloaded without restarting.
+    reload_interval = get_interval(
+        'FTRACK_APPLICATION_LAUNCHER_RELOAD_INTERVAL'
+    )
+
+    # Optional number of seconds discovered integrations are cached for.
+    options = {}
+    integrations_ttl = get_number(
+        'FTRACK_APPLICATION_LAUNCHER_INTEGRATIONS_TTL', float
+    )
+    if integrations_ttl is not None:
+        options['integrations_ttl'] = integrations_ttl
+
+    # Optionally pass the launch context in a file rather than in the
+    # environment of launched applications.
+    context_delivery = os.environ.get(
+        'FTRACK_APPLICATION_LAUNCHER_CONTEXT_DELIVERY'
+    )
+    if context_delivery in DELIVERIES:
+        options['context_delivery'] = context_delivery
+    elif context_delivery:
+        logging.warning(
+            'Ignoring invalid value {!r} of {}, should be one of {}.'.format(
+                context_delivery,
+                'FTRACK_APPLICATION_LAUNCHER_CONTEXT_DELIVERY',
+                DELIVERIES,
+            )
+        )
+
+    # Remove launch context files written by previous sessions which no
+    # running application should still read.
+    remove_expired_contexts()
+
     # Create store containing applications.
-    applications = DiscoverApplications(api_object, config_paths)
+    applications = DiscoverApplications(
+        api_object,
+        config_paths,
+        cache_path=cache_path,
+        max_workers=max_workers,
+        watch=watch,
+        lazy=lazy,
+        refresh_interval=refresh_interval,
+        reload_interval=reload_interval,
+        **budgets,
+        **options,
+    )
     applications.register()
@@ -123,16 +123,14 @@ class LaunchAdobeAction(ftrack_application_launcher.ApplicationLaunchAction):
         # to an asset version in ftrack connect.
         if entities:
             entity_type, entity_id = entities[0]
-            resolved_entity = self.session.get(entity_type, entity_id)
-
-            if selection and resolved_entity.entity_type == 'AssetVersion':
-                entityId = resolved_entity.get('task_id')
-
-                if not entityId:
-                    asset = resolved_entity['asset']
-                    entity = asset['parent']
+            resolved_entity = self.entity_resolver.resolve(
+                entity_type, entity_id
+            )
 
-                    entityId = entity['id']
+            if selection and resolved_entity['entity_type'] == 'AssetVersion':
+                entityId = (
+                    resolved_entity['task_id'] or resolved_entity['parent_id']
+                )
 
                 context['selection'] = [
                     {'entityId': entityId, 'entityType': 'task'}
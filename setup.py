@@ -102,7 +102,7 @@ setup(
     packages=find_packages(SOURCE_PATH),
     package_dir={'': 'source'},
     setup_requires=['setuptools>=45.0.0', 'setuptools_scm'],
-    tests_require=['pytest >= 2.3.5, < 3'],
+    tests_require=['pytest >= 3.9'],
     use_scm_version={
         'write_to': 'source/ftrack_application_launcher/_version.py',
         'write_to_template': version_template,
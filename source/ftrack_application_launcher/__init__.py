@@ -6,21 +6,55 @@ import pprint
 import re
 import os
 import ssl
+import time
+import weakref
 
 import subprocess
 import collections
-import base64
+import collections.abc
 import getpass
 import json
 import logging
 import platform
-from operator import itemgetter
-from distutils.version import LooseVersion
 
 import ftrack_api
 from ftrack_action_handler.action import BaseAction
+from ftrack_application_launcher.application import (
+    Application,
+    get_integration_key,
+)
+from ftrack_application_launcher.cache import ExpiringCache
 from ftrack_application_launcher.configure_logging import configure_logging
+from ftrack_application_launcher.context import (
+    CONTEXT_PATH_VARIABLE,
+    CONTEXT_VARIABLE,
+    DELIVERIES,
+    DELIVERY_ENVIRONMENT,
+    DELIVERY_FILE,
+    encode_context,
+    write_context,
+)
+from ftrack_application_launcher.dispatch import get_action_dispatcher
+from ftrack_application_launcher.entity import get_entity_resolver
+from ftrack_application_launcher.environment import (
+    EnvironmentPlan,
+    PathList,
+    check_environment,
+    compile_operations,
+)
+from ftrack_application_launcher.index import ApplicationIndex
+from ftrack_application_launcher.metrics import LaunchTimings
+from ftrack_application_launcher.search import (
+    DEFAULT_ROOT_BUDGET,
+    find_executables,
+    get_version_offset,
+)
+from ftrack_application_launcher.refresh import (
+    DEFAULT_REFRESH_INTERVAL,
+    PeriodicRefresh,
+)
 from ftrack_application_launcher.usage import send_event
+from ftrack_application_launcher.version import Version
 
 configure_logging(__name__)
 
@@ -31,6 +65,23 @@ configure_logging(__name__)
 #: E.g. /path/to/x86/some/application/folder/v1.8v2b1/app.exe -> 1.8v2b1
 DEFAULT_VERSION_EXPRESSION = re.compile(r'(?P<version>\d[\d.vabc]*?)[^\d]*$')
 
+# Anchors of version expressions to the start of paths, outside of character
+# sets. Anchored expressions can not be applied from a version offset.
+_START_ANCHOR_EXPRESSION = re.compile(r'(?<![\[\\])\^|\\A')
+
+#: Default number of seconds discovered integrations are cached for.
+DEFAULT_INTEGRATIONS_TTL = 600.0
+
+#: Maximum number of environment plans cached by a launcher.
+ENVIRONMENT_PLANS_SIZE = 256
+
+#: Topic published to discover integrations of several applications at once.
+DISCOVER_BATCH_TOPIC = 'ftrack.connect.application.discover-batch'
+
+# Whether :data:`DISCOVER_BATCH_TOPIC` was answered, keyed on session, so it
+# is not published again to sessions without integrations supporting it.
+_batch_answered = weakref.WeakKeyDictionary()
+
 AVAILABLE_ICONS = {
     'hiero': '/application_icons/hiero.png',
     'hieroplayer': '/application_icons/hieroplayer.png',
@@ -56,21 +107,29 @@ AVAILABLE_ICONS = {
 
 
 def prepend_path(path, key, environment):
-    '''Prepend *path* to *key* in *environment*.'''
-    try:
-        environment[key] = os.pathsep.join([path, environment[key]])
-    except KeyError:
-        environment[key] = path
+    '''Prepend *path* to *key* in *environment*.
+
+    Entries of *key* are listed once each, *path* being moved to the front
+    if listed already, see :class:`PathList`.
+
+    '''
+    path_list = PathList(environment.get(key))
+    path_list.prepend(path)
+    environment[key] = str(path_list)
 
     return environment
 
 
 def append_path(path, key, environment):
-    '''Append *path* to *key* in *environment*.'''
-    try:
-        environment[key] = os.pathsep.join([environment[key], path])
-    except KeyError:
-        environment[key] = path
+    '''Append *path* to *key* in *environment*.
+
+    Entries of *key* are listed once each, *path* keeping its position if
+    listed already, see :class:`PathList`.
+
+    '''
+    path_list = PathList(environment.get(key))
+    path_list.append(path)
+    environment[key] = str(path_list)
 
     return environment
 
@@ -79,13 +138,42 @@ def pop_path(path, key, environment):
     '''Remove *path* to *key* in *environment*.'''
     env_paths = environment.get(key)
     if env_paths:
-        environment[key] = os.pathsep.join(
-            [
-                existing_path
-                for existing_path in env_paths.split(os.pathsep)
-                if existing_path.replace('\\', '/') != path.replace('\\', '/')
-            ]
-        )
+        path_list = PathList(env_paths)
+        path_list.remove(path)
+        environment[key] = str(path_list)
+
+
+def merge_integrations(integrations_lists):
+    '''Return integrations of *integrations_lists* listed once each.
+
+    Integrations are compared by content, in the order first found.
+
+    '''
+    merged = []
+    keys = set()
+
+    for integrations in integrations_lists:
+        for integration in integrations:
+            key = get_integration_key(integration)
+            if key not in keys:
+                keys.add(key)
+                merged.append(integration)
+
+    return merged
+
+
+def get_requirements(integrations):
+    '''Return requirements table of application *integrations*.
+
+    *integrations* should map integration group names to the names of the
+    integrations they require. Return pairs of group name and set of
+    required names.
+
+    '''
+    return tuple(
+        (group, frozenset(names))
+        for group, names in (integrations or {}).items()
+    )
 
 
 class ApplicationStore(object):
@@ -100,18 +188,117 @@ class ApplicationStore(object):
         '''Return current session.'''
         return self._session
 
-    def __init__(self, session):
-        '''Instantiate store and discover applications.'''
+    @property
+    def applications(self):
+        '''Return applications, loading them on first access.
+
+        Applications are returned as an immutable snapshot. Callers should
+        read it once and work on the returned tuple so a concurrent
+        :meth:`refresh` can not change it under them.
+
+        '''
+        return self.index.applications
+
+    @applications.setter
+    def applications(self, applications):
+        '''Replace applications with a snapshot of *applications*.
+
+        Lookup indexes are rebuilt with the snapshot and swapped at once.
+
+        '''
+        self._index = ApplicationIndex(applications)
+
+    @property
+    def index(self):
+        '''Return index of the applications, loading them on first access.
+
+        The index is an immutable
+        :class:`~ftrack_application_launcher.index.ApplicationIndex` holding
+        the same snapshot as :attr:`applications`.
+
+        '''
+        loader = self._loader
+        if loader is not None:
+            loader()
+            self._loader = None
+
+        return self._index
+
+    @property
+    def catalog_version(self):
+        '''Return number changed each time applications are replaced.
+
+        Callers can cache what they derive from :attr:`applications` and
+        compare this number to know when to derive it again.
+
+        '''
+        return self.index.version
+
+    def __init__(
+        self, session, discovery_cache=None, loader=None, refresher=None
+    ):
+        '''Instantiate store and discover applications.
+
+        *discovery_cache* may be an instance of
+        :class:`~ftrack_application_launcher.cache.DiscoveryCache` used to
+        reuse filesystem search results from previous sessions.
+
+        *loader* may be a callable filling the store, in which case discovery
+        is deferred until :attr:`applications` is first accessed. The
+        callable is expected to set :attr:`applications` and to be safe to
+        call from several threads.
+
+        *refresher* may be a callable filling the store again, used by
+        :meth:`refresh` instead of :meth:`_discover_applications`.
+
+        '''
         super(ApplicationStore, self).__init__()
         self.logger = logging.getLogger(
             __name__ + '.' + self.__class__.__name__
         )
 
         self._session = session
+        self._discovery_cache = discovery_cache
+        self._index = ApplicationIndex()
+        self._loader = loader
+        self._refresher = refresher
+        self._periodic_refresh = None
+
+        if loader is None:
+            # Discover applications and store.
+            self.applications = self._discover_applications()
+
+    def refresh(self):
+        '''Discover applications again and swap them in once complete.
+
+        Applications are rebuilt aside, readers keep using the previous
+        snapshot until the new one is published. The discovery cache is
+        reused so only changed directories are listed again.
+
+        '''
+        if self._refresher is not None:
+            self._refresher()
+            return
 
-        # Discover applications and store.
         self.applications = self._discover_applications()
 
+        if self._discovery_cache is not None:
+            self._discovery_cache.save()
+
+    def start_refresh(self, interval=DEFAULT_REFRESH_INTERVAL):
+        '''Call :meth:`refresh` every *interval* seconds in the background.'''
+        if self._periodic_refresh is None:
+            self._periodic_refresh = PeriodicRefresh(
+                self.refresh, interval=interval
+            )
+            self._periodic_refresh.start()
+
+    def stop_refresh(self):
+        '''Stop refreshing applications in the background.'''
+        if self._periodic_refresh is not None:
+            self._periodic_refresh.stop()
+            self._periodic_refresh = None
+
     def get_application(self, identifier):
         '''Return first application with matching *identifier*.
 
@@ -121,17 +308,41 @@ class ApplicationStore(object):
         Return None if no application matches.
 
         '''
-        hasWildcard = identifier[-1] == '*'
-        if hasWildcard:
-            identifier = identifier[:-1]
+        return self.index.get(identifier)
 
-        for application in self.applications:
-            if hasWildcard:
-                if application['identifier'].startswith(identifier):
-                    return application
-            else:
-                if application['identifier'] == identifier:
-                    return application
+    def find_applications(
+        self,
+        label=None,
+        variant=None,
+        minimum_version=None,
+        maximum_version=None,
+    ):
+        '''Return applications matching *label* and *variant*, newest first.
+
+        Only applications from *minimum_version* included to
+        *maximum_version* excluded are returned if given, see
+        :meth:`~ftrack_application_launcher.index.ApplicationIndex.find`.
+
+        '''
+        return self.index.find(
+            label=label,
+            variant=variant,
+            minimum_version=minimum_version,
+            maximum_version=maximum_version,
+        )
+
+    def get_latest_application(self, label, minimum_version=None):
+        '''Return newest application for *label* or None.
+
+        If *minimum_version* is given, return None unless the newest
+        application is at least *minimum_version*.
+
+        '''
+        applications = self.find_applications(
+            label=label, minimum_version=minimum_version
+        )
+        if applications:
+            return applications[0]
 
         return None
 
@@ -223,97 +434,148 @@ class ApplicationStore(object):
         user.
         '''
 
-        applications = []
+        return self._create_applications(
+            self._find_executables(expression),
+            label,
+            applicationIdentifier,
+            versionExpression=versionExpression,
+            icon=icon,
+            launchArguments=launchArguments,
+            variant=variant,
+            description=description,
+            integrations=integrations,
+            expression=expression,
+        )
+
+    def _find_executables(self, expression):
+        '''Return list of executable paths on disk matching *expression*.
+
+        Results are served from the discovery cache when available and still
+        valid. The filesystem is walked in the calling thread as a single
+        expression gains little from concurrent directory listings, within
+        the default root time budget.
+
+        '''
+        return find_executables(
+            [expression],
+            self.current_os,
+            discovery_cache=self._discovery_cache,
+            max_workers=1,
+            root_budget=DEFAULT_ROOT_BUDGET,
+        )[0]
+
+    def _create_applications(
+        self,
+        paths,
+        label,
+        applicationIdentifier,
+        versionExpression=None,
+        icon=None,
+        launchArguments=None,
+        variant='',
+        description=None,
+        integrations=None,
+        expression=None,
+    ):
+        '''Return list of applications for executables at *paths*.
 
+        Arguments are documented in :meth:`_search_filesystem`, applications
+        are sorted by version with the latest first.
+
+        *expression* may be given as the search expression *paths* were found
+        with, the version expression is then only applied to the part of the
+        paths which can hold a version, unless it is anchored to their start.
+
+        '''
         if versionExpression is None:
             versionExpression = DEFAULT_VERSION_EXPRESSION
         else:
             versionExpression = re.compile(versionExpression)
 
-        pieces = expression[:]
-        start = pieces.pop(0)
+        offset = 0
+        if expression is not None and not _START_ANCHOR_EXPRESSION.search(
+            versionExpression.pattern
+        ):
+            offset = get_version_offset(expression, self.current_os)
 
-        if self.current_os == 'windows':
-            # On Windows C: means current directory so convert roots that look
-            # like drive letters to the C:\ format.
-            if start and start[-1] == ':':
-                start += '\\'
+        # Executables of the same install share their version, parse it once.
+        versions = {}
+        applications = []
 
-        if not os.path.exists(start):
-            raise ValueError(
-                'First part "{0}" of expression "{1}" must match exactly to an '
-                'existing entry on the filesystem.'.format(start, expression)
+        for path in paths:
+            # Extract version from matching path.
+            versionMatch = versionExpression.search(path, offset)
+            version = versionMatch and versionMatch.group('version')
+
+            if not version:
+                version = '0.0.0'
+
+            if version not in versions:
+                versions[version] = Version(version)
+
+            applications.append(
+                self._create_application(
+                    path,
+                    label,
+                    applicationIdentifier,
+                    versions[version],
+                    icon=icon,
+                    launchArguments=launchArguments,
+                    variant=variant,
+                    description=description,
+                    integrations=integrations,
+                )
             )
 
-        expressions = list(map(re.compile, pieces))
-        expressionsCount = len(expressions)
+        results = sorted(
+            applications,
+            key=lambda application: application['version'].key,
+            reverse=True,
+        )
+        self.logger.debug('Discovered applications {}'.format(results))
+        return results
+
+    def _create_application(
+        self,
+        path,
+        label,
+        applicationIdentifier,
+        version,
+        icon=None,
+        launchArguments=None,
+        variant='',
+        description=None,
+        integrations=None,
+    ):
+        '''Return application record for executable at *path*.
 
-        for location, folders, files in os.walk(
-            start, topdown=True, followlinks=True
-        ):
-            level = location.rstrip(os.path.sep).count(os.path.sep)
-            expression = expressions[level]
+        *version* should be the
+        :class:`~ftrack_application_launcher.version.Version` of the
+        application, other arguments are documented in
+        :meth:`_search_filesystem`. The record is an immutable
+        :class:`~ftrack_application_launcher.application.Application`
+        mapping.
 
-            if level < (expressionsCount - 1):
-                # If not yet at final piece then just prune directories.
-                folders[:] = [
-                    folder for folder in folders if expression.match(folder)
-                ]
-            else:
-                # Match executable. Note that on OSX executable might equate to
-                # a folder (.app).
-                for entry in folders + files:
-                    match = expression.match(entry)
-                    if match:
-                        # Extract version from full matching path.
-                        path = os.path.join(start, location, entry)
-
-                        versionMatch = versionExpression.search(path)
-                        loose_version = LooseVersion('0.0.0')
-
-                        if versionMatch:
-                            version = versionMatch.group('version')
-
-                            try:
-                                loose_version = LooseVersion(version)
-                            except AttributeError:
-                                self.logger.warning(
-                                    'Could not parse version'
-                                    ' {0} from {1}'.format(version, path)
-                                )
-
-                        variant_str = variant.format(
-                            version=str(loose_version)
-                        )
+        '''
+        variant_str = variant.format(version=str(version))
 
-                        if integrations:
-                            variant_str = "{} [{}]".format(
-                                variant_str,
-                                ':'.join(list(integrations.keys())),
-                            )
-
-                        application = {
-                            'identifier': applicationIdentifier.format(
-                                variant=str(variant_str)
-                            ),
-                            'path': path,
-                            'launchArguments': launchArguments,
-                            'version': loose_version,
-                            'label': label.format(version=str(loose_version)),
-                            'icon': self._get_icon_url(icon),
-                            'variant': variant_str,
-                            'description': description,
-                            'integrations': integrations or {},
-                        }
-
-                        applications.append(application)
-
-                # Don't descend any further as out of patterns to match.
-                del folders[:]
-
-        results = sorted(applications, key=itemgetter('version'), reverse=True)
-        self.logger.debug('Discovered applications {}'.format(results))
-        return results
+        if integrations:
+            variant_str = "{} [{}]".format(
+                variant_str,
+                ':'.join(list(integrations.keys())),
+            )
+
+        return Application(
+            identifier=applicationIdentifier.format(variant=str(variant_str)),
+            path=path,
+            launchArguments=launchArguments,
+            version=version,
+            label=label.format(version=str(version)),
+            icon=self._get_icon_url(icon),
+            variant=variant_str,
+            description=description,
+            integrations=integrations,
+        )
 
 
 class ApplicationLauncher(object):
@@ -338,12 +600,32 @@ class ApplicationLauncher(object):
         '''Return current session.'''
         return self._session
 
-    def __init__(self, applicationStore):
+    def __init__(
+        self,
+        applicationStore,
+        integrations_ttl=DEFAULT_INTEGRATIONS_TTL,
+        metrics_sink=None,
+        context_delivery=DELIVERY_ENVIRONMENT,
+    ):
         '''Instantiate launcher with *applicationStore* of applications.
 
         *applicationStore* should be an instance of :class:`ApplicationStore`
         holding information about applications that can be launched.
 
+        Discovered integrations are cached for *integrations_ttl* seconds, or
+        until :meth:`invalidate_integrations` is called. None caches them
+        until invalidated, 0 disables the cache.
+
+        *metrics_sink* may be a callable called with the timings of each
+        launch, as returned by :meth:`launch`.
+
+        *context_delivery* sets how the launch context is passed to launched
+        applications, either :data:`DELIVERY_ENVIRONMENT` to encode it in
+        :data:`CONTEXT_VARIABLE`, or :data:`DELIVERY_FILE` to write it to a
+        private file whose path is set in :data:`CONTEXT_PATH_VARIABLE`.
+        Raise :exc:`ValueError` if *context_delivery* is not one of
+        :data:`DELIVERIES`.
+
         '''
         super(ApplicationLauncher, self).__init__()
         self.logger = logging.getLogger(
@@ -351,8 +633,98 @@ class ApplicationLauncher(object):
         )
         self.applicationStore = applicationStore
         self._session = applicationStore.session
+        self._integrations_version = 0
+
+        #: :class:`~ftrack_application_launcher.cache.ExpiringCache` of
+        #: discovered integrations, holding hit and miss counters.
+        self.integrations_cache = ExpiringCache(integrations_ttl)
+
+        #: Callable called with the timings of each launch, or None.
+        self.metrics_sink = metrics_sink
+
+        if context_delivery not in DELIVERIES:
+            raise ValueError(
+                'Launch context delivery {} not recognised, should be one '
+                'of {}.'.format(context_delivery, DELIVERIES)
+            )
+
+        #: How the launch context is passed to launched applications.
+        self.context_delivery = context_delivery
+
+        # Session, API key and copy of the process environment the base
+        # environment of launches was built from, followed by the base
+        # environment.
+        self._base_environment = None
+
+        # Environment plans keyed on the integrations merged and the
+        # environments they export.
+        self._environment_plans = {}
+
+    @property
+    def integrations_ttl(self):
+        '''Return number of seconds discovered integrations are cached.'''
+        return self.integrations_cache.ttl
+
+    @property
+    def integrations_version(self):
+        '''Return number changed each time integrations are invalidated.'''
+        return self._integrations_version
+
+    def invalidate_integrations(self):
+        '''Mark integrations as changed.
+
+        Should be called when integrations are registered or removed, so
+        results derived from :meth:`discover_integrations` are discarded and
+        batch discovery is tried again.
+
+        '''
+        _batch_answered.pop(self.session, None)
+        self.integrations_cache.clear()
+        self._integrations_version += 1
+
+    def invalidate_environment(self):
+        '''Rebuild the base environment of launches on next launch.
+
+        The base environment is rebuilt when :data:`os.environ` or the
+        session change already, see :meth:`_get_base_environment`.
+
+        '''
+        self._base_environment = None
+
+    def _get_integrations_key(self, application, context):
+        '''Return cache key of integrations of *application* in *context*.
+
+        Integrations are expected to depend on the application, the platform
+        and the type of the entity selected in *context* only.
+
+        '''
+        entity_type = None
+        selection = (context or {}).get('selection')
+        if selection:
+            entity_type = selection[0].get('entityType')
+
+        return (application['identifier'], self.current_os, entity_type)
 
     def discover_integrations(self, application, context):
+        '''Return integrations found and lost for *application*.
+
+        Return a pair of the integrations discovered for *application* in
+        *context* and the names of its integration groups which could not be
+        resolved. Results are cached, see :attr:`integrations_cache`.
+
+        '''
+        key = self._get_integrations_key(application, context)
+
+        discovered = self.integrations_cache.get(key)
+        if discovered is None:
+            found, lost = self._discover_integrations(application, context)
+            discovered = (tuple(found), tuple(lost))
+            self.integrations_cache.set(key, discovered)
+
+        return list(discovered[0]), list(discovered[1])
+
+    def _discover_integrations(self, application, context):
+        '''Return integrations of *application* without using the cache.'''
         context = context or {}
         results = self.session.event_hub.publish(
             ftrack_api.event.base.Event(
@@ -366,38 +738,124 @@ class ApplicationLauncher(object):
             synchronous=True,
         )
 
-        requested_integrations = application['integrations']
-
         discovered_integrations = [
             result.get('integration', {})
             for result in results
             if not result.get('integration', {}).get('disable') is True
         ]
 
-        discovered_integrations_names = set(
-            [
-                discovered_integration['name']
-                for discovered_integration in discovered_integrations
-            ]
+        lost_integrations = self._get_lost_integrations(
+            get_requirements(application['integrations']),
+            discovered_integrations,
         )
 
-        found_integrations = discovered_integrations
-        lost_integrations = []
-
-        for (
-            requested_integration_name,
-            requested_integration_items,
-        ) in requested_integrations.items():
-            # Check if all the requested integration are present in the one available.
-            dependency_resolved = not bool(
-                set(requested_integration_items).difference(
-                    discovered_integrations_names
+        return discovered_integrations, lost_integrations
+
+    def discover_integrations_batch(self, applications, context):
+        '''Return integrations of *applications* discovered at once.
+
+        A single event is published with all *applications* to integrations
+        supporting batch discovery, see :ref:`integrating`. Applications
+        whose integrations are not all found that way are discovered again
+        one by one with :meth:`discover_integrations`, so integrations only
+        supporting it are still found. If the first batch event of the
+        session is not answered, applications are only discovered one by one
+        until :meth:`invalidate_integrations` is called.
+
+        Return a dictionary mapping identifiers of *applications* to pairs of
+        found integrations and names of lost integration groups, as returned
+        by :meth:`discover_integrations`. Cached results are reused and only
+        the other applications are published.
+
+        '''
+        context = context or {}
+
+        discovered = {}
+        candidates = collections.OrderedDict()
+        for application in applications:
+            identifier = application['identifier']
+            if identifier in discovered or identifier in candidates:
+                continue
+
+            cached = self.integrations_cache.get(
+                self._get_integrations_key(application, context)
+            )
+            if cached is not None:
+                discovered[identifier] = (list(cached[0]), list(cached[1]))
+            else:
+                candidates[identifier] = application
+
+        if not candidates:
+            return discovered
+
+        results = []
+        answered = _batch_answered.get(self.session)
+        if answered is not False:
+            results = self.session.event_hub.publish(
+                ftrack_api.event.base.Event(
+                    topic=DISCOVER_BATCH_TOPIC,
+                    data=dict(
+                        applications=list(candidates.values()),
+                        context=context,
+                        platform=self.current_os,
+                    ),
+                ),
+                synchronous=True,
+            )
+            if not answered:
+                _batch_answered[self.session] = any(results)
+
+        found = dict((identifier, []) for identifier in candidates)
+        for result in results:
+            if not result:
+                continue
+
+            integration = result.get('integration', {})
+            if integration.get('disable') is True:
+                continue
+
+            for identifier in result.get('applications', []):
+                if identifier in found:
+                    found[identifier].append(integration)
+
+        # Applications of a configuration share their integrations map.
+        requirements = {}
+
+        for identifier, application in candidates.items():
+            integrations = application['integrations']
+            if id(integrations) not in requirements:
+                requirements[id(integrations)] = get_requirements(
+                    integrations
                 )
+
+            lost_integrations = self._get_lost_integrations(
+                requirements[id(integrations)], found[identifier]
+            )
+
+            if lost_integrations:
+                result = self._discover_integrations(application, context)
+            else:
+                result = (found[identifier], [])
+
+            self.integrations_cache.set(
+                self._get_integrations_key(application, context),
+                (tuple(result[0]), tuple(result[1])),
             )
-            if not dependency_resolved:
-                lost_integrations.append(requested_integration_name)
+            discovered[identifier] = result
+
+        return discovered
 
-        return found_integrations, lost_integrations
+    def _get_lost_integrations(self, requirements, integrations):
+        '''Return names of *requirements* groups missing in *integrations*.
+
+        *requirements* should be returned by :func:`get_requirements`.
+
+        '''
+        names = set(integration.get('name') for integration in integrations)
+
+        return [
+            group for group, required in requirements if not required <= names
+        ]
 
     def launch(self, applicationIdentifier, context=None):
         '''Launch application matching *applicationIdentifier*.
@@ -410,29 +868,47 @@ class ApplicationLauncher(object):
             success - A boolean value indicating whether application launched
                       successfully or not.
             message - Any additional information (such as a failure message).
+            timings - Seconds spent in each phase of the launch, including
+                      each launch hook reporting it, see
+                      :class:`LaunchTimings`.
 
         '''
+        timings = LaunchTimings(applicationIdentifier)
+
         # Look up application.
         applicationIdentifierPattern = applicationIdentifier
 
-        application = self.applicationStore.get_application(
-            applicationIdentifierPattern
-        )
+        with timings.phase('get_application'):
+            application = self.applicationStore.get_application(
+                applicationIdentifierPattern
+            )
 
         if application is None:
-            return {
-                'success': False,
-                'message': (
-                    '{0} application not found.'.format(applicationIdentifier)
-                ),
-            }
+            return self._record_timings(
+                timings,
+                {
+                    'success': False,
+                    'message': (
+                        '{0} application not found.'.format(
+                            applicationIdentifier
+                        )
+                    ),
+                },
+            )
 
         # Construct command and environment.
-        command = self._get_application_launch_command(application, context)
-        environment = self._get_application_environment(application, context)
+        with timings.phase('get_application_launch_command'):
+            command = self._get_application_launch_command(
+                application, context
+            )
 
-        # Environment must contain only strings.
-        self._conform_environment(environment)
+        with timings.phase('get_application_environment'):
+            environment = self._get_application_environment(
+                application, context
+            )
+
+            # Environment must contain only strings.
+            self._conform_environment(environment)
 
         success = True
         message = '{0}{1} application started.'.format(
@@ -470,12 +946,16 @@ class ApplicationLauncher(object):
                 platform=self.current_os,
             )
 
-            results = self.session.event_hub.publish(
-                ftrack_api.event.base.Event(
-                    topic='ftrack.connect.application.launch', data=launchData
-                ),
-                synchronous=True,
-            )
+            with timings.phase('launch_hooks'):
+                results = self.session.event_hub.publish(
+                    ftrack_api.event.base.Event(
+                        topic='ftrack.connect.application.launch',
+                        data=launchData,
+                    ),
+                    synchronous=True,
+                )
+
+            timings.record_hooks(results)
 
             # recompose launch_arguments coming from integrations
             flatten = lambda t: [item for sublist in t for item in sublist]
@@ -496,9 +976,10 @@ class ApplicationLauncher(object):
             self._notify_integration_use(results, application)
 
             if context.get('integrations'):
-                environment = self._get_integrations_environments(
-                    results, context, environment
-                )
+                with timings.phase('get_integrations_environments'):
+                    environment = self._get_integrations_environments(
+                        results, context, environment
+                    )
             else:
                 self.logger.info(
                     'No integrations provided for {}:{}'.format(
@@ -513,11 +994,14 @@ class ApplicationLauncher(object):
             application = launchData['application']
             options['env'] = environment
 
+            check_environment(environment)
+
             self.logger.debug(
                 'Launching {0} with options {1}'.format(command, options)
             )
 
-            process = subprocess.Popen(command, **options)
+            with timings.phase('popen'):
+                process = subprocess.Popen(command, **options)
 
         except (OSError, TypeError):
             self.logger.exception(
@@ -538,7 +1022,29 @@ class ApplicationLauncher(object):
                 )
             )
 
-        return {'success': success, 'message': message}
+        return self._record_timings(
+            timings, {'success': success, 'message': message}
+        )
+
+    def _record_timings(self, timings, result):
+        '''Return launch *result* with *timings* added.
+
+        Timings are logged as a JSON line and passed to the metrics sink, if
+        any.
+
+        '''
+        timings = timings.to_dict()
+
+        self.logger.info('Launch timings {}'.format(json.dumps(timings)))
+
+        if self.metrics_sink is not None:
+            try:
+                self.metrics_sink(timings)
+            except Exception:
+                self.logger.exception('Could not record launch timings.')
+
+        result['timings'] = timings
+        return result
 
     def _notify_integration_use(self, results, application):
         metadata = []
@@ -565,17 +1071,28 @@ class ApplicationLauncher(object):
         )
 
     def _get_integrations_environments(self, results, context, environments):
-        # parse integration returned from listeners.
-        returned_integrations_names = set(
-            [
-                result.get('integration', {}).get('name')
-                for result in results
-                if result
-            ]
-        )
+        '''Return *environments* merged with environments of integrations.
+
+        *results* should be the replies of the launch hooks, and *context*
+        should list the integrations requested by group. Groups whose
+        integrations have not all been returned are ignored.
+
+        .. note::
+
+            The *environments* mapping is modified in place.
+
+        '''
+        # Index integrations returned by name, the first listed wins.
+        returned_integrations = {}
+        for result in results:
+            if result:
+                integration = result.get('integration', {})
+                returned_integrations.setdefault(
+                    integration.get('name'), integration
+                )
 
         self.logger.debug(
-            'Discovered integrations {}'.format(returned_integrations_names)
+            'Discovered integrations {}'.format(set(returned_integrations))
         )
         self.logger.debug(
             'Requested integrations {}'.format(
@@ -583,11 +1100,12 @@ class ApplicationLauncher(object):
             )
         )
 
+        names = []
         for integration_group, requested_integration_names in list(
             context.get('integrations', {}).items()
         ):
             difference = set(requested_integration_names).difference(
-                returned_integrations_names
+                returned_integrations
             )
 
             if difference:
@@ -599,17 +1117,9 @@ class ApplicationLauncher(object):
                 continue
 
             for requested_integration_name in requested_integration_names:
-                result = [
-                    result
-                    for result in results
-                    if result
-                    and result['integration']['name']
-                    == requested_integration_name
-                ][0]
-
-                envs = result['integration'].get('env', {})
-
-                if not envs:
+                if not returned_integrations[requested_integration_name].get(
+                    'env'
+                ):
                     self.logger.warning(
                         'No environments exported from integration {}'.format(
                             requested_integration_name
@@ -617,57 +1127,52 @@ class ApplicationLauncher(object):
                     )
                     continue
 
-                self.logger.debug(
-                    'Merging environment variables for integration {} for group {}'.format(
-                        requested_integration_name, integration_group
-                    )
-                )
+                names.append(requested_integration_name)
 
-                for key, value in list(envs.items()):
-                    action = 'append'  # append by default
-                    action_results = key.split('.')
+        plan = self._get_environment_plan(
+            [(name, returned_integrations[name]['env']) for name in names]
+        )
 
-                    if len(action_results) == 2:
-                        key, action = action_results
+        self.logger.debug(
+            'Merging environment variables of integrations {}'.format(names)
+        )
 
-                    if action == 'append':
-                        self.logger.debug(
-                            'Appending {} with {}'.format(key, value)
-                        )
-                        append_path(str(value), key, environments)
+        return plan.apply(environments)
 
-                    elif action == 'prepend':
-                        self.logger.debug(
-                            'Prepending {} with {}'.format(key, value)
-                        )
-                        prepend_path(str(value), key, environments)
+    def _get_environment_plan(self, environments):
+        '''Return :class:`EnvironmentPlan` merging *environments*.
 
-                    elif action == 'set':
-                        self.logger.debug(
-                            'Setting {} to {}'.format(key, value)
-                        )
-                        environments[key] = str(value)
+        *environments* should be (integration name, exported environment)
+        pairs, in the order they should be merged. Plans are cached on the
+        names and the content of the environments, in order.
 
-                    elif action == 'unset':
-                        self.logger.debug('Unsetting {}'.format(key))
-                        if key in environments:
-                            environments.pop(key)
+        '''
+        try:
+            key = tuple(
+                (name, tuple(environment.items()))
+                for name, environment in environments
+            )
+            hash(key)
+        except TypeError:
+            key = tuple(
+                (name, get_integration_key(environment))
+                for name, environment in environments
+            )
 
-                    elif action == 'pop':
-                        self.logger.debug(
-                            'removing {} with {}'.format(key, value)
-                        )
-                        pop_path(str(value), key, environments)
+        plan = self._environment_plans.get(key)
+        if plan is None:
+            operations = []
+            for _, environment in environments:
+                operations.extend(compile_operations(environment))
 
-                    else:
-                        self.logger.error(
-                            'Environment variable action {} not recognised for {}'.format(
-                                action, key
-                            )
-                        )
-                        continue
+            plan = EnvironmentPlan(operations)
+
+            if len(self._environment_plans) >= ENVIRONMENT_PLANS_SIZE:
+                self._environment_plans.clear()
+
+            self._environment_plans[key] = plan
 
-        return environments
+        return plan
 
     def _get_application_launch_command(self, application, context=None):
         '''Return *application* command based on OS and *context*.
@@ -706,16 +1211,43 @@ class ApplicationLauncher(object):
 
         return command
 
-    def _get_application_environment(self, application, context=None):
-        '''Return mapping of environment for *application* using *context*.
+    def _get_base_environment(self):
+        '''Return environment shared by all launches.
 
-        *application* should be a mapping describing the application, as in the
-        :class:`ApplicationStore`.
-
-        *context* should provide additional information about how the
-        application should be launched.
+        The environment is built by :meth:`_build_base_environment` and
+        conformed once, then reused until :data:`os.environ`, the session or
+        its API key change. It should not be modified.
 
         '''
+        session = self.session
+        cached = self._base_environment
+
+        # Copy process environment first, so changes made while building
+        # cause a rebuild on next launch.
+        snapshot = dict(os.environ)
+
+        if (
+            cached is not None
+            and cached[0] is session
+            and cached[1] == session.api_key
+            and cached[2] == snapshot
+        ):
+            return cached[3]
+
+        environment = self._build_base_environment()
+        self._conform_environment(environment)
+
+        self._base_environment = (
+            session,
+            session.api_key,
+            snapshot,
+            environment,
+        )
+
+        return environment
+
+    def _build_base_environment(self):
+        '''Return environment of launches independent of the application.'''
         # Copy all environment variables to new environment and strip the once
         # we know cause problems if copied.
         environment = os.environ.copy()
@@ -729,12 +1261,15 @@ class ApplicationLauncher(object):
                 'SSL_CERT_FILE'
             ] = ssl.get_default_verify_paths().cafile
 
-        # Add FTRACK_EVENT_SERVER variable.
-        environment = prepend_path(
-            self.session.event_hub.get_server_url(),
-            'FTRACK_EVENT_SERVER',
-            environment,
-        )
+        # Add FTRACK_EVENT_SERVER variable. Server URLs contain the path
+        # separator so are joined as is rather than as a path list.
+        server_url = self.session.event_hub.get_server_url()
+        try:
+            environment['FTRACK_EVENT_SERVER'] = os.pathsep.join(
+                [server_url, environment['FTRACK_EVENT_SERVER']]
+            )
+        except KeyError:
+            environment['FTRACK_EVENT_SERVER'] = server_url
 
         # add legacy_environments
         environment['FTRACK_APIKEY'] = self.session.api_key
@@ -747,22 +1282,66 @@ class ApplicationLauncher(object):
             laucher_dependencies, 'PYTHONPATH', environment
         )
 
+        return environment
+
+    def _get_application_environment(self, application, context=None):
+        '''Return mapping of environment for *application* using *context*.
+
+        *application* should be a mapping describing the application, as in the
+        :class:`ApplicationStore`.
+
+        *context* should provide additional information about how the
+        application should be launched.
+
+        '''
+        # Copy base environment, which is only rebuilt when the process
+        # environment or the session change.
+        environment = dict(self._get_base_environment())
+
         # Add ftrack connect event to environment.
         if context is not None:
-            try:
-                applicationContext = base64.b64encode(
-                    json.dumps(context).encode("utf-8")
-                ).decode('utf-8')
-            except (TypeError, ValueError):
-                self.logger.exception(
-                    'The eventData could not be converted correctly. {0}'.format(
+            self._set_context(environment, context)
+
+        return environment
+
+    def _set_context(self, environment, context):
+        '''Deliver launch *context* through *environment*.
+
+        The context is delivered as configured by :attr:`context_delivery`,
+        falling back to :data:`CONTEXT_VARIABLE` if the context file can not
+        be written. Launched applications can read it back with
+        :func:`~ftrack_application_launcher.context.read_context`.
+
+        .. note::
+
+            The *environment* is modified in place.
+
+        '''
+        # Discard context the current process has been launched with.
+        environment.pop(CONTEXT_VARIABLE, None)
+        environment.pop(CONTEXT_PATH_VARIABLE, None)
+
+        try:
+            if self.context_delivery == DELIVERY_FILE:
+                try:
+                    environment[CONTEXT_PATH_VARIABLE] = write_context(
                         context
                     )
-                )
-            else:
-                environment['FTRACK_CONNECT_EVENT'] = applicationContext
+                    return
+                except (IOError, OSError):
+                    self.logger.exception(
+                        'Launch context could not be written, passing it in '
+                        '{} instead.'.format(CONTEXT_VARIABLE)
+                    )
 
-        return environment
+            environment[CONTEXT_VARIABLE] = encode_context(context)
+
+        except (TypeError, ValueError):
+            self.logger.exception(
+                'The eventData could not be converted correctly. {0}'.format(
+                    context
+                )
+            )
 
     def _conform_environment(self, mapping):
         '''Ensure all entries in *mapping* are strings.
@@ -772,11 +1351,19 @@ class ApplicationLauncher(object):
             The *mapping* is modified in place.
 
         '''
-        if not isinstance(mapping, collections.MutableMapping):
+        if not isinstance(mapping, collections.abc.MutableMapping):
             return
 
-        for key, value in mapping.copy().items():
-            if isinstance(value, collections.Mapping):
+        # Entries are scanned once and only those which are not strings
+        # already are replaced.
+        entries = [
+            (key, value)
+            for key, value in mapping.items()
+            if not (isinstance(key, str) and isinstance(value, str))
+        ]
+
+        for key, value in entries:
+            if isinstance(value, collections.abc.Mapping):
                 self._conform_environment(value)
             else:
                 value = str(value)
@@ -811,57 +1398,152 @@ class ApplicationLaunchAction(BaseAction):
         self.application_store = application_store
         self.launcher = launcher
 
+        #: :class:`~ftrack_application_launcher.entity.EntityResolver`
+        #: shared by the actions of *session*.
+        self.entity_resolver = get_entity_resolver(session)
+
+        self._host = platform.node()
+        self._catalog = None
+        self._availability = {}
+        self._responses = {}
+        self._version_information = None
+
     def validate_selection(self, entities):
         '''Return True if the selection is valid.
 
         Utility method to check *entities* validity.
 
         '''
-        if not self.context:
-            raise ValueError('No valid context type set for discovery')
+        return self._validate_entity_type(self._resolve_entity_type(entities))
+
+    def _resolve_entity_type(self, entities):
+        '''Return type of the first of *entities*, or None if empty.
 
-        if not entities and None in self.context:
-            # handle non context discovery
-            return True
+        Raise :exc:`ValueError` if the entity does not exist.
 
+        '''
         if not entities:
-            return False
+            return None
+
+        self.entity_resolver.prefetch(entities)
 
         entity_type, entity_id = entities[0]
-        resolved_entity_type = self.session.get(
-            entity_type, entity_id
-        ).entity_type
+        entity = self.entity_resolver.resolve(entity_type, entity_id)
+        if entity is None:
+            raise ValueError(
+                'Selected {} {} could not be found.'.format(
+                    entity_type, entity_id
+                )
+            )
 
-        if resolved_entity_type in self.context:
-            return True
+        return entity['entity_type']
 
-        return False
+    def _get_entity_type(self, entity):
+        '''Return API type of selected *entity*, translated once.'''
+        name = entity.get('entityType')
 
-    def _discover(self, event):
-        entities, event = self._translate_event(self.session, event)
+        entity_type = self.entity_resolver.get_type(name)
+        if entity_type is None:
+            entity_type = super(
+                ApplicationLaunchAction, self
+            )._get_entity_type(entity)
+            self.entity_resolver.set_type(name, entity_type)
 
-        if not self.validate_selection(entities):
-            return
+        return entity_type
+
+    def _validate_entity_type(self, entity_type):
+        '''Return True if *entity_type* is a valid selection type.
+
+        *entity_type* should be None for an empty selection.
+
+        '''
+        if not self.context:
+            raise ValueError('No valid context type set for discovery')
+
+        return entity_type in self.context
 
-        items = []
-        applications = self.application_store.applications
+    def _get_catalog(self, index):
+        '''Return discover items of applications in *index*.
+
+        Items are built and sorted by label once for each snapshot of the
+        application store, as pairs of application and item.
+
+        '''
+        catalog = self._catalog
+        if catalog is not None and catalog[0] == index.version:
+            return catalog[1]
 
         applications = sorted(
-            applications, key=lambda application: application['label']
+            index.applications, key=lambda application: application['label']
         )
 
-        for application in applications:
-            application_identifier = application['identifier']
-            label = application['label']
+        items = [
+            (
+                application,
+                {
+                    'actionIdentifier': self.identifier,
+                    'label': application['label'],
+                    'icon': application.get('icon', 'default'),
+                    'variant': application.get('variant', None),
+                    'applicationIdentifier': application['identifier'],
+                    'integrations': application.get('integrations', {}),
+                    'host': self._host,
+                },
+            )
+            for application in applications
+        ]
 
+        self._catalog = (index.version, items)
+        return items
+
+    def _get_availability(self, index, entity_type, event):
+        '''Return state of integrations for applications in *index*.
+
+        The state is a key changing when the applications or integrations
+        change, and the identifiers of applications whose integrations
+        could not all be found. Integrations are discovered with the context
+        of *event* once per state and selected *entity_type*, as integration
+        hooks may depend on the selection, and again once the launcher
+        integrations cache expires.
+
+        '''
+        key = (index.version, None)
+        expiry = None
+        if self.launcher:
+            key = (index.version, self.launcher.integrations_version)
+            if self.launcher.integrations_ttl is not None:
+                expiry = time.monotonic() + self.launcher.integrations_ttl
+
+        availability = self._availability.get(entity_type)
+        if (
+            availability is not None
+            and availability[0] == key
+            and (availability[2] is None or time.monotonic() < availability[2])
+        ):
+            return availability[:2]
+
+        unavailable = set()
+
+        if self.launcher:
             context = event['data'].copy()
             context['source'] = event['source']
 
-            if self.launcher and application.get('integrations'):
-                (
-                    _,
-                    lost_integration_groups,
-                ) = self.launcher.discover_integrations(application, context)
+            discovered = self.launcher.discover_integrations_batch(
+                [
+                    application
+                    for application in index.applications
+                    if application.get('integrations')
+                ],
+                context,
+            )
+
+            for application in index.applications:
+                if application['identifier'] not in discovered:
+                    continue
+
+                _, lost_integration_groups = discovered[
+                    application['identifier']
+                ]
 
                 for lost_integration_group in lost_integration_groups:
                     removed_integrations = application['integrations'][
@@ -880,21 +1562,61 @@ class ApplicationLaunchAction(BaseAction):
                     )
 
                 if lost_integration_groups:
-                    continue
+                    unavailable.add(application['identifier'])
 
-            items.append(
-                {
-                    'actionIdentifier': self.identifier,
-                    'label': label,
-                    'icon': application.get('icon', 'default'),
-                    'variant': application.get('variant', None),
-                    'applicationIdentifier': application_identifier,
-                    'integrations': application.get('integrations', {}),
-                    'host': platform.node(),
-                }
-            )
+        availability = (key, frozenset(unavailable), expiry)
+        self._availability[entity_type] = availability
+
+        return availability[:2]
 
-        return {'items': items}
+    def _discover(self, event):
+        '''Return discover items of applications for *event*.'''
+        entities, event = self._translate_event(self.session, event)
+
+        entity_type = self._resolve_entity_type(entities)
+        if not self._validate_entity_type(entity_type):
+            return
+
+        return {'items': self.get_items(entity_type, event)}
+
+    def _dispatch_discover(self, entity_type, event):
+        '''Return discover items for *event* selecting *entity_type*.
+
+        Called by the dispatcher once the selection is validated, actions
+        overriding :meth:`_discover` are given the event instead.
+
+        '''
+        if type(self)._discover is not ApplicationLaunchAction._discover:
+            return (self._discover(event) or {}).get('items', [])
+
+        return self.get_items(entity_type, event)
+
+    def get_items(self, entity_type, event):
+        '''Return discover items for a selection of *entity_type*.
+
+        *entity_type* should be a valid type resolved from the selection of
+        discover *event*, or None for an empty selection. Items are cached
+        for each type until the applications or the integrations change.
+
+        '''
+        # Read the snapshot once so a concurrent refresh can not mix two.
+        index = self.application_store.index
+
+        state = self._get_availability(index, entity_type, event)
+        unavailable = state[1]
+
+        responses = self._responses
+        response = responses.get(entity_type)
+        if response is None or response[0] != state:
+            items = [
+                item
+                for application, item in self._get_catalog(index)
+                if application['identifier'] not in unavailable
+            ]
+            response = (state, items)
+            responses[entity_type] = response
+
+        return list(response[1])
 
     def _launch(self, event):
         '''Handle *event*.
@@ -918,39 +1640,49 @@ class ApplicationLaunchAction(BaseAction):
         return self.launcher.launch(application_identifier, context)
 
     def get_version_information(self, event):
+        '''Return integrations discovered for the applications.
+
+        Each integration is listed once. The list is cached until the
+        applications or the integrations change.
+
+        '''
+        index = self.application_store.index
+
+        key = (index.version, None)
+        expiry = None
+        if self.launcher:
+            key = (index.version, self.launcher.integrations_version)
+            if self.launcher.integrations_ttl is not None:
+                expiry = time.monotonic() + self.launcher.integrations_ttl
+
+        information = self._version_information
+        if (
+            information is not None
+            and information[0] == key
+            and (information[2] is None or time.monotonic() < information[2])
+        ):
+            return list(information[1])
+
         founds = []
-        for application in self.application_store.applications:
-            all_discovered, _ = self.launcher.discover_integrations(
-                application, None
+        if self.launcher:
+            founds = merge_integrations(
+                self.launcher.discover_integrations(application, None)[0]
+                for application in index.applications
             )
-            for discovered in all_discovered:
-                if discovered not in founds:
-                    founds.append(discovered)
-        return founds
+
+        self._version_information = (key, founds, expiry)
+        return list(founds)
 
     def register(self):
-        '''Register discover actions on logged in user.'''
+        '''Register discover actions on logged in user.
 
-        self.session.event_hub.subscribe(
-            'topic=ftrack.action.discover '
-            'and source.user.username={0}'.format(self.session.api_user),
-            self._discover,
-            priority=self.priority,
-        )
+        Events are received through the
+        :class:`~ftrack_application_launcher.dispatch.ActionDispatcher`
+        shared by all actions of the session.
 
-        self.session.event_hub.subscribe(
-            'topic=ftrack.action.launch '
-            'and source.user.username={0} '
-            'and data.actionIdentifier={1} '
-            'and data.host={2}'.format(
-                self.session.api_user, self.identifier, platform.node()
-            ),
-            self._launch,
-            priority=self.priority,
-        )
+        '''
+        get_action_dispatcher(self.session).add(self)
 
-        self.session.event_hub.subscribe(
-            'topic=ftrack.connect.plugin.debug-information',
-            self.get_version_information,
-            priority=self.priority,
-        )
+    def unregister(self):
+        '''Stop receiving events registered to by :meth:`register`.'''
+        get_action_dispatcher(self.session).remove(self)
@@ -0,0 +1,168 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import sys
+import weakref
+import collections.abc
+
+
+#: Keys of application records, in the order they are listed.
+FIELDS = (
+    'identifier',
+    'path',
+    'launchArguments',
+    'version',
+    'label',
+    'icon',
+    'variant',
+    'description',
+    'integrations',
+)
+
+_FIELDS = frozenset(FIELDS)
+
+
+class _Integrations(dict):
+    '''Integration map which can be referenced weakly.'''
+
+    __slots__ = ('__weakref__',)
+
+
+# Integration maps shared between records, keyed on their content. Maps are
+# dropped once no record references them.
+_integrations = weakref.WeakValueDictionary()
+
+
+def share_integrations(integrations):
+    '''Return shared integration map equal to *integrations*.
+
+    Records built from the same or identical configurations reference a
+    single map instead of a copy each, kept as long as any record uses it.
+    The map should not be modified.
+
+    '''
+    integrations = integrations or {}
+
+    key = tuple(
+        sorted(
+            (name, tuple(items)) for name, items in integrations.items()
+        )
+    )
+
+    shared = _integrations.get(key)
+    if shared is None:
+        shared = _integrations.setdefault(key, _Integrations(integrations))
+
+    return shared
+
+
+def share_string(value):
+    '''Return shared copy of string *value*, or *value* if not a string.'''
+    if isinstance(value, str):
+        return sys.intern(value)
+
+    return value
+
+
+def get_integration_key(integration):
+    '''Return hashable key of *integration* information.
+
+    Mappings and sequences in *integration* are converted recursively, so
+    equal integrations have equal keys.
+
+    '''
+    if isinstance(integration, collections.abc.Mapping):
+        return tuple(
+            sorted(
+                (str(key), get_integration_key(value))
+                for key, value in integration.items()
+            )
+        )
+
+    if isinstance(integration, (list, tuple)):
+        return tuple(get_integration_key(value) for value in integration)
+
+    return integration
+
+
+class Application(collections.abc.Mapping):
+    '''Immutable application record.
+
+    Records hold the attributes listed in :data:`FIELDS` in slots and are
+    read only mappings, so they can be indexed like the dictionaries
+    applications used to be::
+
+        application['identifier']
+        application.get('variant')
+
+    '''
+
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        identifier,
+        path,
+        launchArguments=None,
+        version=None,
+        label=None,
+        icon=None,
+        variant=None,
+        description=None,
+        integrations=None,
+    ):
+        '''Instantiate record from attributes.
+
+        *integrations* and *icon* are shared with identical records, see
+        :func:`share_integrations` and :func:`share_string`.
+
+        '''
+        values = (
+            identifier,
+            path,
+            launchArguments,
+            version,
+            label,
+            share_string(icon),
+            variant,
+            description,
+            share_integrations(integrations),
+        )
+
+        for name, value in zip(FIELDS, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            '{} is immutable.'.format(self.__class__.__name__)
+        )
+
+    def __delattr__(self, name):
+        raise AttributeError(
+            '{} is immutable.'.format(self.__class__.__name__)
+        )
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            tuple(getattr(self, name) for name in FIELDS),
+        )
+
+    def __getitem__(self, key):
+        if key not in _FIELDS:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, dict(self))
+
+    def copy(self):
+        '''Return mutable copy of record as a dictionary.'''
+        return dict(self)
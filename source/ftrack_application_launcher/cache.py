@@ -0,0 +1,315 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+
+import appdirs
+
+
+#: Version of the on disk format, bump to discard caches written by older
+#: releases.
+CACHE_FORMAT_VERSION = 1
+
+
+def get_cache_path():
+    '''Return default path of the discovery cache file.'''
+    return os.path.join(
+        appdirs.user_cache_dir('ftrack-connect', 'ftrack'),
+        'ftrack_application_launcher_discovery.json',
+    )
+
+
+def stat_directory(path):
+    '''Return [mtime, inode] signature for directory at *path*.
+
+    Return None if *path* can not be accessed.
+
+    '''
+    try:
+        result = os.stat(path)
+    except OSError:
+        return None
+
+    return [result.st_mtime_ns, result.st_ino]
+
+
+class DiscoveryCache(object):
+    '''Persist filesystem discovery results between sessions.
+
+    Entries are keyed on a hash of the search expression and hold the
+    signature of every intermediate directory traversed together with the
+    directories containing the matched executables (installs).
+
+    A cached entry is reused as long as none of the intermediate directories
+    changed. Installs are validated one by one: an install whose directory
+    changed, or whose executables disappeared, is re-listed on its own
+    rather than discarding the whole entry.
+
+    '''
+
+    def __init__(self, path=None):
+        '''Instantiate cache stored at *path*.
+
+        If *path* is not given :func:`get_cache_path` will be used.
+
+        '''
+        super(DiscoveryCache, self).__init__()
+        self.logger = logging.getLogger(
+            __name__ + '.' + self.__class__.__name__
+        )
+
+        self.path = path or get_cache_path()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._used = set()
+
+        self.load()
+
+    @staticmethod
+    def make_key(expression, current_os):
+        '''Return cache key for *expression* on *current_os*.'''
+        data = json.dumps([current_os, expression])
+        return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+    def load(self):
+        '''Load entries from disk, discarding unreadable caches.'''
+        self._entries = {}
+
+        if not os.path.isfile(self.path):
+            return
+
+        try:
+            with open(self.path, 'r') as cache_file:
+                data = json.load(cache_file)
+        except (IOError, OSError, ValueError) as error:
+            self.logger.warning(
+                'Discovery cache {} could not be loaded due to {}'.format(
+                    self.path, error
+                )
+            )
+            return
+
+        if data.get('version') != CACHE_FORMAT_VERSION:
+            self.logger.debug(
+                'Discarding discovery cache {} with format {}'.format(
+                    self.path, data.get('version')
+                )
+            )
+            return
+
+        self._entries = data.get('entries', {})
+
+    def save(self):
+        '''Write entries used during this session to disk.
+
+        Entries not looked up or stored since the cache has been loaded
+        belong to configurations which are no longer available and are
+        dropped.
+
+        '''
+        with self._lock:
+            entries = dict(
+                (key, value)
+                for key, value in self._entries.items()
+                if key in self._used
+            )
+
+        directory = os.path.dirname(self.path)
+        temporary_path = '{}.{}.tmp'.format(self.path, os.getpid())
+
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+            with open(temporary_path, 'w') as cache_file:
+                json.dump(
+                    {'version': CACHE_FORMAT_VERSION, 'entries': entries},
+                    cache_file,
+                )
+
+            os.replace(temporary_path, self.path)
+
+        except (IOError, OSError) as error:
+            self.logger.warning(
+                'Discovery cache {} could not be saved due to {}'.format(
+                    self.path, error
+                )
+            )
+
+    def get(self, key, rescan):
+        '''Return cached results for *key* or None on a miss.
+
+        Results are returned as a mapping holding the executable *paths*, the
+        intermediate *directories* and the *installs*, as documented in
+        :meth:`set`.
+
+        *rescan* should be a callable accepting an install directory and
+        returning the names of the matching executables it contains. It is
+        used to refresh installs whose directory changed since the entry was
+        stored.
+
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            self._used.add(key)
+
+        if entry is None:
+            self._count_miss()
+            return None
+
+        for directory, signature in entry['directories'].items():
+            if stat_directory(directory) != signature:
+                self.logger.debug(
+                    'Discovery cache miss, {} changed.'.format(directory)
+                )
+                self._count_miss()
+                return None
+
+        installs = {}
+        paths = []
+
+        for directory, install in entry['installs'].items():
+            signature = stat_directory(directory)
+            names = install['names']
+
+            if signature is None:
+                # Install directory removed.
+                self._count_invalidated()
+                continue
+
+            if signature != install['signature'] or not all(
+                os.path.exists(os.path.join(directory, name))
+                for name in names
+            ):
+                self.logger.debug(
+                    'Discovery cache install {} changed, re-listing.'.format(
+                        directory
+                    )
+                )
+                self._count_invalidated()
+                names = rescan(directory)
+
+            installs[directory] = {'signature': signature, 'names': names}
+            paths.extend(os.path.join(directory, name) for name in names)
+
+        with self._lock:
+            entry['installs'] = installs
+
+        self._count_hit()
+        return {
+            'paths': paths,
+            'directories': dict(entry['directories']),
+            'installs': dict(installs),
+        }
+
+    def set(self, key, directories, installs):
+        '''Store discovery results for *key*.
+
+        *directories* should be a mapping of intermediate directory paths to
+        their signature as returned by :func:`stat_directory`.
+
+        *installs* should be a mapping of install directory paths to a
+        mapping holding their *signature* and the matched executable
+        *names*.
+
+        '''
+        with self._lock:
+            self._entries[key] = {
+                'directories': directories,
+                'installs': installs,
+            }
+            self._used.add(key)
+
+    def _count_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _count_invalidated(self):
+        with self._lock:
+            self.invalidated += 1
+
+    def log_statistics(self):
+        '''Log hit and miss counts.'''
+        self.logger.info(
+            'Discovery cache {}: {} hits, {} misses, {} installs '
+            'invalidated.'.format(
+                self.path, self.hits, self.misses, self.invalidated
+            )
+        )
+
+
+class ExpiringCache(object):
+    '''Thread safe in memory cache whose entries expire after a delay.
+
+    Lookups are counted in :attr:`hits` and :attr:`misses`, expired entries
+    count as misses.
+
+    '''
+
+    def __init__(self, ttl=None):
+        '''Instantiate cache keeping entries for *ttl* seconds.
+
+        Entries never expire if *ttl* is None, nothing is cached if *ttl* is
+        0.
+
+        '''
+        super(ExpiringCache, self).__init__()
+
+        self.ttl = ttl
+
+        #: Number of lookups which found a valid entry.
+        self.hits = 0
+
+        #: Number of lookups which did not.
+        self.misses = 0
+
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        '''Return value cached for *key*, or *default* if none is valid.'''
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and (
+                self.ttl is None or time.monotonic() < entry[0]
+            ):
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        '''Cache *value* for *key*.'''
+        if self.ttl == 0:
+            return
+
+        expiry = None
+        if self.ttl is not None:
+            expiry = time.monotonic() + self.ttl
+
+        with self._lock:
+            self._entries[key] = (expiry, value)
+
+    def clear(self):
+        '''Remove all entries, counters are kept.'''
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,360 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import re
+import json
+import logging
+import numbers
+
+from ftrack_application_launcher.cache import get_cache_path
+from ftrack_application_launcher.search import is_literal
+
+
+#: Version of the compiled configurations, bump when their content changes
+#: to discard caches written by older releases.
+CONFIGURATION_FORMAT_VERSION = 1
+
+#: Attributes every configuration must define.
+REQUIRED_ATTRIBUTES = (
+    'context',
+    'identifier',
+    'applicationIdentifier',
+    'label',
+    'icon',
+    'variant',
+    'search_path',
+)
+
+
+class ConfigurationError(ValueError):
+    '''Raise when an application configuration is not valid.'''
+
+
+def get_configuration_cache_path(cache_path=None):
+    '''Return path of the compiled configurations cache.
+
+    The cache is stored next to the discovery cache at *cache_path*, or next
+    to the default discovery cache if not given.
+
+    '''
+    return os.path.join(
+        os.path.dirname(cache_path or get_cache_path()),
+        'ftrack_application_launcher_configurations.json',
+    )
+
+
+def _compile_pattern(pattern, name):
+    '''Compile regular expression *pattern* of attribute *name*.'''
+    if not isinstance(pattern, str):
+        raise ConfigurationError(
+            '{} should be a string, got {!r}.'.format(name, pattern)
+        )
+
+    try:
+        return re.compile(pattern)
+    except re.error as error:
+        raise ConfigurationError(
+            '{} {!r} is not a valid regular expression: {}'.format(
+                name, pattern, error
+            )
+        )
+
+
+def _validate_segments(segments, name):
+    '''Validate search *segments* of attribute *name*.'''
+    if not isinstance(segments, list) or not segments:
+        raise ConfigurationError(
+            '{} should be a non empty list, got {!r}.'.format(name, segments)
+        )
+
+    for segment in segments:
+        if not isinstance(segment, str):
+            raise ConfigurationError(
+                '{} segments should be strings, got {!r}.'.format(
+                    name, segment
+                )
+            )
+
+
+def compile_configuration(configuration, current_os):
+    '''Return search plan of *configuration* for *current_os*.
+
+    *configuration* should be the content of an application configuration
+    file as documented in :ref:`developing`. The plan holds the same
+    attributes except for *search_path*, replaced by *search* holding the
+    full search *expression*, the *version_expression*, *launch_arguments*
+    and *time_budget* for *current_os*, or None if *current_os* is not
+    supported.
+
+    Raise :exc:`ConfigurationError` if *configuration* is not valid.
+
+    '''
+    if not isinstance(configuration, dict):
+        raise ConfigurationError(
+            'Configuration should be a mapping, got {!r}.'.format(
+                configuration
+            )
+        )
+
+    missing = [
+        attribute
+        for attribute in REQUIRED_ATTRIBUTES
+        if attribute not in configuration
+    ]
+    if missing:
+        raise ConfigurationError(
+            'Missing required attributes {}.'.format(', '.join(missing))
+        )
+
+    search_paths = configuration['search_path']
+    if not isinstance(search_paths, dict):
+        raise ConfigurationError(
+            'search_path should be a mapping, got {!r}.'.format(search_paths)
+        )
+
+    integrations = configuration.get('integrations') or {}
+    if not isinstance(integrations, dict) or not all(
+        isinstance(names, list) for names in integrations.values()
+    ):
+        raise ConfigurationError(
+            'integrations should map group names to lists, got {!r}.'.format(
+                integrations
+            )
+        )
+
+    plan = dict(
+        (key, value)
+        for key, value in configuration.items()
+        if key != 'search_path'
+    )
+    plan['search'] = None
+
+    search_path = search_paths.get(current_os)
+    if not search_path:
+        return plan
+
+    for attribute in ('prefix', 'expression'):
+        if attribute not in search_path:
+            raise ConfigurationError(
+                'Missing required attribute {} for {}.'.format(
+                    attribute, current_os
+                )
+            )
+
+        _validate_segments(search_path[attribute], attribute)
+
+    expression = search_path['prefix'] + search_path['expression']
+
+    # The root is a path on disk, other segments are matched against names.
+    for segment in expression[1:]:
+        if not is_literal(segment):
+            _compile_pattern(segment, 'Segment')
+
+    version_expression = search_path.get('version_expression')
+    if version_expression is not None:
+        matcher = _compile_pattern(version_expression, 'version_expression')
+        if 'version' not in matcher.groupindex:
+            raise ConfigurationError(
+                'version_expression {!r} should define a version '
+                'group.'.format(version_expression)
+            )
+
+    launch_arguments = search_path.get('launch_arguments')
+    if launch_arguments is not None and not isinstance(
+        launch_arguments, list
+    ):
+        raise ConfigurationError(
+            'launch_arguments should be a list, got {!r}.'.format(
+                launch_arguments
+            )
+        )
+
+    time_budget = search_path.get('time_budget')
+    if time_budget is not None and (
+        isinstance(time_budget, bool)
+        or not isinstance(time_budget, numbers.Real)
+        or time_budget < 0
+    ):
+        raise ConfigurationError(
+            'time_budget should be a positive number, got {!r}.'.format(
+                time_budget
+            )
+        )
+
+    plan['search'] = {
+        'expression': expression,
+        'version_expression': version_expression,
+        'launch_arguments': launch_arguments,
+        'time_budget': time_budget,
+    }
+
+    return plan
+
+
+class ConfigurationRegistry(object):
+    '''Load application configurations as validated search plans.
+
+    Plans are compiled once with :func:`compile_configuration` and cached on
+    disk keyed on the configuration file path and modification time, so
+    unchanged files are neither read nor validated again.
+
+    '''
+
+    def __init__(self, current_os, cache_path=None):
+        '''Instantiate registry for *current_os*.
+
+        Plans are cached in *cache_path* if given, otherwise they are
+        compiled on each load.
+
+        '''
+        super(ConfigurationRegistry, self).__init__()
+        self.logger = logging.getLogger(
+            __name__ + '.' + self.__class__.__name__
+        )
+
+        self.current_os = current_os
+        self.cache_path = cache_path
+
+        self._entries = {}
+        self._used = set()
+        self._changed = False
+        self._errors = {}
+
+        self._load_cache()
+
+    def load(self, config_paths):
+        '''Return plans of configurations found in *config_paths*.
+
+        Configuration files are loaded in name order for each path, invalid
+        configurations are skipped and logged once until they change. Plans
+        of configurations no longer found are dropped from the cache.
+
+        '''
+        self._used = set()
+        plans = []
+
+        for config_path in config_paths:
+            if not os.path.isdir(config_path):
+                self.logger.warning(
+                    '{} directory cannot be found.'.format(config_path)
+                )
+                continue
+
+            for name in sorted(os.listdir(config_path)):
+                if not name.endswith('json'):
+                    continue
+
+                path = os.path.join(config_path, name)
+
+                try:
+                    plans.append(self.get_plan(path))
+                except ConfigurationError as error:
+                    if self._errors.get(path) != str(error):
+                        self.logger.error(
+                            'Configuration {} is not valid and will be '
+                            'ignored: {}'.format(path, error)
+                        )
+                        self._errors[path] = str(error)
+                else:
+                    self._errors.pop(path, None)
+
+        self._save_cache()
+        return plans
+
+    def get_plan(self, path):
+        '''Return plan of configuration file at *path*.
+
+        Raise :exc:`ConfigurationError` if the file can not be loaded or is
+        not valid.
+
+        '''
+        path = os.path.abspath(path)
+
+        try:
+            result = os.stat(path)
+        except OSError as error:
+            raise ConfigurationError(error)
+
+        signature = [result.st_mtime_ns, result.st_size]
+        self._used.add(path)
+
+        entry = self._entries.get(path)
+        if entry is not None and entry['signature'] == signature:
+            return entry['plan']
+
+        try:
+            with open(path, 'r') as config_file:
+                configuration = json.load(config_file)
+        except (IOError, OSError, ValueError) as error:
+            raise ConfigurationError(error)
+
+        plan = compile_configuration(configuration, self.current_os)
+
+        self._entries[path] = {'signature': signature, 'plan': plan}
+        self._changed = True
+
+        return plan
+
+    def _load_cache(self):
+        '''Load compiled plans from disk, discarding unreadable caches.'''
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, 'r') as cache_file:
+                data = json.load(cache_file)
+        except (IOError, OSError, ValueError) as error:
+            self.logger.warning(
+                'Configuration cache {} could not be loaded due to '
+                '{}'.format(self.cache_path, error)
+            )
+            return
+
+        if data.get('version') != CONFIGURATION_FORMAT_VERSION or (
+            data.get('os') != self.current_os
+        ):
+            return
+
+        self._entries = data.get('entries', {})
+
+    def _save_cache(self):
+        '''Write plans of configurations loaded to disk if they changed.'''
+        if not self.cache_path:
+            return
+
+        entries = dict(
+            (path, entry)
+            for path, entry in self._entries.items()
+            if path in self._used
+        )
+        if not self._changed and len(entries) == len(self._entries):
+            return
+
+        directory = os.path.dirname(self.cache_path)
+        temporary_path = '{}.{}.tmp'.format(self.cache_path, os.getpid())
+
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+            with open(temporary_path, 'w') as cache_file:
+                json.dump(
+                    {
+                        'version': CONFIGURATION_FORMAT_VERSION,
+                        'os': self.current_os,
+                        'entries': entries,
+                    },
+                    cache_file,
+                )
+
+            os.replace(temporary_path, self.cache_path)
+
+        except (IOError, OSError) as error:
+            self.logger.warning(
+                'Configuration cache {} could not be saved due to '
+                '{}'.format(self.cache_path, error)
+            )
+
+        self._entries = entries
+        self._changed = False
@@ -0,0 +1,171 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import time
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+
+import appdirs
+
+
+logger = logging.getLogger(__name__)
+
+#: Variable holding the launch context as base64 encoded JSON.
+CONTEXT_VARIABLE = 'FTRACK_CONNECT_EVENT'
+
+#: Variable holding the path of the JSON file holding the launch context.
+CONTEXT_PATH_VARIABLE = 'FTRACK_CONNECT_EVENT_PATH'
+
+#: Deliver the launch context in :data:`CONTEXT_VARIABLE`.
+DELIVERY_ENVIRONMENT = 'environment'
+
+#: Deliver the launch context in a file named by
+#: :data:`CONTEXT_PATH_VARIABLE`.
+DELIVERY_FILE = 'file'
+
+#: Ways the launch context can be delivered to launched applications.
+DELIVERIES = (DELIVERY_ENVIRONMENT, DELIVERY_FILE)
+
+#: Number of seconds context files are kept after they were last written,
+#: long enough for applications launched with them and their children to
+#: have read them.
+CONTEXT_FILE_LIFETIME = 7 * 24 * 3600.0
+
+
+def get_context_directory():
+    '''Return default directory context files are written to.
+
+    The directory is shared by all processes of the current user, so files
+    written by previous sessions can be removed on startup, see
+    :func:`remove_expired_contexts`.
+
+    '''
+    return os.path.join(
+        appdirs.user_cache_dir('ftrack-connect', 'ftrack'), 'launch_contexts'
+    )
+
+
+def remove_expired_contexts(directory=None, lifetime=CONTEXT_FILE_LIFETIME):
+    '''Remove context files of *directory* older than *lifetime* seconds.
+
+    *directory* defaults to :func:`get_context_directory`. Files are never
+    removed when written or when the process exits, as detached applications
+    may still read them, so this should be called once on startup.
+
+    '''
+    if directory is None:
+        directory = get_context_directory()
+
+    expiry = time.time() - lifetime
+
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        # No context file written yet.
+        return
+
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < expiry:
+                os.remove(entry.path)
+        except OSError:
+            # Removed concurrently or not accessible.
+            continue
+
+
+def encode_context(context):
+    '''Return launch *context* encoded for :data:`CONTEXT_VARIABLE`.
+
+    Raise :exc:`TypeError` or :exc:`ValueError` if *context* can not be
+    converted to JSON.
+
+    '''
+    return base64.b64encode(json.dumps(context).encode('utf-8')).decode(
+        'utf-8'
+    )
+
+
+def write_context(context, directory=None):
+    '''Write launch *context* to a file in *directory* and return its path.
+
+    *directory* defaults to :func:`get_context_directory` and is created if
+    missing. Files are named after a hash of their content, so launches with
+    the same context share a file, and are only readable by the current
+    user. Writing a file shared with a previous launch renews its lifetime,
+    see :func:`remove_expired_contexts`.
+
+    Raise :exc:`TypeError` or :exc:`ValueError` if *context* can not be
+    converted to JSON, and :exc:`OSError` if the file can not be written.
+
+    '''
+    if directory is None:
+        directory = get_context_directory()
+
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+
+    data = json.dumps(context).encode('utf-8')
+
+    path = os.path.join(
+        directory, '{}.json'.format(hashlib.sha1(data).hexdigest())
+    )
+
+    if not os.path.isfile(path):
+        # Write to a temporary file first so readers never see a partial
+        # file.
+        descriptor, temporary_path = tempfile.mkstemp(
+            suffix='.tmp', dir=directory
+        )
+        try:
+            with os.fdopen(descriptor, 'wb') as context_file:
+                context_file.write(data)
+
+            os.replace(temporary_path, path)
+
+        except Exception:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+            raise
+
+    else:
+        # Renew lifetime of the file shared with previous launches.
+        os.utime(path)
+
+    return path
+
+
+def read_context(environment=None):
+    '''Return launch context the current process was launched with.
+
+    The context is read from the file named by :data:`CONTEXT_PATH_VARIABLE`
+    if set, or decoded from :data:`CONTEXT_VARIABLE` otherwise, in
+    *environment* or :data:`os.environ` if not given. Return None if the
+    process was not launched with a context, or if the context file can no
+    longer be read, in which case a warning is logged.
+
+    '''
+    if environment is None:
+        environment = os.environ
+
+    path = environment.get(CONTEXT_PATH_VARIABLE)
+    if path:
+        try:
+            with open(path, 'rb') as context_file:
+                return json.loads(context_file.read().decode('utf-8'))
+        except (OSError, ValueError) as error:
+            logger.warning(
+                'Launch context could not be read from {}: {}'.format(
+                    path, error
+                )
+            )
+            return None
+
+    value = environment.get(CONTEXT_VARIABLE)
+    if value:
+        return json.loads(base64.b64decode(value).decode('utf-8'))
+
+    return None
@@ -1,14 +1,32 @@
 import sys
-import os
-import json
 import platform
 from collections import defaultdict
 import logging
+import threading
 from ftrack_application_launcher import (
+    DEFAULT_INTEGRATIONS_TTL,
     ApplicationStore,
     ApplicationLaunchAction,
     ApplicationLauncher,
 )
+from ftrack_application_launcher import asynchronous
+from ftrack_application_launcher.cache import DiscoveryCache
+from ftrack_application_launcher.context import DELIVERY_ENVIRONMENT
+from ftrack_application_launcher.config import (
+    ConfigurationRegistry,
+    get_configuration_cache_path,
+)
+from ftrack_application_launcher.refresh import PeriodicRefresh
+from ftrack_application_launcher.search import (
+    DEFAULT_ROOT_BUDGET,
+    SearchTree,
+    is_within,
+    search,
+)
+from ftrack_application_launcher.watcher import (
+    DEFAULT_POLL_INTERVAL,
+    create_watcher,
+)
 
 
 class DiscoverApplications(object):
@@ -16,51 +34,141 @@ class DiscoverApplications(object):
     def current_os(self):
         return platform.system().lower()
 
-    def __init__(self, session, applications_config_paths):
+    def __init__(
+        self,
+        session,
+        applications_config_paths,
+        use_cache=True,
+        cache_path=None,
+        max_workers=None,
+        watch=False,
+        watch_interval=DEFAULT_POLL_INTERVAL,
+        lazy=False,
+        root_budget=DEFAULT_ROOT_BUDGET,
+        config_budget=None,
+        refresh_interval=None,
+        reload_interval=None,
+        integrations_ttl=DEFAULT_INTEGRATIONS_TTL,
+        metrics_sink=None,
+        context_delivery=DELIVERY_ENVIRONMENT,
+    ):
+        '''Instantiate launchers from *applications_config_paths*.
+
+        If *use_cache* is True, filesystem search results are persisted in a
+        :class:`~ftrack_application_launcher.cache.DiscoveryCache` stored at
+        *cache_path*, or in the default cache location if not given. Compiled
+        configurations are cached next to it, see
+        :class:`~ftrack_application_launcher.config.ConfigurationRegistry`.
+
+        *max_workers* sets the number of threads used to search the
+        filesystem, if not given the :class:`ThreadPoolExecutor` default is
+        used. A value of 1 or lower walks the filesystem in a single thread.
+
+        If *watch* is True, directories traversed during discovery are
+        watched and applications are updated when they change, see
+        :meth:`start_watching`.
+
+        If *lazy* is True, the filesystem is not searched on instantiation.
+        Discovery happens in a background thread started by :meth:`register`
+        or on the first access to the applications of a store, whichever
+        comes first.
+
+        *root_budget* sets the number of seconds allowed to search below each
+        root folder and *config_budget* the number of seconds allowed to
+        search each configuration, unless the configuration defines its own
+        *time_budget*. Either can be None for no limit. Searches running out
+        of time are logged and the applications found so far are used.
+
+        If *refresh_interval* is given, applications are searched again every
+        *refresh_interval* seconds in the background, see :meth:`refresh`.
+        Raise :exc:`ValueError` if it is not positive.
+
+        If *reload_interval* is given, configuration files are checked for
+        changes every *reload_interval* seconds, see :meth:`reload`. Raise
+        :exc:`ValueError` if it is not positive.
+
+        Integrations discovered for the applications are cached for
+        *integrations_ttl* seconds, see :meth:`invalidate_integrations`.
+
+        *metrics_sink* may be a callable called with the timings of each
+        launch, see :meth:`ApplicationLauncher.launch`.
+
+        *context_delivery* sets how the launch context is passed to launched
+        applications, see :class:`ApplicationLauncher`.
+
+        '''
         super(DiscoverApplications, self).__init__()
         self.logger = logging.getLogger(
             __name__ + '.' + self.__class__.__name__
         )
 
+        # Check intervals now as refreshing starts once discovered, which may
+        # be in a background thread.
+        for name, interval in (
+            ('Refresh', refresh_interval),
+            ('Reload', reload_interval),
+        ):
+            if interval is not None and not interval > 0:
+                raise ValueError(
+                    '{} interval should be positive, got {}.'.format(
+                        name, interval
+                    )
+                )
+
         # If a single path is passed by mistake, handle it here.
         if isinstance(applications_config_paths, str):
             applications_config_paths = [applications_config_paths]
 
         self._actions = []
+        self._configurations = {}
+        self._registered = False
 
+        self._config_paths = applications_config_paths
         self._session = session
+        self._max_workers = max_workers
+        self._root_budget = root_budget
+        self._config_budget = config_budget
+
+        self._watch = watch
+        self._watch_interval = watch_interval
+        self._refresh_interval = refresh_interval
+        self._integrations_ttl = integrations_ttl
+        self._metrics_sink = metrics_sink
+        self._context_delivery = context_delivery
+
+        self._lock = threading.RLock()
+        self._discovered = threading.Event()
+        self._searches = []
+        self._results = []
+        self._tree = None
+        self._watcher = None
+        self._periodic_refresh = None
+        self._periodic_reload = None
+
+        self._discovery_cache = None
+        configuration_cache_path = None
+        if use_cache:
+            self._discovery_cache = DiscoveryCache(cache_path)
+            configuration_cache_path = get_configuration_cache_path(
+                cache_path
+            )
+
+        self._registry = ConfigurationRegistry(
+            self.current_os, cache_path=configuration_cache_path
+        )
+
         configurations = self._parse_configurations(applications_config_paths)
         self._build_launchers(configurations)
 
-    def _parse_configurations(self, config_paths):
-        loaded_filtered_files = []
-        for config_path in config_paths:
-            if not os.path.exists(config_path) or not os.path.isdir(
-                config_path
-            ):
-                self.logger.warning(
-                    '{} directory cannot be found.'.format(config_path)
-                )
-                continue
-
-            files = os.listdir(config_path)
-            json_configs = [
-                open(os.path.join(config_path, str(config)), 'r').read()
-                for config in files
-                if config.endswith('json')
-            ]
+        if not lazy:
+            self._ensure_discovered()
 
-            for config in json_configs:
-                try:
-                    loaded_filtered_files.append(json.loads(config))
-                except Exception as error:
-                    self.logger.warning(
-                        '{} could not be loaded due to {}'.format(
-                            config, error
-                        )
-                    )
+        if reload_interval is not None:
+            self.start_reloading(reload_interval)
 
-        return loaded_filtered_files
+    def _parse_configurations(self, config_paths):
+        '''Return search plans of configurations in *config_paths*.'''
+        return self._registry.load(config_paths)
 
     def _group_configurations(self, configurations):
         '''group configuration based on identifier'''
@@ -75,66 +183,532 @@ class DiscoverApplications(object):
 
     def _build_launchers(self, configurations):
         grouped_configurations = self._group_configurations(configurations)
+
         for (
             identifier,
             identified_configuration,
         ) in grouped_configurations.items():
-            self.logger.debug(
-                'building config store for {}'.format(identifier)
+            self._build_launcher(identifier, identified_configuration)
+
+    def _build_launcher(self, identifier, identified_configuration):
+        '''Build store and action of *identifier* from its configurations.
+
+        Searches of the configurations are added to the ones run on
+        discovery, return the action built.
+
+        '''
+        self.logger.debug('building config store for {}'.format(identifier))
+        store = ApplicationStore(
+            self._session,
+            discovery_cache=self._discovery_cache,
+            loader=self._ensure_discovered,
+            refresher=self.refresh,
+        )
+
+        for config in identified_configuration:
+            # extract data from app config
+            search_path = config['search']
+            if not search_path:
+                self.logger.info(
+                    'No entry found for os: {} in config {}'.format(
+                        self.current_os, config['label']
+                    )
+                )
+                continue
+
+            launch_arguments = search_path['launch_arguments']
+            version_expression = search_path['version_expression']
+
+            budget = search_path['time_budget']
+            if budget is None:
+                budget = self._config_budget
+
+            self._searches.append(
+                (
+                    store,
+                    search_path['expression'],
+                    dict(
+                        versionExpression=version_expression,
+                        label=config['label'],
+                        applicationIdentifier=config['applicationIdentifier'],
+                        icon=config['icon'],
+                        variant=config['variant'],
+                        launchArguments=launch_arguments,
+                        integrations=config.get('integrations'),
+                    ),
+                    budget,
+                )
             )
-            store = ApplicationStore(self._session)
-
-            for config in identified_configuration:
-                # extract data from app config
-                search_path = config['search_path'].get(self.current_os)
-                if not search_path:
-                    self.logger.info(
-                        'No entry found for os: {} in config {}'.format(
-                            self.current_os, config['label']
-                        )
+
+        launcher = ApplicationLauncher(
+            store,
+            integrations_ttl=self._integrations_ttl,
+            metrics_sink=self._metrics_sink,
+            context_delivery=self._context_delivery,
+        )
+        NewAction = type(
+            'ApplicationLauncherAction-{}'.format(config['label']),
+            (ApplicationLaunchAction,),
+            {
+                'label': config['label'],
+                'identifier': identifier,
+                'context': config['context'],
+            },
+        )
+        priority = config.get('priority', sys.maxsize)
+        action = NewAction(self._session, store, launcher, priority=priority)
+
+        self.logger.debug(
+            'Creating App launcher {} with priority {}'.format(
+                action, priority
+            )
+        )
+
+        self._actions.append(action)
+        self._configurations[identifier] = identified_configuration
+
+        return action
+
+    def _remove_launcher(self, identifier):
+        '''Unregister action of *identifier* and drop its searches.'''
+        actions = [
+            action
+            for action in self._actions
+            if action.identifier == identifier
+        ]
+
+        for action in actions:
+            if self._registered:
+                action.unregister()
+
+            self._actions.remove(action)
+
+            kept = [
+                index
+                for index, (store, _, _, _) in enumerate(self._searches)
+                if store is not action.application_store
+            ]
+            self._searches = [self._searches[index] for index in kept]
+            if self._results:
+                self._results = [self._results[index] for index in kept]
+
+        self._configurations.pop(identifier, None)
+
+    def reload(self):
+        '''Rebuild launchers whose configuration files changed.
+
+        Configuration files are compared with the ones loaded previously,
+        actions of identifiers whose configurations were added, changed or
+        removed are unregistered and rebuilt, and only their applications
+        are searched. Other stores and their results are left untouched.
+
+        Return the list of identifiers rebuilt.
+
+        '''
+        with self._lock:
+            grouped_configurations = self._group_configurations(
+                self._parse_configurations(self._config_paths)
+            )
+
+            identifiers = set(self._configurations).union(
+                grouped_configurations
+            )
+            changed = sorted(
+                identifier
+                for identifier in identifiers
+                if self._configurations.get(identifier)
+                != grouped_configurations.get(identifier)
+            )
+            if not changed:
+                return []
+
+            self.logger.info('Reloading configurations of {}'.format(changed))
+
+            for identifier in changed:
+                self._remove_launcher(identifier)
+
+            count = len(self._searches)
+            actions = [
+                self._build_launcher(
+                    identifier, grouped_configurations[identifier]
+                )
+                for identifier in changed
+                if identifier in grouped_configurations
+            ]
+
+            if self._discovered.is_set():
+                self._results.extend(self._search(self._searches[count:]))
+                self._update_stores(
+                    set(store for store, _, _, _ in self._searches[count:])
+                )
+
+                if self._watcher is not None:
+                    self._tree = self._build_tree()
+                    self._watcher.set_paths(self._get_watched_signatures())
+
+                if self._discovery_cache is not None:
+                    self._discovery_cache.save()
+
+            if self._registered:
+                for action in actions:
+                    action.register()
+
+        return changed
+
+    def start_reloading(self, interval):
+        '''Call :meth:`reload` every *interval* seconds in the background.'''
+        with self._lock:
+            if self._periodic_reload is None:
+                self._periodic_reload = PeriodicRefresh(
+                    self.reload, interval=interval
+                )
+                self._periodic_reload.start()
+
+    def stop_reloading(self):
+        '''Stop checking configuration files for changes.'''
+        with self._lock:
+            if self._periodic_reload is not None:
+                self._periodic_reload.stop()
+                self._periodic_reload = None
+
+    def _ensure_discovered(self):
+        '''Search the filesystem unless done already.
+
+        Concurrent calls wait for the search in progress instead of starting
+        their own.
+
+        '''
+        if self._discovered.is_set():
+            return
+
+        with self._lock:
+            if self._discovered.is_set():
+                return
+
+            self._results = self._search()
+            self._update_stores(
+                set(store for store, _, _, _ in self._searches)
+            )
+
+            if self._discovery_cache is not None:
+                self._discovery_cache.log_statistics()
+                self._discovery_cache.save()
+
+            self._discovered.set()
+
+        if self._watch:
+            self.start_watching(self._watch_interval)
+
+        if self._refresh_interval is not None:
+            self.start_refresh(self._refresh_interval)
+
+    @asynchronous.asynchronous
+    def _warm_up(self):
+        '''Search the filesystem in a background thread.'''
+        self._ensure_discovered()
+
+    def _search(self, searches=None):
+        '''Search the filesystem and return results for each configuration.
+
+        The search expressions of all configurations, or of *searches* if
+        given, are merged into a single
+        :class:`~ftrack_application_launcher.search.SearchTree` so
+        directories shared between configurations are listed once, using
+        concurrent threads unless the discovery has been configured with a
+        single worker.
+
+        '''
+        if searches is None:
+            searches = self._searches
+
+        return search(
+            [expression for _, expression, _, _ in searches],
+            self.current_os,
+            discovery_cache=self._discovery_cache,
+            max_workers=self._max_workers,
+            budgets=[budget for _, _, _, budget in searches],
+            root_budget=self._root_budget,
+        )
+
+    def refresh(self):
+        '''Search the filesystem again and update stores which changed.
+
+        The search runs in the calling thread while stores keep serving
+        their current applications, each store is then swapped to its new
+        snapshot at once. Results are validated against the discovery cache
+        so only changed directories are listed again. Searches which do not
+        complete in time keep their previous results. Discovered
+        integrations are discarded as well.
+
+        '''
+        self.invalidate_integrations()
+
+        if not self._discovered.is_set():
+            self._ensure_discovered()
+            return
+
+        with self._lock:
+            results = self._search()
+
+            stores = set()
+            for index, (old, new) in enumerate(zip(self._results, results)):
+                if not new['complete'] and old['complete']:
+                    results[index] = old
+                elif new['paths'] != old['paths']:
+                    stores.add(self._searches[index][0])
+
+            self._results = results
+
+            if stores:
+                self.logger.info(
+                    'Refreshing applications for {}'.format(
+                        [
+                            action.identifier
+                            for action in self._actions
+                            if action.application_store in stores
+                        ]
                     )
-                    continue
+                )
+                self._update_stores(stores)
+
+            if self._watcher is not None:
+                self._watcher.set_paths(self._get_watched_signatures())
+
+            if self._discovery_cache is not None:
+                self._discovery_cache.save()
+
+    def invalidate_integrations(self):
+        '''Discard integrations discovered for all launchers.
 
-                launch_arguments = search_path.get('launch_arguments')
-                prefix = search_path['prefix']
-                expression = search_path['expression']
-                version_expression = search_path.get('version_expression')
-
-                applications = store._search_filesystem(
-                    versionExpression=version_expression,
-                    expression=prefix + expression,
-                    label=config['label'],
-                    applicationIdentifier=config['applicationIdentifier'],
-                    icon=config['icon'],
-                    variant=config['variant'],
-                    launchArguments=launch_arguments,
-                    integrations=config.get('integrations'),
+        Should be called when integration plugins are reloaded, integrations
+        are then discovered again on the next discover event.
+
+        '''
+        with self._lock:
+            actions = list(self._actions)
+
+        for action in actions:
+            if action.launcher:
+                action.launcher.invalidate_integrations()
+
+    def start_refresh(self, interval):
+        '''Call :meth:`refresh` every *interval* seconds in the background.'''
+        with self._lock:
+            if self._periodic_refresh is None:
+                self._periodic_refresh = PeriodicRefresh(
+                    self.refresh, interval=interval
+                )
+                self._periodic_refresh.start()
+
+    def stop_refresh(self):
+        '''Stop refreshing applications in the background.'''
+        with self._lock:
+            if self._periodic_refresh is not None:
+                self._periodic_refresh.stop()
+                self._periodic_refresh = None
+
+    def _update_stores(self, stores):
+        '''Replace applications of *stores* with the current search results.
+
+        Results are merged in configuration order, each one already sorted by
+        version, so the resulting stores do not depend on completion order.
+
+        '''
+        applications = dict((store, []) for store in stores)
+
+        for (store, expression, arguments, _), result in zip(
+            self._searches, self._results
+        ):
+            if store in applications:
+                applications[store].extend(
+                    store._create_applications(
+                        result['paths'], expression=expression, **arguments
+                    )
                 )
-                store.applications.extend(applications)
-
-            launcher = ApplicationLauncher(store)
-            NewAction = type(
-                'ApplicationLauncherAction-{}'.format(config['label']),
-                (ApplicationLaunchAction,),
-                {
-                    'label': config['label'],
-                    'identifier': identifier,
-                    'context': config['context'],
-                },
+
+        for store, store_applications in applications.items():
+            store.applications = store_applications
+
+    def start_watching(self, interval=DEFAULT_POLL_INTERVAL):
+        '''Watch searched directories and update stores when they change.
+
+        Inotify is used on Linux when available, other platforms poll the
+        directories every *interval* seconds. Only the subtree below a
+        changed directory is searched again, and only the stores whose
+        applications are affected are updated.
+
+        '''
+        with self._lock:
+            if self._watcher is not None:
+                return
+
+            self._tree = self._build_tree()
+            self._watcher = create_watcher(
+                self._on_directories_changed, interval=interval
             )
-            priority = config.get('priority', sys.maxsize)
-            action = NewAction(
-                self._session, store, launcher, priority=priority
+            self._watcher.set_paths(self._get_watched_signatures())
+            self._watcher.start()
+
+    def _build_tree(self):
+        '''Return search tree of all searches, indexed as the results.'''
+        tree = SearchTree(self.current_os)
+        for _, expression, _, budget in self._searches:
+            tree.add(expression, budget)
+
+        return tree
+
+    def stop_watching(self):
+        '''Stop watching searched directories.'''
+        with self._lock:
+            if self._watcher is not None:
+                self._watcher.stop()
+                self._watcher = None
+
+    def _get_watched_signatures(self):
+        '''Return signature of every directory traversed by the searches.'''
+        signatures = {}
+
+        for result in self._results:
+            signatures.update(result['directories'])
+            signatures.update(
+                (location, install['signature'])
+                for location, install in result['installs'].items()
             )
 
+        return signatures
+
+    def _on_directories_changed(self, locations):
+        '''Search again below changed *locations* and update stores.'''
+        with self._lock:
+            if self._watcher is None:
+                return
+
+            # Subtrees of a changed directory are searched with it.
+            outermost = []
+            for location in sorted(locations):
+                if not any(is_within(location, other) for other in outermost):
+                    outermost.append(location)
+
+            tasks = []
+            for location in outermost:
+                nodes = []
+                for index, result in enumerate(self._results):
+                    if (
+                        location not in result['directories']
+                        and location not in result['installs']
+                    ):
+                        continue
+
+                    node = self._tree.get_node(index, location)
+                    if node is not None and node not in nodes:
+                        nodes.append(node)
+
+                if nodes:
+                    tasks.append((location, nodes))
+
+            if not tasks:
+                return
+
             self.logger.debug(
-                'Creating App launcher {} with priority {}'.format(
-                    action, priority
+                'Searching again {}'.format(
+                    [location for location, _ in tasks]
                 )
             )
 
-            self._actions.append(action)
+            walked = self._tree.walk(
+                self._max_workers, tasks=tasks, root_budget=self._root_budget
+            )
+            stores = set()
+
+            for index, result in enumerate(self._results):
+                changed = [
+                    location
+                    for location, _ in tasks
+                    if location in result['directories']
+                    or location in result['installs']
+                ]
+                if not changed:
+                    continue
+
+                if not walked[index]['complete']:
+                    # Keep previous results, changes are reported again on
+                    # the next check as signatures are left untouched.
+                    self.logger.warning(
+                        'Search of {} did not complete in time, keeping '
+                        'previous applications.'.format(
+                            self._searches[index][1]
+                        )
+                    )
+                    continue
+
+                updated = self._merge_result(result, walked[index], changed)
+                if updated['paths'] != result['paths']:
+                    stores.add(self._searches[index][0])
+
+                self._results[index] = updated
+
+                if self._discovery_cache is not None:
+                    self._discovery_cache.set(
+                        self._discovery_cache.make_key(
+                            self._searches[index][1], self.current_os
+                        ),
+                        updated['directories'],
+                        updated['installs'],
+                    )
+
+            if stores:
+                self.logger.info(
+                    'Updating applications for {}'.format(
+                        [
+                            action.identifier
+                            for action in self._actions
+                            if action.application_store in stores
+                        ]
+                    )
+                )
+                self._update_stores(stores)
+
+            self._watcher.set_paths(self._get_watched_signatures())
+
+            if self._discovery_cache is not None:
+                self._discovery_cache.save()
+
+    def _merge_result(self, result, walked, locations):
+        '''Return *result* with entries below *locations* from *walked*.'''
+
+        def is_outdated(path):
+            return any(is_within(path, location) for location in locations)
+
+        merged = {
+            'paths': [
+                path for path in result['paths'] if not is_outdated(path)
+            ],
+            'directories': dict(
+                (path, signature)
+                for path, signature in result['directories'].items()
+                if not is_outdated(path)
+            ),
+            'installs': dict(
+                (path, install)
+                for path, install in result['installs'].items()
+                if not is_outdated(path)
+            ),
+            'complete': walked['complete'],
+        }
+
+        merged['paths'].extend(walked['paths'])
+        merged['paths'].sort()
+        merged['directories'].update(walked['directories'])
+        merged['installs'].update(walked['installs'])
+
+        return merged
 
     def register(self):
-        for action in self._actions:
-            action.register()
+        with self._lock:
+            for action in self._actions:
+                action.register()
+
+            self._registered = True
+
+        if not self._discovered.is_set():
+            self._warm_up()
@@ -0,0 +1,229 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import logging
+import platform
+import threading
+import weakref
+
+from ftrack_application_launcher.application import get_integration_key
+
+
+# Dispatchers shared by the actions of each session.
+_dispatchers = weakref.WeakKeyDictionary()
+_dispatchers_lock = threading.Lock()
+
+
+def get_action_dispatcher(session):
+    '''Return :class:`ActionDispatcher` shared by all actions of *session*.'''
+    with _dispatchers_lock:
+        dispatcher = _dispatchers.get(session)
+        if dispatcher is None:
+            dispatcher = ActionDispatcher(session)
+            _dispatchers[session] = dispatcher
+
+        return dispatcher
+
+
+class ActionDispatcher(object):
+    '''Route action events of a session to the actions registered.
+
+    Discover, launch and debug information events are subscribed to once
+    whatever the number of actions. Events are routed through tables of the
+    actions indexed by identifier and by context entity type, and the
+    replies of the actions are merged into one.
+
+    Actions are dispatched to in increasing priority order, and events are
+    subscribed to with the lowest priority of the actions registered, which
+    all actions usually share.
+
+    .. note::
+
+        Unlike actions subscribing on their own, the launch subscription does
+        not filter on the action identifier: every launch event of the user
+        on this host is received and routed to the actions registered with
+        the identifier it holds, if any.
+
+    '''
+
+    def __init__(self, session):
+        '''Instantiate dispatcher for events of *session*.'''
+        super(ActionDispatcher, self).__init__()
+        self.logger = logging.getLogger(
+            __name__ + '.' + self.__class__.__name__
+        )
+
+        self.session = session
+        self.host = platform.node()
+
+        # Actions, actions by identifier and actions by entity type, swapped
+        # at once so events are routed through a consistent table.
+        self._table = ((), {}, {})
+        self._subscriptions = []
+        self._priority = None
+        self._lock = threading.Lock()
+
+    @property
+    def actions(self):
+        '''Return actions registered, in dispatch order.'''
+        return self._table[0]
+
+    def add(self, action):
+        '''Dispatch events to *action*, subscribing to events if needed.'''
+        with self._lock:
+            actions = self._table[0]
+            if action in actions:
+                return
+
+            if not action.context:
+                self.logger.warning(
+                    'No valid context type set for discovery of {}.'.format(
+                        action
+                    )
+                )
+
+            self._update(actions + (action,))
+            self._resubscribe()
+
+    def remove(self, action):
+        '''Stop dispatching events to *action*.
+
+        Events are unsubscribed from once no action is left.
+
+        '''
+        with self._lock:
+            actions = self._table[0]
+            if action not in actions:
+                return
+
+            self._update(
+                tuple(
+                    registered
+                    for registered in actions
+                    if registered is not action
+                )
+            )
+
+            self._resubscribe()
+
+    def _update(self, actions):
+        '''Rebuild routing tables for *actions*.'''
+        actions = tuple(sorted(actions, key=lambda action: action.priority))
+
+        by_identifier = {}
+        by_entity_type = {}
+        for action in actions:
+            by_identifier.setdefault(action.identifier, []).append(action)
+
+            for entity_type in action.context or []:
+                by_entity_type.setdefault(entity_type, []).append(action)
+
+        self._table = (actions, by_identifier, by_entity_type)
+
+    def _resubscribe(self):
+        '''Subscribe with the lowest priority of the actions registered.
+
+        Events are unsubscribed from once no action is left.
+
+        '''
+        actions = self._table[0]
+
+        if not actions:
+            self._unsubscribe()
+            return
+
+        priority = actions[0].priority
+        if self._subscriptions and priority == self._priority:
+            return
+
+        self._unsubscribe()
+        self._subscribe(priority)
+
+    def _subscribe(self, priority):
+        '''Subscribe to action events of the current user at *priority*.'''
+        subscribe = self.session.event_hub.subscribe
+        self._priority = priority
+
+        self._subscriptions = [
+            subscribe(
+                'topic=ftrack.action.discover '
+                'and source.user.username={0}'.format(self.session.api_user),
+                self._discover,
+                priority=priority,
+            ),
+            subscribe(
+                'topic=ftrack.action.launch '
+                'and source.user.username={0} '
+                'and data.host={1}'.format(self.session.api_user, self.host),
+                self._launch,
+                priority=priority,
+            ),
+            subscribe(
+                'topic=ftrack.connect.plugin.debug-information',
+                self._get_version_information,
+                priority=priority,
+            ),
+        ]
+
+    def _unsubscribe(self):
+        '''Unsubscribe from events subscribed to by :meth:`_subscribe`.'''
+        while self._subscriptions:
+            self.session.event_hub.unsubscribe(self._subscriptions.pop())
+
+        self._priority = None
+
+    def _discover(self, event):
+        '''Return discover items of all actions accepting *event*.'''
+        actions, _, by_entity_type = self._table
+        if not actions:
+            return
+
+        # The selection is translated and resolved once for all actions.
+        try:
+            entities, event = actions[0]._translate_event(
+                self.session, event
+            )
+            entity_type = actions[0]._resolve_entity_type(entities)
+        except ValueError:
+            self.logger.exception('Could not resolve selection of event.')
+            return
+
+        candidates = by_entity_type.get(entity_type)
+        if not candidates:
+            return
+
+        items = []
+        for action in candidates:
+            # Actions fail on their own, as when they subscribed separately.
+            try:
+                items.extend(action._dispatch_discover(entity_type, event))
+            except Exception:
+                self.logger.exception(
+                    'Could not discover items of {}.'.format(action)
+                )
+
+        return {'items': items}
+
+    def _launch(self, event):
+        '''Launch application of the action *event* is for.'''
+        _, by_identifier, _ = self._table
+
+        actions = by_identifier.get(event['data'].get('actionIdentifier'))
+        if not actions:
+            return
+
+        return actions[0]._launch(event)
+
+    def _get_version_information(self, event):
+        '''Return version information of all actions, listed once each.'''
+        information = []
+        keys = set()
+
+        for action in self._table[0]:
+            for item in action.get_version_information(event) or []:
+                key = get_integration_key(item)
+                if key not in keys:
+                    keys.add(key)
+                    information.append(item)
+
+        return information
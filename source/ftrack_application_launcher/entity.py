@@ -0,0 +1,202 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import time
+import logging
+import threading
+import collections
+import weakref
+
+
+#: Default number of entities remembered by an :class:`EntityResolver`.
+DEFAULT_RESOLVER_SIZE = 1024
+
+#: Default number of seconds resolved entities are remembered for, so moved
+#: entities are resolved to their new parent and task.
+DEFAULT_RESOLVER_TTL = 60.0
+
+#: Attributes fetched for each entity type to fill resolved entities, as
+#: (key, attribute path) pairs.
+PROJECTIONS = {
+    'AssetVersion': (
+        ('task_id', 'task_id'),
+        ('parent_id', 'asset.context_id'),
+    ),
+    'TypedContext': (('parent_id', 'parent_id'),),
+}
+
+# Resolvers shared by the actions of each session.
+_resolvers = weakref.WeakKeyDictionary()
+_resolvers_lock = threading.Lock()
+
+
+def get_entity_resolver(session):
+    '''Return :class:`EntityResolver` shared by all users of *session*.'''
+    with _resolvers_lock:
+        resolver = _resolvers.get(session)
+        if resolver is None:
+            resolver = EntityResolver(session)
+            _resolvers[session] = resolver
+
+        return resolver
+
+
+def _get_attribute(entity, path):
+    '''Return value of attribute at dotted *path* on *entity*.'''
+    value = entity
+    for name in path.split('.'):
+        if value is None:
+            return None
+
+        value = value[name]
+
+    return value
+
+
+class EntityResolver(object):
+    '''Resolve selected entities to their type, parent and task ids.
+
+    Resolved entities are dictionaries holding the *entity_type*, the
+    *parent_id* and the *task_id* of an entity, the latter two being None
+    when they do not apply. They are kept in a bounded least recently used
+    cache for a limited time, so each entity is only fetched once however
+    many actions handle the event selecting it.
+
+    '''
+
+    def __init__(
+        self, session, size=DEFAULT_RESOLVER_SIZE, ttl=DEFAULT_RESOLVER_TTL
+    ):
+        '''Instantiate resolver fetching entities through *session*.
+
+        At most *size* resolved entities are remembered, for *ttl* seconds
+        after they were fetched. Entities never expire if *ttl* is None.
+
+        '''
+        super(EntityResolver, self).__init__()
+        self.logger = logging.getLogger(
+            __name__ + '.' + self.__class__.__name__
+        )
+
+        self.session = session
+        self.size = size
+        self.ttl = ttl
+
+        #: Number of entities resolved from the cache.
+        self.hits = 0
+
+        #: Number of entities which had to be fetched.
+        self.misses = 0
+
+        # Expiry and resolved entity keyed on entity id, least recently used
+        # first.
+        self._entities = collections.OrderedDict()
+        self._types = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, entity_type, entity_id):
+        '''Return resolved entity of *entity_type* with *entity_id*.
+
+        Return None if the entity does not exist.
+
+        '''
+        with self._lock:
+            entity = self._get(entity_id)
+            if entity is not None:
+                self._entities.move_to_end(entity_id)
+                self.hits += 1
+                return entity
+
+        self.prefetch([(entity_type, entity_id)])
+
+        with self._lock:
+            return self._get(entity_id)
+
+    def _get(self, entity_id):
+        '''Return entity resolved for *entity_id* if not expired, or None.
+
+        Should be called with the lock held.
+
+        '''
+        entry = self._entities.get(entity_id)
+        if entry is None:
+            return None
+
+        if entry[0] is not None and time.monotonic() >= entry[0]:
+            del self._entities[entity_id]
+            return None
+
+        return entry[1]
+
+    def prefetch(self, entities):
+        '''Fetch *entities* not resolved yet.
+
+        *entities* should be a list of (entity type, entity id) pairs, as
+        selected in action events. Entities of a same type are fetched with a
+        single query projecting the attributes listed in
+        :data:`PROJECTIONS`.
+
+        '''
+        missing = collections.OrderedDict()
+
+        with self._lock:
+            for entity_type, entity_id in entities:
+                if self._get(entity_id) is not None:
+                    continue
+
+                missing.setdefault(entity_type, set()).add(entity_id)
+
+        for entity_type, entity_ids in missing.items():
+            projections = PROJECTIONS.get(entity_type, ())
+
+            results = self.session.query(
+                'select {} from {} where id in ({})'.format(
+                    ', '.join(
+                        ['id'] + [path for _, path in projections]
+                    ),
+                    entity_type,
+                    ', '.join(
+                        '"{}"'.format(entity_id)
+                        for entity_id in sorted(entity_ids)
+                    ),
+                )
+            ).all()
+
+            resolved = []
+            for result in results:
+                entity = {
+                    'entity_type': result.entity_type,
+                    'parent_id': None,
+                    'task_id': None,
+                }
+                for key, path in projections:
+                    entity[key] = _get_attribute(result, path)
+
+                resolved.append((result['id'], entity))
+
+            expiry = None
+            if self.ttl is not None:
+                expiry = time.monotonic() + self.ttl
+
+            with self._lock:
+                self.misses += len(entity_ids)
+
+                for entity_id, entity in resolved:
+                    self._entities[entity_id] = (expiry, entity)
+                    self._entities.move_to_end(entity_id)
+
+                while len(self._entities) > self.size:
+                    self._entities.popitem(last=False)
+
+    def get_type(self, name):
+        '''Return API type translated from event type *name*, or None.'''
+        return self._types.get(name)
+
+    def set_type(self, name, entity_type):
+        '''Remember event type *name* translates to API *entity_type*.'''
+        self._types[name] = entity_type
+
+    def clear(self):
+        '''Forget resolved entities, counters are kept.'''
+        with self._lock:
+            self._entities.clear()
@@ -0,0 +1,302 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import sys
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+#: Actions integrations can apply to the environment variables they export,
+#: given as suffix of the variable name, e.g. ``PYTHONPATH.prepend``.
+ACTIONS = ('append', 'prepend', 'set', 'unset', 'pop')
+
+#: Action applied to variables exported without suffix.
+DEFAULT_ACTION = 'append'
+
+# Actions applied to variables as path lists.
+_PATH_ACTIONS = frozenset(['append', 'prepend', 'pop'])
+
+#: Fraction of the environment size limits above which a warning is logged.
+ENVIRONMENT_WARNING_RATIO = 0.8
+
+#: Number of largest variables reported by :func:`check_environment`.
+ENVIRONMENT_REPORT_SIZE = 5
+
+
+def parse_variable(name):
+    '''Return variable name and action of exported variable *name*.'''
+    parts = name.split('.')
+
+    if len(parts) == 2:
+        return parts[0], parts[1]
+
+    return name, DEFAULT_ACTION
+
+
+def compile_operations(environment):
+    '''Return operations applying integration *environment*.
+
+    *environment* should map exported variable names, optionally suffixed
+    with one of :data:`ACTIONS`, to values. Return (action, variable, value)
+    triples in the order the variables are exported. Values are converted to
+    strings, and split into tuples of entries for appending and prepending.
+    Variables with unknown actions are logged and left out.
+
+    '''
+    operations = []
+
+    for name, value in environment.items():
+        variable, action = parse_variable(name)
+
+        if action not in ACTIONS:
+            logger.error(
+                'Environment variable action {} not recognised for {}'.format(
+                    action, variable
+                )
+            )
+            continue
+
+        value = str(value)
+        if action in ('append', 'prepend'):
+            value = tuple(split_path(value))
+
+        operations.append((action, variable, value))
+
+    return tuple(operations)
+
+
+def split_path(value, separator=os.pathsep):
+    '''Return entries of path list *value*.
+
+    Empty entries are kept, as they stand for the current directory. An
+    empty or None *value* has no entries.
+
+    '''
+    if not value:
+        return []
+
+    return value.split(separator)
+
+
+def normalize_path(path):
+    '''Return *path* normalized to compare entries of path lists.
+
+    Slashes compare equal whatever their direction, redundant separators
+    and up-level references are collapsed, and case is ignored on platforms
+    where the filesystem ignores it.
+
+    '''
+    return os.path.normcase(os.path.normpath(path.replace('\\', '/')))
+
+
+class PathList(object):
+    '''Ordered set of the entries of a path list variable such as PATH.
+
+    Entries are listed once each in order of precedence, entries equal once
+    normalized with :func:`normalize_path` being the same entry. Empty
+    entries are kept as the current directory they stand for. Entries are
+    held with their position, so adding entries at either end does not move
+    the others.
+
+    '''
+
+    def __init__(self, value=None, separator=os.pathsep):
+        '''Instantiate from variable *value* split on *separator*.'''
+        super(PathList, self).__init__()
+
+        self.separator = separator
+
+        # Positions and entries by normalized entry, and positions before the
+        # first and after the last entry.
+        self._entries = {}
+        self._first = 0
+        self._last = 0
+
+        self.extend(split_path(value, separator))
+
+    def append(self, value):
+        '''Add entries of path list *value* with the lowest precedence.'''
+        self.extend(split_path(value, self.separator))
+
+    def prepend(self, value):
+        '''Add entries of path list *value* with the highest precedence.'''
+        self.extend_first(split_path(value, self.separator))
+
+    def extend(self, entries):
+        '''Add *entries* with the lowest precedence.
+
+        Entries listed already keep their position.
+
+        '''
+        for entry in entries:
+            key = normalize_path(entry)
+            if key not in self._entries:
+                self._last += 1
+                self._entries[key] = (self._last, entry)
+
+    def extend_first(self, entries):
+        '''Add *entries* with the highest precedence, in order.
+
+        Entries listed already are moved to the front.
+
+        '''
+        for entry in reversed(entries):
+            self._first -= 1
+            self._entries[normalize_path(entry)] = (self._first, entry)
+
+    def remove(self, path):
+        '''Remove *path* if listed.'''
+        self._entries.pop(normalize_path(path), None)
+
+    def __iter__(self):
+        return (entry for _, entry in sorted(self._entries.values()))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return self.separator.join(self)
+
+
+class EnvironmentPlan(object):
+    '''Ordered operations merging integration environments into another.
+
+    Plans are compiled once from the environments integrations export, see
+    :func:`compile_operations`, and can then be applied to any number of
+    launch environments.
+
+    '''
+
+    def __init__(self, operations):
+        '''Instantiate plan applying *operations* in order.
+
+        *operations* should be (action, variable, value) triples as returned
+        by :func:`compile_operations`.
+
+        '''
+        super(EnvironmentPlan, self).__init__()
+
+        self.operations = tuple(operations)
+
+    def apply(self, environment):
+        '''Apply operations to *environment* and return it.
+
+        Path list variables of *environment* are split once into
+        :class:`PathList` instances the operations are applied to, then
+        joined once at the end.
+
+        .. note::
+
+            The *environment* is modified in place.
+
+        '''
+        path_lists = {}
+
+        for action, variable, value in self.operations:
+            if action not in _PATH_ACTIONS:
+                path_lists.pop(variable, None)
+
+                if action == 'set':
+                    environment[variable] = value
+                else:
+                    environment.pop(variable, None)
+
+                continue
+
+            path_list = path_lists.get(variable)
+            if path_list is None:
+                current = environment.get(variable)
+
+                # Nothing to remove from variables unset or empty.
+                if action == 'pop' and not current:
+                    continue
+
+                path_list = PathList(current)
+                path_lists[variable] = path_list
+
+            if action == 'append':
+                path_list.extend(value)
+            elif action == 'prepend':
+                path_list.extend_first(value)
+            else:
+                path_list.remove(value)
+
+        for variable, path_list in path_lists.items():
+            environment[variable] = str(path_list)
+
+        return environment
+
+
+def get_environment_limits():
+    '''Return size limits of environments of processes started.
+
+    Return a pair of the maximum number of characters of a single
+    ``NAME=value`` entry and of the whole environment, either being None if
+    not limited or unknown on the current platform.
+
+    '''
+    if sys.platform == 'win32':
+        return 32767, None
+
+    variable_limit = None
+    if sys.platform.startswith('linux'):
+        # MAX_ARG_STRLEN, 32 pages of 4096 bytes.
+        variable_limit = 131072
+
+    try:
+        # Shared with the arguments of the command.
+        environment_limit = os.sysconf('SC_ARG_MAX')
+    except (AttributeError, ValueError, OSError):
+        environment_limit = None
+
+    if environment_limit is not None and environment_limit <= 0:
+        environment_limit = None
+
+    return variable_limit, environment_limit
+
+
+def check_environment(environment, ratio=ENVIRONMENT_WARNING_RATIO):
+    '''Return size of *environment* and report its largest variables.
+
+    The size is the number of characters of the ``NAME=value`` entries
+    including their terminators. The largest variables are logged, and a
+    warning is logged for each variable and for the whole environment
+    larger than *ratio* of the limits of :func:`get_environment_limits`.
+
+    '''
+    variable_limit, environment_limit = get_environment_limits()
+
+    sizes = dict(
+        (name, len(name) + len(value) + 2)
+        for name, value in environment.items()
+    )
+    size = sum(sizes.values())
+
+    largest = sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+    logger.debug(
+        'Environment size {} characters, largest variables {}'.format(
+            size, largest[:ENVIRONMENT_REPORT_SIZE]
+        )
+    )
+
+    if variable_limit is not None:
+        for name, variable_size in largest:
+            if variable_size <= variable_limit * ratio:
+                break
+
+            logger.warning(
+                'Environment variable {} is {} characters long, close to the '
+                'limit of {}.'.format(name, variable_size, variable_limit)
+            )
+
+    if environment_limit is not None and size > environment_limit * ratio:
+        logger.warning(
+            'Environment is {} characters long, close to the limit of {} '
+            'shared with the command arguments.'.format(
+                size, environment_limit
+            )
+        )
+
+    return size
@@ -0,0 +1,149 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import bisect
+import itertools
+
+from ftrack_application_launcher.version import Version
+
+#: Character sorting after any other, used to bound prefix searches.
+MAXIMUM_CHARACTER = chr(0x10FFFF)
+
+# Numbers snapshots in creation order.
+_versions = itertools.count(1)
+
+
+def get_version_key(version):
+    '''Return sort key of application *version*.
+
+    *version* may be a :class:`~ftrack_application_launcher.version.Version`
+    or any object whose string representation is a version.
+
+    '''
+    if isinstance(version, Version):
+        return version.key
+
+    return Version(str(version)).key
+
+
+class ApplicationIndex(object):
+    '''Immutable snapshot of applications with lookup indexes.
+
+    Applications are indexed by identifier for exact matches, by sorted
+    identifier for wildcard matches and by label sorted by version for
+    queries, so lookups do not scan the applications.
+
+    '''
+
+    def __init__(self, applications=()):
+        '''Instantiate snapshot of *applications*.'''
+        super(ApplicationIndex, self).__init__()
+
+        #: Applications in store order.
+        self.applications = tuple(applications)
+
+        #: Number identifying this snapshot, greater than the number of any
+        #: snapshot created before it.
+        self.version = next(_versions)
+
+        self._by_identifier = {}
+        for application in reversed(self.applications):
+            self._by_identifier[application['identifier']] = application
+
+        entries = sorted(
+            (application['identifier'], position)
+            for position, application in enumerate(self.applications)
+        )
+        self._identifiers = [identifier for identifier, _ in entries]
+        self._positions = [position for _, position in entries]
+        self._wildcards = {}
+
+        # Applications of each label sorted by increasing version, equal
+        # versions in reverse store order, so reading backwards gives the
+        # newest first in store order.
+        self._labels = {}
+        for position, application in enumerate(self.applications):
+            key = get_version_key(application['version'])
+            self._labels.setdefault(application['label'], []).append(
+                (key, -position, application)
+            )
+
+        self._keys = {}
+        for label, entries in self._labels.items():
+            entries.sort(key=lambda entry: entry[:2])
+            self._keys[label] = [key for key, _, _ in entries]
+
+    def get(self, identifier):
+        '''Return first application matching *identifier* or None.
+
+        *identifier* may end with a wildcard to match the first application
+        whose identifier starts with the rest of *identifier*.
+
+        '''
+        if not identifier.endswith('*'):
+            return self._by_identifier.get(identifier)
+
+        prefix = identifier[:-1]
+
+        try:
+            return self._wildcards[prefix]
+        except KeyError:
+            pass
+
+        # Identifiers starting with prefix are sorted together.
+        start = bisect.bisect_left(self._identifiers, prefix)
+        end = bisect.bisect_left(self._identifiers, prefix + MAXIMUM_CHARACTER)
+
+        application = None
+        if start < end:
+            application = self.applications[min(self._positions[start:end])]
+
+        self._wildcards[prefix] = application
+        return application
+
+    def find(
+        self,
+        label=None,
+        variant=None,
+        minimum_version=None,
+        maximum_version=None,
+    ):
+        '''Return applications matching criteria, newest first.
+
+        *label* and *variant* match exactly. Versions range from
+        *minimum_version* included to *maximum_version* excluded, either can
+        be a :class:`~ftrack_application_launcher.version.Version` or a
+        string.
+
+        '''
+        if label is not None:
+            labels = [label]
+        else:
+            labels = list(self._labels)
+
+        results = []
+        for label in labels:
+            keys = self._keys.get(label, [])
+
+            start = 0
+            if minimum_version is not None:
+                start = bisect.bisect_left(
+                    keys, get_version_key(minimum_version)
+                )
+
+            end = len(keys)
+            if maximum_version is not None:
+                end = bisect.bisect_left(
+                    keys, get_version_key(maximum_version)
+                )
+
+            results.extend(
+                entry
+                for entry in self._labels.get(label, [])[start:end]
+                if variant is None or entry[2]['variant'] == variant
+            )
+
+        if len(labels) > 1:
+            results.sort(key=lambda entry: entry[:2])
+
+        return [application for _, _, application in reversed(results)]
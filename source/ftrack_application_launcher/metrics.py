@@ -0,0 +1,89 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import time
+import functools
+import contextlib
+import collections
+
+
+#: Key of the seconds spent in a launch hook, in the integration it returns.
+ELAPSED_KEY = 'elapsed'
+
+
+class LaunchTimings(object):
+    '''Monotonic timings of the phases of an application launch.'''
+
+    def __init__(self, application):
+        '''Instantiate timings of the launch of *application* identifier.'''
+        super(LaunchTimings, self).__init__()
+
+        self.application = application
+
+        #: Seconds spent in each phase, in the order they ran.
+        self.phases = collections.OrderedDict()
+
+        self._start = time.monotonic()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        '''Record the time spent in the block as phase *name*.'''
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.monotonic() - start
+
+    def record_hooks(self, results):
+        '''Record time reported by each launch hook of *results*.
+
+        *results* should be the replies of the launch hooks. Integrations
+        reporting the time they took, see :func:`timed_hook`, are recorded
+        as phase ``launch_hooks.<name>``.
+
+        '''
+        for result in results:
+            integration = (result or {}).get('integration') or {}
+            elapsed = integration.get(ELAPSED_KEY)
+
+            if integration.get('name') and isinstance(elapsed, (int, float)):
+                self.phases[
+                    'launch_hooks.{}'.format(integration['name'])
+                ] = elapsed
+
+    def to_dict(self):
+        '''Return timings as a dictionary, the total being measured now.'''
+        return {
+            'application': self.application,
+            'phases': dict(self.phases),
+            'total': time.monotonic() - self._start,
+        }
+
+
+def timed_hook(callback):
+    '''Return launch hook *callback* reporting the time it takes.
+
+    The seconds spent in *callback* are added to the integration it returns
+    so that launchers can record them per integration::
+
+        session.event_hub.subscribe(
+            'topic=ftrack.connect.application.launch',
+            timed_hook(on_application_launch),
+        )
+
+    '''
+
+    @functools.wraps(callback)
+    def wrapper(*args, **kwargs):
+        start = time.monotonic()
+        result = callback(*args, **kwargs)
+        elapsed = time.monotonic() - start
+
+        if isinstance(result, dict) and isinstance(
+            result.get('integration'), dict
+        ):
+            result['integration'][ELAPSED_KEY] = elapsed
+
+        return result
+
+    return wrapper
@@ -0,0 +1,68 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import logging
+import threading
+
+
+#: Default number of seconds between two refreshes of the applications.
+DEFAULT_REFRESH_INTERVAL = 3600.0
+
+
+class PeriodicRefresh(object):
+    '''Call a refresh function periodically from a background thread.'''
+
+    def __init__(self, callback, interval=DEFAULT_REFRESH_INTERVAL):
+        '''Instantiate calling *callback* every *interval* seconds.
+
+        Raise :exc:`ValueError` if *interval* is not a positive number of
+        seconds.
+
+        '''
+        super(PeriodicRefresh, self).__init__()
+        self.logger = logging.getLogger(
+            __name__ + '.' + self.__class__.__name__
+        )
+
+        if not interval > 0:
+            raise ValueError(
+                'Refresh interval should be positive, got {}.'.format(
+                    interval
+                )
+            )
+
+        self.interval = interval
+
+        self._callback = callback
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        '''Start refreshing in a background thread.
+
+        Raise :exc:`RuntimeError` if refreshing has been stopped already.
+
+        '''
+        if self._stopped.is_set():
+            raise RuntimeError('Refresh can not be restarted once stopped.')
+
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run, name='ApplicationRefresh'
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        '''Stop refreshing, a refresh in progress is completed.'''
+        self._stopped.set()
+        self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self._callback()
+            except Exception:
+                self.logger.exception('Could not refresh applications.')
@@ -0,0 +1,806 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import re
+import stat
+import time
+import logging
+import functools
+import threading
+import queue
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+
+logger = logging.getLogger(__name__)
+
+#: Characters with a special meaning in regular expressions. Segments without
+#: any of them are literals which can be resolved without listing their
+#: parent directory.
+REGULAR_EXPRESSION_CHARACTERS = frozenset('.^$*+?{}[]\\|()')
+
+#: Platforms whose filesystems are usually case insensitive, where literals
+#: resolved without listing their parent directory may match an entry with a
+#: different case.
+CASE_INSENSITIVE_PLATFORMS = ('windows', 'darwin')
+
+#: Default number of seconds allowed to search below each root, so a hung
+#: network mount can not stall discovery indefinitely.
+DEFAULT_ROOT_BUDGET = 60.0
+
+#: Number of seconds between two checks of the time budgets while waiting
+#: for directories to be listed.
+BUDGET_CHECK_INTERVAL = 0.1
+
+
+def is_literal(pattern):
+    '''Return whether *pattern* can only match an entry named *pattern*.'''
+    return not REGULAR_EXPRESSION_CHARACTERS.intersection(pattern)
+
+
+def is_within(path, location):
+    '''Return whether *path* is *location* or one of its descendants.'''
+    if path == location:
+        return True
+
+    if not location.endswith(os.sep):
+        location += os.sep
+
+    return path.startswith(location)
+
+
+def normalise_root(root, current_os):
+    '''Return *root* search segment usable as a path on *current_os*.'''
+    if current_os == 'windows':
+        # On Windows C: means current directory so convert roots that look
+        # like drive letters to the C:\ format.
+        if root and root[-1] == ':':
+            root += '\\'
+
+    return root
+
+
+def get_version_offset(expression, current_os):
+    '''Return position from which paths matching *expression* hold versions.
+
+    The root and the following literal segments without digits are the same
+    for every path found with *expression* and can not hold the version of an
+    application, version expressions can be applied after them.
+
+    '''
+    pieces = []
+    for position, piece in enumerate(expression[:-1]):
+        if position == 0:
+            piece = normalise_root(piece, current_os)
+        elif not is_literal(piece):
+            break
+
+        if any(character.isdigit() for character in piece):
+            break
+
+        pieces.append(piece)
+
+    if not pieces:
+        return 0
+
+    return len(os.path.join(*pieces))
+
+
+class SearchNode(object):
+    '''Node of a :class:`SearchTree` matching a single path segment.'''
+
+    def __init__(self, pattern=None):
+        '''Instantiate node matching entries against *pattern*.
+
+        Root nodes have no *pattern* as they match a path on disk directly.
+
+        Patterns without regular expression syntax are treated as literals
+        and only match an entry with the exact same name.
+
+        '''
+        super(SearchNode, self).__init__()
+        self.pattern = pattern
+        self.matcher = None
+        self.literal = None
+
+        if pattern is not None:
+            if is_literal(pattern):
+                self.literal = pattern
+            else:
+                self.matcher = re.compile(pattern)
+
+        #: Child nodes keyed by pattern.
+        self.children = {}
+
+        #: Child nodes matching entries against a regular expression, and
+        #: child nodes matching a literal name.
+        self.patterns = []
+        self.literals = []
+
+        #: Expressions whose last segment is matched by this node.
+        self.terminals = []
+
+        #: Expressions whose last segment is matched by a child of this node.
+        self.leaf_expressions = []
+
+        #: Expressions descending further than the children of this node.
+        self.through_expressions = []
+
+
+class SearchTree(object):
+    '''Merge search expressions so shared directories are only listed once.
+
+    Each expression is a list of segments as accepted by
+    :meth:`~ftrack_application_launcher.ApplicationStore._search_filesystem`.
+    Expressions starting with the same segments share the same nodes, the
+    filesystem is then walked once for all of them and matches are
+    dispatched to the expressions ending at the matching node.
+
+    '''
+
+    def __init__(self, current_os):
+        '''Instantiate empty tree for *current_os*.'''
+        super(SearchTree, self).__init__()
+        self.current_os = current_os
+        self.roots = {}
+        self.expressions = []
+        self.budgets = []
+
+    def add(self, expression, budget=None):
+        '''Add *expression* to the tree and return its index.
+
+        *budget* may be given as the number of seconds allowed to search
+        *expression*, see :meth:`walk`.
+
+        '''
+        index = len(self.expressions)
+        self.expressions.append(expression)
+        self.budgets.append(budget)
+
+        pieces = list(expression)
+        root = normalise_root(pieces.pop(0), self.current_os)
+
+        node = self.roots.setdefault(root, SearchNode())
+        for position, piece in enumerate(pieces):
+            if position == len(pieces) - 1:
+                node.leaf_expressions.append(index)
+            else:
+                node.through_expressions.append(index)
+
+            child = node.children.get(piece)
+            if child is None:
+                child = node.children[piece] = SearchNode(piece)
+
+                if child.literal is None:
+                    node.patterns.append(child)
+                else:
+                    node.literals.append(child)
+
+            node = child
+
+        if pieces:
+            node.terminals.append(index)
+
+        return index
+
+    def walk(self, max_workers=None, tasks=None, root_budget=None):
+        '''Walk the filesystem and return results for each expression.
+
+        Return a list of results indexed by expression, each one a mapping
+        holding the matching *paths*, the signature of each intermediate
+        *directories* traversed and the *installs* directories with their
+        matched entries, as expected by
+        :meth:`~ftrack_application_launcher.cache.DiscoveryCache.set`. Each
+        result also holds whether the search was *complete*.
+
+        Directories are listed concurrently on up to *max_workers* threads,
+        if not given the :class:`~concurrent.futures.ThreadPoolExecutor`
+        default is used. A value of 1 or lower walks the filesystem in the
+        calling thread.
+
+        *tasks* may be given as a list of (location, nodes) tuples to only
+        walk the subtrees below *location*, by default the whole tree is
+        walked from its roots.
+
+        *root_budget* may be given as the number of seconds allowed to search
+        below each root, on top of the budget of each expression given to
+        :meth:`add`. Roots are searched concurrently so all budgets start with
+        the walk. Once the budget of an expression is spent, its remaining
+        directories are skipped and its result is flagged as incomplete.
+        Directories still being listed by worker threads, for example on a
+        hung network mount, are abandoned rather than waited for, and do not
+        prevent the interpreter from exiting either. When
+        walking in the calling thread, budgets are only checked between
+        directories.
+
+        Symbolic links are followed, directories linking back to one of
+        their parents are skipped to break cycles.
+
+        '''
+        results = [
+            {'paths': [], 'directories': {}, 'installs': {}, 'complete': True}
+            for _ in self.expressions
+        ]
+
+        if tasks is None:
+            tasks = [(root, [node]) for root, node in self.roots.items()]
+
+        budget = _Budget(self, root_budget)
+        tasks = budget.filter(
+            [
+                (location, nodes, frozenset(), None)
+                for location, nodes in tasks
+            ],
+            results,
+        )
+
+        if max_workers is not None and max_workers <= 1:
+            while tasks:
+                task = tasks.pop()
+                visit = self._visit(*task)
+                tasks.extend(
+                    budget.filter(self._merge(results, task, visit), results)
+                )
+
+        else:
+            executor = _DaemonExecutor(
+                max_workers=max_workers,
+                thread_name_prefix='ApplicationDiscovery',
+            )
+            futures = dict(
+                (executor.submit(self._visit, *task), task) for task in tasks
+            )
+
+            try:
+                while futures:
+                    done, _ = wait(
+                        futures,
+                        timeout=budget.timeout,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        task = futures.pop(future)
+                        for child in budget.filter(
+                            self._merge(results, task, future.result()),
+                            results,
+                        ):
+                            futures[executor.submit(self._visit, *child)] = (
+                                child
+                            )
+
+                    if not budget.is_expired():
+                        continue
+
+                    for future, task in list(futures.items()):
+                        if budget.is_spent(task):
+                            future.cancel()
+                            del futures[future]
+                            budget.abandon(task, results)
+
+            finally:
+                # Do not wait for abandoned directories to be listed.
+                executor.shutdown(wait=False)
+
+        for result in results:
+            result['paths'].sort()
+
+        return results
+
+    def get_node(self, index, location):
+        '''Return node of expression *index* matching directory *location*.
+
+        *location* should be a directory traversed when searching the
+        expression, as recorded in its results. Return None if *location* is
+        not part of the expression search.
+
+        '''
+        pieces = list(self.expressions[index])
+        root = normalise_root(pieces.pop(0), self.current_os)
+
+        relative_path = os.path.relpath(location, root)
+        if relative_path == os.curdir:
+            depth = 0
+        elif relative_path.startswith(os.pardir):
+            return None
+        else:
+            depth = len(relative_path.split(os.sep))
+
+        if depth > len(pieces):
+            return None
+
+        node = self.roots[root]
+        for piece in pieces[:depth]:
+            node = node.children[piece]
+
+        return node
+
+    def _visit(self, location, nodes, parents, result=None):
+        '''List *location* and match its entries against children of *nodes*.
+
+        Literal segments are resolved with a single stat of the expected
+        path, *location* is only listed when at least one segment is a
+        pattern. Listed entries are only classified when they match a segment
+        which has to be descended into, using the type information returned
+        by :func:`os.scandir` to avoid additional stat calls. Entries
+        matching the last segment of an expression are accepted whatever
+        their type.
+
+        *parents* should be the identities of the directories traversed to
+        reach *location*, as (device, inode) tuples. Nothing is matched if
+        *location* is one of them.
+
+        *result* may be given as the :func:`os.stat` result of *location* if
+        known already, as when it was resolved as a literal segment.
+
+        Return a tuple of the directories to descend into with their nodes
+        and :func:`os.stat` result if known, the signature of *location*, the
+        names matched for each expression ending at this level and the
+        identity of *location*.
+
+        '''
+        if result is None:
+            try:
+                result = os.stat(location)
+            except OSError:
+                pass
+
+        if result is None:
+            signature = identity = None
+        else:
+            # Same signature as returned by stat_directory.
+            signature = [result.st_mtime_ns, result.st_ino]
+            identity = (result.st_dev, result.st_ino)
+
+            # Some filesystems do not provide inodes.
+            if not result.st_ino:
+                identity = None
+
+        if identity is not None and identity in parents:
+            logger.debug(
+                'Skipping {} as it links back to one of its parents.'.format(
+                    location
+                )
+            )
+            return [], signature, {}, identity
+
+        if len(nodes) == 1:
+            patterns = nodes[0].patterns
+            literals = nodes[0].literals
+        else:
+            patterns = [child for node in nodes for child in node.patterns]
+            literals = [child for node in nodes for child in node.literals]
+
+        matches = {}
+        descend = {}
+
+        # Results of literal entries, reused when descending into them.
+        results = {}
+
+        entries = []
+        if patterns:
+            try:
+                with os.scandir(location) as iterator:
+                    entries = list(iterator)
+            except OSError as error:
+                logger.debug('Could not list {}: {}'.format(location, error))
+
+        for child in patterns:
+            for entry in entries:
+                if child.matcher.match(entry.name):
+                    self._accept(
+                        child, entry.name, entry.path, entry, matches, descend
+                    )
+
+        # Only accept literals named with the same case as the entry, as the
+        # filesystem search used to.
+        names = None
+        if literals and self.current_os in CASE_INSENSITIVE_PLATFORMS:
+            if patterns:
+                names = set(entry.name for entry in entries)
+            else:
+                try:
+                    names = set(os.listdir(location))
+                except OSError as error:
+                    logger.debug(
+                        'Could not list {}: {}'.format(location, error)
+                    )
+                    names = set()
+
+        for child in literals:
+            if names is not None and child.literal not in names:
+                continue
+
+            path = os.path.join(location, child.literal)
+
+            try:
+                entry = results[path] = os.stat(path)
+            except OSError:
+                continue
+
+            self._accept(child, child.literal, path, entry, matches, descend)
+
+        return (
+            [
+                (path, children, results.get(path))
+                for path, children in descend.items()
+            ],
+            signature,
+            matches,
+            identity,
+        )
+
+    def _accept(self, child, name, path, entry, matches, descend):
+        '''Record entry *name* at *path* matched by *child*.
+
+        *entry* should be the :class:`os.DirEntry` or :func:`os.stat` result
+        for *path*, only used to find out whether it is a directory when
+        *child* has to be descended into.
+
+        '''
+        # Note that on OSX executable might equate to a folder (.app) so
+        # directories are not filtered out here.
+        for index in child.terminals:
+            matches.setdefault(index, []).append(name)
+
+        if not child.children:
+            return
+
+        # Follow links to directories as os.walk(followlinks=True) used to.
+        if isinstance(entry, os.stat_result):
+            is_directory = stat.S_ISDIR(entry.st_mode)
+        else:
+            try:
+                is_directory = entry.is_dir()
+            except OSError:
+                return
+
+        if is_directory:
+            descend.setdefault(path, []).append(child)
+
+    def _merge(self, results, task, visit):
+        '''Merge *visit* of *task* into *results*.
+
+        Return the tasks to schedule for the directories to descend into.
+
+        '''
+        location, nodes, parents, _ = task
+        children, signature, matches, identity = visit
+
+        for node in nodes:
+            for index in node.through_expressions:
+                results[index]['directories'][location] = signature
+
+            # Record directories without matches too so executables installed
+            # later are picked up when re-validating the cache.
+            for index in node.leaf_expressions:
+                results[index]['installs'][location] = {
+                    'signature': signature,
+                    'names': matches.get(index, []),
+                }
+
+        for index, names in matches.items():
+            results[index]['paths'].extend(
+                os.path.join(location, name) for name in names
+            )
+
+        if identity is not None:
+            parents = parents.union([identity])
+
+        return [
+            (path, descend, parents, result)
+            for path, descend, result in children
+        ]
+
+
+class _Budget(object):
+    '''Track time budgets of the expressions of a :class:`SearchTree` walk.'''
+
+    def __init__(self, tree, root_budget=None):
+        '''Instantiate for a walk of *tree* limited to *root_budget*.'''
+        super(_Budget, self).__init__()
+        started = time.monotonic()
+
+        #: Deadline of each expression, None if unlimited.
+        self.deadlines = []
+        for budget in tree.budgets:
+            budgets = [
+                value for value in (budget, root_budget) if value is not None
+            ]
+            self.deadlines.append(started + min(budgets) if budgets else None)
+
+        #: Number of seconds to wait for before checking budgets again, None
+        #: if no budget applies.
+        self.timeout = None
+        if any(deadline is not None for deadline in self.deadlines):
+            self.timeout = BUDGET_CHECK_INTERVAL
+
+    def is_expired(self):
+        '''Return whether the budget of any expression is spent.'''
+        if self.timeout is None:
+            return False
+
+        return time.monotonic() > min(
+            deadline for deadline in self.deadlines if deadline is not None
+        )
+
+    def _is_spent(self, index, now):
+        deadline = self.deadlines[index]
+        return deadline is not None and now > deadline
+
+    def is_spent(self, task):
+        '''Return whether budgets of all expressions of *task* are spent.'''
+        if self.timeout is None:
+            return False
+
+        now = time.monotonic()
+        return all(
+            self._is_spent(index, now)
+            for node in task[1]
+            for index in _get_expressions(node)
+        )
+
+    def abandon(self, task, results):
+        '''Flag expressions of *task* as incomplete in *results*.'''
+        for node in task[1]:
+            for index in _get_expressions(node):
+                results[index]['complete'] = False
+
+    def filter(self, tasks, results):
+        '''Return *tasks* without nodes whose expressions ran out of time.
+
+        Expressions whose nodes are dropped are flagged as incomplete in
+        *results*.
+
+        '''
+        if self.timeout is None:
+            return tasks
+
+        now = time.monotonic()
+        filtered = []
+
+        for location, nodes, parents, result in tasks:
+            remaining = []
+            for node in nodes:
+                expressions = _get_expressions(node)
+                if all(self._is_spent(index, now) for index in expressions):
+                    for index in expressions:
+                        results[index]['complete'] = False
+                else:
+                    remaining.append(node)
+
+            if remaining:
+                filtered.append((location, remaining, parents, result))
+
+        return filtered
+
+
+class _DaemonExecutor(Executor):
+    '''Run calls on a pool of daemon threads.
+
+    Unlike :class:`~concurrent.futures.ThreadPoolExecutor`, whose threads
+    are joined when the interpreter exits, threads blocked listing a hung
+    network mount do not prevent the interpreter from exiting.
+
+    '''
+
+    def __init__(self, max_workers=None, thread_name_prefix=''):
+        '''Instantiate pool of up to *max_workers* threads.
+
+        Threads are started as calls are submitted and named after
+        *thread_name_prefix*.
+
+        '''
+        super(_DaemonExecutor, self).__init__()
+
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+
+        self._queue = queue.SimpleQueue()
+        self._idle = threading.Semaphore(0)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+
+    def submit(self, function, *args, **kwargs):
+        '''Schedule *function* to be called with *args* and *kwargs*.
+
+        Return :class:`~concurrent.futures.Future` of the call. Raise
+        :exc:`RuntimeError` if the executor was shut down.
+
+        '''
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError('Can not submit calls after shutdown.')
+
+            future = Future()
+            self._queue.put((future, function, args, kwargs))
+
+            if (
+                not self._idle.acquire(blocking=False)
+                and len(self._threads) < self.max_workers
+            ):
+                thread = threading.Thread(
+                    target=self._work,
+                    name='{}_{}'.format(
+                        self.thread_name_prefix, len(self._threads)
+                    ),
+                )
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+            return future
+
+    def shutdown(self, wait=True):
+        '''Stop threads once the calls submitted are done.
+
+        Wait for the threads to exit if *wait* is True.
+
+        '''
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+
+            for _ in threads:
+                self._queue.put(None)
+
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            future, function, args, kwargs = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = function(*args, **kwargs)
+                except BaseException as error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+                    result = None
+
+            # Do not keep the last call alive while idle.
+            item = future = function = args = kwargs = None
+
+            self._idle.release()
+
+
+def _get_expressions(node):
+    '''Return indices of expressions searched when visiting *node*.'''
+    return node.leaf_expressions + node.through_expressions
+
+
+def _rescan(pattern, current_os, directory):
+    '''Return names in *directory* on *current_os* matching *pattern*.'''
+    literal = is_literal(pattern)
+
+    if literal and current_os not in CASE_INSENSITIVE_PLATFORMS:
+        if os.path.exists(os.path.join(directory, pattern)):
+            return [pattern]
+
+        return []
+
+    try:
+        with os.scandir(directory) as iterator:
+            names = [entry.name for entry in iterator]
+    except OSError:
+        return []
+
+    if literal:
+        # Listed names keep their case, unlike paths checked for existence.
+        return [name for name in names if name == pattern]
+
+    matcher = re.compile(pattern)
+    return [name for name in names if matcher.match(name)]
+
+
+def search(
+    expressions,
+    current_os,
+    discovery_cache=None,
+    max_workers=None,
+    budgets=None,
+    root_budget=None,
+):
+    '''Return search results for each of *expressions*.
+
+    *expressions* should be a list of search expressions as accepted by
+    :meth:`~ftrack_application_launcher.ApplicationStore._search_filesystem`.
+    All expressions not found in *discovery_cache* are searched with a single
+    :class:`SearchTree` walk, using up to *max_workers* threads.
+
+    *budgets* may be given as a list holding the number of seconds allowed to
+    search each expression, or None for no limit, and *root_budget* as the
+    number of seconds allowed to search below each root. Expressions which
+    could not be searched in time are logged and their partial results are
+    returned without being cached.
+
+    Each result is a mapping as returned by :meth:`SearchTree.walk`.
+
+    Raise :exc:`ValueError` if the first segment of an expression does not
+    exist on disk.
+
+    '''
+    results = [None] * len(expressions)
+    tree = SearchTree(current_os)
+    pending = []
+
+    if budgets is None:
+        budgets = [None] * len(expressions)
+
+    for position, expression in enumerate(expressions):
+        if not os.path.exists(normalise_root(expression[0], current_os)):
+            raise ValueError(
+                'First part "{0}" of expression "{1}" must match exactly to an '
+                'existing entry on the filesystem.'.format(
+                    expression[0], expression
+                )
+            )
+
+        key = None
+        if discovery_cache is not None and len(expression) > 1:
+            key = discovery_cache.make_key(expression, current_os)
+            results[position] = discovery_cache.get(
+                key, functools.partial(_rescan, expression[-1], current_os)
+            )
+
+        if results[position] is None:
+            index = tree.add(expression, budgets[position])
+            pending.append((position, index, key))
+        else:
+            results[position]['paths'].sort()
+            results[position]['complete'] = True
+
+    if pending:
+        walked = tree.walk(max_workers, root_budget=root_budget)
+
+        for position, index, key in pending:
+            result = results[position] = walked[index]
+
+            if not result['complete']:
+                logger.warning(
+                    'Search of {} did not complete in time, using the {} '
+                    'applications found so far.'.format(
+                        expressions[position], len(result['paths'])
+                    )
+                )
+
+            elif key is not None:
+                discovery_cache.set(
+                    key, result['directories'], result['installs']
+                )
+
+    return results
+
+
+def find_executables(
+    expressions,
+    current_os,
+    discovery_cache=None,
+    max_workers=None,
+    budgets=None,
+    root_budget=None,
+):
+    '''Return list of matching executable paths for each of *expressions*.
+
+    Arguments are documented in :func:`search`.
+
+    '''
+    return [
+        result['paths']
+        for result in search(
+            expressions,
+            current_os,
+            discovery_cache=discovery_cache,
+            max_workers=max_workers,
+            budgets=budgets,
+            root_budget=root_budget,
+        )
+    ]
@@ -0,0 +1,115 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import re
+
+
+#: Expression splitting version strings into components, the same way as
+#: :class:`distutils.version.LooseVersion`.
+COMPONENT_EXPRESSION = re.compile(r'(\d+|[a-z]+|\.)')
+
+# Rank of component types at the same position, numbers sort after names so
+# 2023 is newer than v2b1.
+_NAME = 0
+_NUMBER = 1
+
+
+class Version(object):
+    '''Application version parsed once into a tuple sort key.
+
+    *vstring* is split into numeric and alphabetic components like
+    :class:`distutils.version.LooseVersion`, and versions compare the same
+    way, except that mixed components such as 2023 and v2b1 can be compared
+    as well: numbers are newer than names at the same position.
+
+    '''
+
+    __slots__ = ('vstring', 'version', 'key')
+
+    def __init__(self, vstring):
+        '''Instantiate from version string *vstring*.'''
+        super(Version, self).__init__()
+        self.vstring = vstring
+
+        components = []
+        key = []
+
+        for component in COMPONENT_EXPRESSION.split(vstring):
+            if not component or component == '.':
+                continue
+
+            try:
+                component = int(component)
+            except ValueError:
+                key.append((_NAME, component))
+            else:
+                key.append((_NUMBER, component))
+
+            components.append(component)
+
+        #: Components of the version, as LooseVersion.version.
+        self.version = tuple(components)
+
+        #: Tuple to sort versions with.
+        self.key = tuple(key)
+
+    def __str__(self):
+        return self.vstring
+
+    def __repr__(self):
+        return "{}('{}')".format(self.__class__.__name__, self.vstring)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def _get_key(self, other):
+        '''Return key of *other* version or None if it is not comparable.'''
+        if isinstance(other, Version):
+            return other.key
+
+        if isinstance(other, str):
+            return Version(other).key
+
+        return None
+
+    def __eq__(self, other):
+        key = self._get_key(other)
+        if key is None:
+            return NotImplemented
+
+        return self.key == key
+
+    def __ne__(self, other):
+        key = self._get_key(other)
+        if key is None:
+            return NotImplemented
+
+        return self.key != key
+
+    def __lt__(self, other):
+        key = self._get_key(other)
+        if key is None:
+            return NotImplemented
+
+        return self.key < key
+
+    def __le__(self, other):
+        key = self._get_key(other)
+        if key is None:
+            return NotImplemented
+
+        return self.key <= key
+
+    def __gt__(self, other):
+        key = self._get_key(other)
+        if key is None:
+            return NotImplemented
+
+        return self.key > key
+
+    def __ge__(self, other):
+        key = self._get_key(other)
+        if key is None:
+            return NotImplemented
+
+        return self.key >= key
@@ -0,0 +1,342 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import sys
+import errno
+import select
+import struct
+import logging
+import threading
+import ctypes
+import ctypes.util
+
+from ftrack_application_launcher.cache import stat_directory
+
+logger = logging.getLogger(__name__)
+
+#: Default number of seconds between two polls of the watched directories.
+DEFAULT_POLL_INTERVAL = 60.0
+
+#: Number of seconds without events to wait for before reporting changes, so
+#: installers writing many entries trigger a single rescan.
+DEFAULT_SETTLE_DELAY = 2.0
+
+# inotify constants, see inotify(7).
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+IN_WATCH_MASK = (
+    IN_ATTRIB
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class PollingWatcher(object):
+    '''Watch directories for changes by polling their signature.
+
+    *callback* is called from the watcher thread with the set of directories
+    which changed.
+
+    '''
+
+    def __init__(self, callback, interval=DEFAULT_POLL_INTERVAL):
+        '''Instantiate watcher calling *callback* on changes.
+
+        Watched directories are checked every *interval* seconds.
+
+        '''
+        super(PollingWatcher, self).__init__()
+        self.logger = logging.getLogger(
+            __name__ + '.' + self.__class__.__name__
+        )
+
+        self.interval = interval
+
+        self._callback = callback
+        self._lock = threading.RLock()
+        self._paths = set()
+        self._polled = {}
+        self._pending = set()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def set_paths(self, signatures):
+        '''Watch directories in *signatures*, stop watching any other.
+
+        *signatures* should be a mapping of directory paths to the signature
+        recorded when they were last searched, as returned by
+        :func:`~ftrack_application_launcher.cache.stat_directory`.
+        Directories which changed since then are reported on the next check.
+
+        '''
+        with self._lock:
+            for path in self._paths.difference(signatures):
+                self._remove_watch(path)
+                self._polled.pop(path, None)
+
+            for path, signature in signatures.items():
+                if path in self._polled:
+                    self._polled[path] = signature
+
+                elif path not in self._paths and not self._add_watch(path):
+                    self._polled[path] = signature
+
+                if stat_directory(path) != signature:
+                    self._pending.add(path)
+
+            self._paths = set(signatures)
+
+    def start(self):
+        '''Start watching in a background thread.
+
+        Raise :exc:`RuntimeError` if the watcher has been stopped already.
+
+        '''
+        if self._stopped.is_set():
+            raise RuntimeError('Watcher can not be restarted once stopped.')
+
+        if self._thread is not None:
+            return
+
+        self._thread = threading.Thread(
+            target=self._run, name='ApplicationWatcher'
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        '''Stop watching.
+
+        The background thread exits at the latest on its next check.
+
+        '''
+        self._stopped.set()
+        self._thread = None
+
+    def _add_watch(self, path):
+        '''Start watching *path*, return False if it should be polled.'''
+        return False
+
+    def _remove_watch(self, path):
+        '''Stop watching *path*.'''
+
+    def _run(self):
+        while not self._stopped.is_set():
+            changed = self._wait()
+
+            if changed and not self._stopped.is_set():
+                try:
+                    self._callback(changed)
+                except Exception:
+                    self.logger.exception(
+                        'Could not handle changes in {}'.format(changed)
+                    )
+
+    def _wait(self):
+        '''Return set of changed directories after waiting for changes.'''
+        self._stopped.wait(self.interval)
+        return self._poll()
+
+    def _poll(self):
+        '''Return set of changed directories, including pending ones.'''
+        with self._lock:
+            changed = self._pending
+            self._pending = set()
+            polled = list(self._polled.items())
+
+        for path, signature in polled:
+            current = stat_directory(path)
+            if current != signature:
+                changed.add(path)
+
+                with self._lock:
+                    if path in self._polled:
+                        self._polled[path] = current
+
+        return changed
+
+
+class InotifyWatcher(PollingWatcher):
+    '''Watch directories for changes using Linux inotify.
+
+    Directories which can not be watched, for example once the user watch
+    limit is reached, are polled instead.
+
+    '''
+
+    def __init__(
+        self,
+        callback,
+        interval=DEFAULT_POLL_INTERVAL,
+        settle_delay=DEFAULT_SETTLE_DELAY,
+    ):
+        '''Instantiate watcher calling *callback* on changes.
+
+        Changes are reported once no events have been received for
+        *settle_delay* seconds. Directories which could not be watched are
+        polled every *interval* seconds.
+
+        Raise :exc:`OSError` if inotify is not available.
+
+        '''
+        super(InotifyWatcher, self).__init__(callback, interval=interval)
+        self.settle_delay = settle_delay
+
+        self._libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6', use_errno=True
+        )
+
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        self._descriptors = {}
+        self._watches = {}
+
+    def stop(self):
+        '''Stop watching.
+
+        The inotify descriptor is closed by the background thread when it
+        exits, or right away if the watcher was never started.
+
+        '''
+        started = self._thread is not None
+        super(InotifyWatcher, self).stop()
+
+        if not started:
+            self._close()
+
+    def _close(self):
+        '''Close inotify descriptor, if not closed already.'''
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+    def _add_watch(self, path):
+        if self._fd is None:
+            return False
+
+        descriptor = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), IN_WATCH_MASK
+        )
+        if descriptor < 0:
+            error = ctypes.get_errno()
+            self.logger.debug(
+                'Polling {} as it could not be watched: {}'.format(
+                    path, os.strerror(error)
+                )
+            )
+            return False
+
+        self._descriptors[descriptor] = path
+        self._watches[path] = descriptor
+        return True
+
+    def _remove_watch(self, path):
+        descriptor = self._watches.pop(path, None)
+        if descriptor is not None:
+            self._descriptors.pop(descriptor, None)
+
+            if self._fd is not None:
+                self._libc.inotify_rm_watch(self._fd, descriptor)
+
+    def _run(self):
+        try:
+            super(InotifyWatcher, self)._run()
+        finally:
+            self._close()
+
+    def _wait(self):
+        changed = set()
+
+        timeout = self.interval
+        while not self._stopped.is_set():
+            readable, _, _ = select.select([self._fd], [], [], timeout)
+            if not readable:
+                break
+
+            changed.update(self._read_events())
+
+            # Wait for the filesystem to settle before reporting changes.
+            timeout = self.settle_delay
+
+        changed.update(self._poll())
+        return changed
+
+    def _read_events(self):
+        '''Return set of directories changed according to pending events.'''
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except OSError as error:
+            if error.errno in (errno.EAGAIN, errno.EINTR):
+                return set()
+            raise
+
+        changed = set()
+        offset = 0
+
+        with self._lock:
+            while offset < len(data):
+                descriptor, mask, _, length = INOTIFY_EVENT.unpack_from(
+                    data, offset
+                )
+                offset += INOTIFY_EVENT.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost, consider everything changed.
+                    changed.update(self._paths)
+                    continue
+
+                path = self._descriptors.get(descriptor)
+                if path is None:
+                    continue
+
+                changed.add(path)
+
+                if mask & IN_IGNORED:
+                    # Watch removed by the kernel, directory deleted or
+                    # unmounted.
+                    self._descriptors.pop(descriptor, None)
+                    self._watches.pop(path, None)
+                    self._paths.discard(path)
+
+        return changed
+
+
+def create_watcher(callback, interval=DEFAULT_POLL_INTERVAL):
+    '''Return watcher calling *callback* with changed directories.
+
+    Use :class:`InotifyWatcher` on Linux when available and fall back to
+    :class:`PollingWatcher` checking directories every *interval* seconds.
+
+    '''
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(callback, interval=interval)
+        except (OSError, AttributeError) as error:
+            logger.debug(
+                'Inotify not available, falling back to polling: {}'.format(
+                    error
+                )
+            )
+
+    return PollingWatcher(callback, interval=interval)
@@ -0,0 +1,71 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import platform
+
+import pytest
+
+
+def touch(path):
+    '''Create empty file at *path*, creating its directory if needed.'''
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    open(path, 'w').close()
+
+
+@pytest.fixture()
+def current_os():
+    '''Return name of the current platform as used by the launcher.'''
+    return platform.system().lower()
+
+
+@pytest.fixture()
+def install_root(tmp_path):
+    '''Return root of a synthetic tree of installed applications.
+
+    Installs are laid out as::
+
+        <root>/Program Files/Autodesk/Maya<version>/bin/maya.exe
+        <root>/Program Files (x86)/Autodesk/Maya2019/bin/maya.exe
+        <root>/Program Files/Vendor<index>/App/lib<index>.dll
+
+    together with files and directories which should not match.
+
+    '''
+    root = str(tmp_path)
+    program_files = os.path.join(root, 'Program Files')
+
+    for version in ('2022', '2023', '2024'):
+        directory = os.path.join(
+            program_files, 'Autodesk', 'Maya{}'.format(version), 'bin'
+        )
+        touch(os.path.join(directory, 'maya.exe'))
+        touch(os.path.join(directory, 'mayapy.exe'))
+        touch(os.path.join(directory, 'plugin.dll'))
+
+    touch(
+        os.path.join(
+            root,
+            'Program Files (x86)',
+            'Autodesk',
+            'Maya2019',
+            'bin',
+            'maya.exe',
+        )
+    )
+
+    # Not matching any expression.
+    touch(os.path.join(program_files, 'Autodesk', 'readme.txt'))
+    touch(os.path.join(program_files, 'Autodesk', 'Mudbox2024', 'mudbox.exe'))
+    touch(os.path.join(root, 'Other', 'Autodesk', 'Maya2020', 'bin', 'x'))
+
+    for index in range(5):
+        vendor = os.path.join(program_files, 'Vendor{}'.format(index))
+        touch(os.path.join(vendor, 'App', 'lib{}.dll'.format(index)))
+        touch(os.path.join(vendor, 'App', 'readme.txt'))
+        touch(os.path.join(vendor, 'notes.txt'))
+
+    return root
@@ -0,0 +1,62 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import gc
+import json
+import pickle
+
+import ftrack_application_launcher.application
+from ftrack_application_launcher.application import (
+    Application,
+    share_integrations,
+)
+
+
+def make_record(version, integrations):
+    '''Return record of maya *version* using *integrations*.'''
+    return Application(
+        'maya_{}'.format(version),
+        '/usr/autodesk/maya{}/bin/maya'.format(version),
+        version=version,
+        label='Maya',
+        integrations=integrations,
+    )
+
+
+def test_share_identical_integrations():
+    '''Reference a single map for identical integrations.'''
+    first = make_record(2023, {'legacy': ['ftrack-connect-maya']})
+    second = make_record(2024, {'legacy': ['ftrack-connect-maya']})
+    other = make_record(2024, {'legacy': ['ftrack-connect-nuke']})
+
+    assert first['integrations'] is second['integrations']
+    assert first['integrations'] == {'legacy': ['ftrack-connect-maya']}
+    assert other['integrations'] is not first['integrations']
+
+
+def test_shared_integrations_released():
+    '''Drop shared maps once no record references them.'''
+    shared = ftrack_application_launcher.application._integrations
+    integrations = {'released': ['ftrack-connect-released']}
+
+    records = [make_record(version, integrations) for version in range(10)]
+    count = len(shared)
+
+    del records
+    gc.collect()
+
+    assert len(shared) == count - 1
+
+
+def test_shared_integrations_usable_as_mapping():
+    '''Serialise shared maps as the dictionaries they replace.'''
+    integrations = share_integrations({'legacy': ['ftrack-connect-maya']})
+
+    assert json.loads(json.dumps(integrations)) == integrations
+    assert share_integrations(None) == {}
+
+    record = make_record(2024, integrations)
+    copy = pickle.loads(pickle.dumps(record))
+
+    assert copy == record
+    assert copy['integrations'] is integrations
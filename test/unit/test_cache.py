@@ -0,0 +1,242 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import types
+
+import pytest
+
+import ftrack_application_launcher.cache
+from ftrack_application_launcher.cache import DiscoveryCache, ExpiringCache
+from ftrack_application_launcher.search import search
+
+
+#: Expression searched below the root of the synthetic tree.
+EXPRESSION = ['Program Files', 'Autodesk', 'Maya.+', 'bin', 'maya.exe']
+
+
+@pytest.fixture()
+def discovery_cache(tmp_path_factory):
+    '''Return empty discovery cache stored in a temporary directory.
+
+    The directory is distinct from the tree searched so saving the cache does
+    not change the directories it holds signatures of.
+
+    '''
+    return DiscoveryCache(
+        str(tmp_path_factory.mktemp('cache') / 'discovery.json')
+    )
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    '''Return clock controlling the expiry of :class:`ExpiringCache`.'''
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        ftrack_application_launcher.cache,
+        'time',
+        types.SimpleNamespace(monotonic=lambda: clock.now),
+    )
+
+    return clock
+
+
+def change_directory(path):
+    '''Move modification time of directory at *path* forward.'''
+    result = os.stat(path)
+    os.utime(path, ns=(result.st_atime_ns, result.st_mtime_ns + 10**9))
+
+
+def search_cached(expression, current_os, discovery_cache):
+    '''Return paths found for *expression* using *discovery_cache*.'''
+    results = search(
+        [expression], current_os, discovery_cache, max_workers=1
+    )
+    return results[0]['paths']
+
+
+def test_miss(install_root, current_os, discovery_cache):
+    '''Search and store expressions not cached.'''
+    expression = [install_root] + EXPRESSION
+    key = discovery_cache.make_key(expression, current_os)
+
+    assert discovery_cache.get(key, None) is None
+    assert discovery_cache.misses == 1
+
+    paths = search_cached(expression, current_os, discovery_cache)
+
+    assert len(paths) == 3
+    assert discovery_cache.misses == 2
+    assert discovery_cache.hits == 0
+
+
+def test_hit(install_root, current_os, discovery_cache):
+    '''Return cached paths without searching again.'''
+    expression = [install_root] + EXPRESSION
+    paths = search_cached(expression, current_os, discovery_cache)
+
+    def rescan(directory):
+        raise AssertionError('Unexpected rescan of {}'.format(directory))
+
+    key = discovery_cache.make_key(expression, current_os)
+    assert sorted(discovery_cache.get(key, rescan)['paths']) == paths
+    assert discovery_cache.hits == 1
+    assert discovery_cache.invalidated == 0
+
+
+def test_key_depends_on_platform(install_root):
+    '''Key expressions on the platform they are searched on.'''
+    expression = [install_root] + EXPRESSION
+    key = DiscoveryCache.make_key(expression, 'linux')
+
+    assert key == DiscoveryCache.make_key(list(expression), 'linux')
+    assert key != DiscoveryCache.make_key(expression, 'windows')
+
+
+def test_miss_on_changed_directory(install_root, current_os, discovery_cache):
+    '''Search again once an intermediate directory changed.'''
+    expression = [install_root] + EXPRESSION
+    search_cached(expression, current_os, discovery_cache)
+
+    autodesk = os.path.join(install_root, 'Program Files', 'Autodesk')
+    os.makedirs(os.path.join(autodesk, 'Maya2025', 'bin'))
+    open(os.path.join(autodesk, 'Maya2025', 'bin', 'maya.exe'), 'w').close()
+    change_directory(autodesk)
+
+    paths = search_cached(expression, current_os, discovery_cache)
+
+    assert os.path.join(autodesk, 'Maya2025', 'bin', 'maya.exe') in paths
+    assert discovery_cache.hits == 0
+    assert discovery_cache.misses == 2
+
+
+def test_invalidate_removed_install(install_root, current_os, discovery_cache):
+    '''Drop installs whose directory was removed.'''
+    expression = [install_root] + EXPRESSION
+    search_cached(expression, current_os, discovery_cache)
+
+    install = os.path.join(
+        install_root, 'Program Files', 'Autodesk', 'Maya2022', 'bin'
+    )
+    parent = os.stat(os.path.dirname(install))
+
+    for name in os.listdir(install):
+        os.remove(os.path.join(install, name))
+    os.rmdir(install)
+
+    # Leave intermediate directories unchanged, as when the install is on a
+    # volume which is no longer mounted.
+    os.utime(
+        os.path.dirname(install),
+        ns=(parent.st_atime_ns, parent.st_mtime_ns),
+    )
+
+    paths = search_cached(expression, current_os, discovery_cache)
+
+    assert len(paths) == 2
+    assert os.path.join(install, 'maya.exe') not in paths
+    assert discovery_cache.hits == 1
+    assert discovery_cache.invalidated == 1
+
+
+def test_invalidate_changed_install(install_root, current_os, discovery_cache):
+    '''List again installs whose executable disappeared.'''
+    expression = [install_root] + EXPRESSION
+    search_cached(expression, current_os, discovery_cache)
+
+    install = os.path.join(
+        install_root, 'Program Files', 'Autodesk', 'Maya2023', 'bin'
+    )
+    os.remove(os.path.join(install, 'maya.exe'))
+
+    paths = search_cached(expression, current_os, discovery_cache)
+
+    assert len(paths) == 2
+    assert os.path.join(install, 'maya.exe') not in paths
+    assert discovery_cache.hits == 1
+    assert discovery_cache.invalidated == 1
+
+    # Installs listed again are stored for the following lookups.
+    assert search_cached(expression, current_os, discovery_cache) == paths
+    assert discovery_cache.hits == 2
+    assert discovery_cache.invalidated == 1
+
+
+def test_save_and_load(install_root, current_os, discovery_cache):
+    '''Reload entries used during the previous session.'''
+    expressions = [
+        [install_root] + EXPRESSION,
+        [install_root, 'Program Files', 'Vendor\\d+', 'App', 'lib.*'],
+    ]
+    for expression in expressions:
+        search_cached(expression, current_os, discovery_cache)
+
+    discovery_cache.save()
+
+    cache = DiscoveryCache(discovery_cache.path)
+    search_cached(expressions[0], current_os, cache)
+    assert cache.hits == 1
+
+    # The entry of the expression not searched is dropped.
+    cache.save()
+
+    cache = DiscoveryCache(discovery_cache.path)
+    key = cache.make_key(expressions[1], current_os)
+    assert cache.get(key, None) is None
+
+
+def test_load_unreadable(tmp_path):
+    '''Start empty if the cache file can not be read.'''
+    path = tmp_path / 'discovery.json'
+    path.write_text('{')
+
+    cache = DiscoveryCache(str(path))
+
+    assert cache.get('key', None) is None
+
+
+def test_expiring_cache(clock):
+    '''Return values until they expire.'''
+    cache = ExpiringCache(ttl=10)
+    cache.set('key', 'value')
+
+    clock.now += 9
+    assert cache.get('key') == 'value'
+
+    clock.now += 2
+    assert cache.get('key') is None
+    assert cache.get('key', 'default') == 'default'
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_expiring_cache_without_ttl(clock):
+    '''Keep values forever without time to live.'''
+    cache = ExpiringCache(ttl=None)
+    cache.set('key', 'value')
+
+    clock.now += 10**6
+    assert cache.get('key') == 'value'
+
+
+def test_expiring_cache_disabled(clock):
+    '''Cache nothing with a time to live of 0.'''
+    cache = ExpiringCache(ttl=0)
+    cache.set('key', 'value')
+
+    assert cache.get('key') is None
+    assert cache.misses == 1
+
+
+def test_expiring_cache_clear(clock):
+    '''Remove all values and keep counters.'''
+    cache = ExpiringCache(ttl=10)
+    cache.set('key', 'value')
+    assert cache.get('key') == 'value'
+
+    cache.clear()
+
+    assert cache.get('key') is None
+    assert cache.hits == 1
+    assert cache.misses == 1
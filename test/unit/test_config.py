@@ -0,0 +1,210 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import json
+
+import pytest
+
+import ftrack_application_launcher.config
+from ftrack_application_launcher.config import (
+    ConfigurationError,
+    ConfigurationRegistry,
+    compile_configuration,
+)
+from ftrack_application_launcher.discover_applications import (
+    DiscoverApplications,
+)
+
+
+#: Configuration of an application searched on Linux.
+CONFIGURATION = {
+    'context': ['Task'],
+    'identifier': 'launch-maya',
+    'applicationIdentifier': 'maya_{variant}',
+    'label': 'Maya',
+    'icon': 'maya',
+    'variant': '{version}',
+    'search_path': {
+        'linux': {
+            'prefix': ['/', 'usr', 'autodesk', 'maya.+'],
+            'expression': ['bin', 'maya$'],
+        }
+    },
+}
+
+
+def write_configuration(path, configuration=CONFIGURATION):
+    '''Write *configuration* to *path*, moving its modification time on.'''
+    with open(path, 'w') as config_file:
+        json.dump(configuration, config_file)
+
+    result = os.stat(path)
+    os.utime(path, ns=(result.st_atime_ns, result.st_mtime_ns + 10**9))
+
+
+@pytest.fixture()
+def config_path(tmp_path):
+    '''Return directory holding a maya configuration.'''
+    path = tmp_path / 'config'
+    path.mkdir()
+    write_configuration(str(path / 'maya.json'))
+
+    return str(path)
+
+
+@pytest.fixture()
+def cache_path(tmp_path):
+    '''Return path of the compiled configurations cache.'''
+    return str(tmp_path / 'cache' / 'configurations.json')
+
+
+@pytest.fixture()
+def compiled(monkeypatch):
+    '''Return list of configurations compiled.'''
+    compiled = []
+    compile_ = ftrack_application_launcher.config.compile_configuration
+
+    def record(configuration, current_os):
+        compiled.append(configuration['identifier'])
+        return compile_(configuration, current_os)
+
+    monkeypatch.setattr(
+        ftrack_application_launcher.config, 'compile_configuration', record
+    )
+
+    return compiled
+
+
+def test_compile_configuration():
+    '''Compile search expression of the current platform.'''
+    plan = compile_configuration(CONFIGURATION, 'linux')
+
+    assert plan['search'] == {
+        'expression': ['/', 'usr', 'autodesk', 'maya.+', 'bin', 'maya$'],
+        'version_expression': None,
+        'launch_arguments': None,
+        'time_budget': None,
+    }
+    assert 'search_path' not in plan
+    assert plan['label'] == 'Maya'
+
+    assert compile_configuration(CONFIGURATION, 'windows')['search'] is None
+
+
+@pytest.mark.parametrize(
+    'change',
+    [
+        lambda configuration: configuration.pop('label'),
+        lambda configuration: configuration['search_path']['linux'].update(
+            expression=['bin', 'maya[']
+        ),
+        lambda configuration: configuration['search_path']['linux'].update(
+            version_expression='maya\\d+'
+        ),
+        lambda configuration: configuration['search_path']['linux'].update(
+            time_budget=-1
+        ),
+        lambda configuration: configuration.update(integrations=['maya']),
+    ],
+    ids=[
+        'missing attribute',
+        'invalid segment',
+        'version without group',
+        'negative budget',
+        'integrations list',
+    ],
+)
+def test_compile_invalid_configuration(change):
+    '''Refuse configurations which can not be searched.'''
+    configuration = json.loads(json.dumps(CONFIGURATION))
+    change(configuration)
+
+    with pytest.raises(ConfigurationError):
+        compile_configuration(configuration, 'linux')
+
+
+def test_load_cached_plans(config_path, cache_path, compiled):
+    '''Reuse plans of unchanged configurations across sessions.'''
+    plans = ConfigurationRegistry('linux', cache_path=cache_path).load(
+        [config_path]
+    )
+    assert compiled == ['launch-maya']
+
+    registry = ConfigurationRegistry('linux', cache_path=cache_path)
+    assert registry.load([config_path]) == plans
+    assert compiled == ['launch-maya']
+
+    # Caches of another platform are ignored.
+    ConfigurationRegistry('windows', cache_path=cache_path).load([config_path])
+    assert compiled == ['launch-maya'] * 2
+
+
+def test_load_changed_configuration(config_path, cache_path, compiled):
+    '''Compile configurations again once changed.'''
+    registry = ConfigurationRegistry('linux', cache_path=cache_path)
+    registry.load([config_path])
+
+    configuration = dict(CONFIGURATION, label='Maya LT')
+    write_configuration(os.path.join(config_path, 'maya.json'), configuration)
+
+    plans = ConfigurationRegistry('linux', cache_path=cache_path).load(
+        [config_path]
+    )
+
+    assert plans[0]['label'] == 'Maya LT'
+    assert compiled == ['launch-maya'] * 2
+
+
+def test_load_skips_invalid_configurations(config_path, caplog):
+    '''Skip invalid configurations, logging them once until changed.'''
+    invalid = os.path.join(config_path, 'invalid.json')
+    with open(invalid, 'w') as config_file:
+        config_file.write('{')
+
+    registry = ConfigurationRegistry('linux')
+
+    for _ in range(2):
+        plans = registry.load([config_path, config_path + '-missing'])
+        assert [plan['identifier'] for plan in plans] == ['launch-maya']
+
+    assert caplog.text.count(invalid) == 1
+
+
+def test_load_unreadable_cache(config_path, cache_path):
+    '''Start empty if the cache file can not be read.'''
+    os.makedirs(os.path.dirname(cache_path))
+    with open(cache_path, 'w') as cache_file:
+        cache_file.write('{')
+
+    registry = ConfigurationRegistry('linux', cache_path=cache_path)
+
+    assert len(registry.load([config_path])) == 1
+
+
+def test_prune_removed_configurations(config_path, cache_path):
+    '''Drop cached plans of configurations no longer found.'''
+    write_configuration(os.path.join(config_path, 'nuke.json'))
+
+    registry = ConfigurationRegistry('linux', cache_path=cache_path)
+    assert len(registry.load([config_path])) == 2
+
+    os.remove(os.path.join(config_path, 'nuke.json'))
+    assert len(registry.load([config_path])) == 1
+
+    with open(cache_path) as cache_file:
+        entries = json.load(cache_file)['entries']
+
+    assert list(entries) == [os.path.join(config_path, 'maya.json')]
+
+
+@pytest.mark.parametrize(
+    'option',
+    ['refresh_interval', 'reload_interval'],
+    ids=['refresh', 'reload'],
+)
+@pytest.mark.parametrize('interval', [0, -1], ids=['zero', 'negative'])
+def test_invalid_interval(config_path, option, interval):
+    '''Refuse intervals which would refresh continuously.'''
+    with pytest.raises(ValueError):
+        DiscoverApplications(None, [config_path], **{option: interval})
@@ -0,0 +1,102 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import time
+
+from ftrack_application_launcher.context import (
+    CONTEXT_PATH_VARIABLE,
+    CONTEXT_VARIABLE,
+    encode_context,
+    read_context,
+    remove_expired_contexts,
+    write_context,
+)
+
+
+#: Launch context written in tests.
+CONTEXT = {'selection': [{'entityId': 'id', 'entityType': 'task'}]}
+
+
+def age(path, seconds):
+    '''Move modification time of file at *path* *seconds* back.'''
+    modified = time.time() - seconds
+    os.utime(path, (modified, modified))
+
+
+def test_read_from_environment():
+    '''Read context encoded in the environment.'''
+    environment = {CONTEXT_VARIABLE: encode_context(CONTEXT)}
+
+    assert read_context(environment) == CONTEXT
+    assert read_context({}) is None
+
+
+def test_write_and_read(tmp_path):
+    '''Read context written to a file shared by identical launches.'''
+    directory = str(tmp_path / 'contexts')
+    path = write_context(CONTEXT, directory)
+
+    assert read_context({CONTEXT_PATH_VARIABLE: path}) == CONTEXT
+    assert write_context(dict(CONTEXT), directory) == path
+    assert os.listdir(directory) == [os.path.basename(path)]
+
+    if os.name == 'posix':
+        assert os.stat(path).st_mode & 0o077 == 0
+
+
+def test_read_missing_file(tmp_path, caplog):
+    '''Return no context and warn if the file was removed.'''
+    path = str(tmp_path / 'missing.json')
+
+    assert read_context({CONTEXT_PATH_VARIABLE: path}) is None
+    assert path in caplog.text
+
+
+def test_read_invalid_file(tmp_path, caplog):
+    '''Return no context and warn if the file can not be decoded.'''
+    path = tmp_path / 'invalid.json'
+    path.write_text('{')
+
+    assert read_context({CONTEXT_PATH_VARIABLE: str(path)}) is None
+    assert str(path) in caplog.text
+
+
+def test_write_keeps_expired_files(tmp_path):
+    '''Never remove files when writing, launches may still read them.'''
+    directory = str(tmp_path)
+    path = write_context(CONTEXT, directory)
+    age(path, 10**8)
+
+    write_context({'other': True}, directory)
+
+    assert read_context({CONTEXT_PATH_VARIABLE: path}) == CONTEXT
+
+
+def test_write_renews_shared_file(tmp_path):
+    '''Renew lifetime of files written again by a launch.'''
+    directory = str(tmp_path)
+    path = write_context(CONTEXT, directory)
+    age(path, 10**8)
+
+    write_context(CONTEXT, directory)
+    remove_expired_contexts(directory, lifetime=60)
+
+    assert os.path.exists(path)
+
+
+def test_remove_expired_contexts(tmp_path):
+    '''Remove files not written for the lifetime given.'''
+    directory = str(tmp_path)
+    expired = write_context(CONTEXT, directory)
+    recent = write_context({'other': True}, directory)
+    age(expired, 120)
+
+    remove_expired_contexts(directory, lifetime=60)
+
+    assert os.listdir(directory) == [os.path.basename(recent)]
+
+
+def test_remove_expired_contexts_missing_directory(tmp_path):
+    '''Ignore directories not created yet.'''
+    remove_expired_contexts(str(tmp_path / 'missing'))
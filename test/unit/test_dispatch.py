@@ -0,0 +1,267 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import pytest
+
+from ftrack_application_launcher.dispatch import (
+    ActionDispatcher,
+    get_action_dispatcher,
+)
+
+
+class EventHub(object):
+    '''Event hub recording subscriptions.'''
+
+    def __init__(self):
+        super(EventHub, self).__init__()
+        self.subscriptions = {}
+        self._identifier = 0
+
+    def subscribe(self, subscription, callback, priority=100):
+        self._identifier += 1
+        self.subscriptions[self._identifier] = (
+            subscription,
+            callback,
+            priority,
+        )
+        return self._identifier
+
+    def unsubscribe(self, identifier):
+        del self.subscriptions[identifier]
+
+    def get_callback(self, topic):
+        '''Return callback subscribed to *topic*.'''
+        callbacks = [
+            callback
+            for subscription, callback, _ in self.subscriptions.values()
+            if 'topic={} '.format(topic) in subscription + ' '
+        ]
+        assert len(callbacks) == 1
+        return callbacks[0]
+
+
+class Session(object):
+    '''Session of a user with an event hub recording subscriptions.'''
+
+    def __init__(self):
+        super(Session, self).__init__()
+        self.api_user = 'user'
+        self.event_hub = EventHub()
+
+
+class Action(object):
+    '''Action recording events dispatched to it.'''
+
+    def __init__(self, identifier, context, priority=100, items=None):
+        super(Action, self).__init__()
+        self.identifier = identifier
+        self.context = context
+        self.priority = priority
+        self.items = items or [{'actionIdentifier': identifier}]
+        self.information = []
+        self.discovered = []
+        self.launched = []
+
+    def __repr__(self):
+        return '<Action {}>'.format(self.identifier)
+
+    def _translate_event(self, session, event):
+        entities = [
+            (entity['entityType'], entity['entityId'])
+            for entity in event['data'].get('selection', [])
+        ]
+        return entities, event
+
+    def _resolve_entity_type(self, entities):
+        if not entities:
+            return None
+
+        if entities[0][1] == 'missing':
+            raise ValueError('Selected entity could not be found.')
+
+        return entities[0][0]
+
+    def _dispatch_discover(self, entity_type, event):
+        self.discovered.append(entity_type)
+        return list(self.items)
+
+    def _launch(self, event):
+        self.launched.append(event)
+        return {'success': True, 'message': self.identifier}
+
+    def get_version_information(self, event):
+        return self.information
+
+
+@pytest.fixture()
+def session():
+    '''Return session with an event hub recording subscriptions.'''
+    return Session()
+
+
+def make_event(selection=None, **data):
+    '''Return event selecting *selection* entities with *data*.'''
+    data['selection'] = [
+        {'entityType': entity_type, 'entityId': entity_id}
+        for entity_type, entity_id in selection or []
+    ]
+    return {'data': data, 'source': {'user': {'username': 'user'}}}
+
+
+def test_shared_per_session(session):
+    '''Share a dispatcher between the actions of a session.'''
+    dispatcher = get_action_dispatcher(session)
+
+    assert get_action_dispatcher(session) is dispatcher
+    assert get_action_dispatcher(Session()) is not dispatcher
+
+
+def test_subscribe_once(session):
+    '''Subscribe to events once whatever the number of actions.'''
+    dispatcher = ActionDispatcher(session)
+    actions = [Action('first', ['task']), Action('second', ['task'])]
+
+    for action in actions:
+        dispatcher.add(action)
+
+    # Adding an action twice has no effect.
+    dispatcher.add(actions[0])
+
+    assert dispatcher.actions == tuple(actions)
+    assert len(session.event_hub.subscriptions) == 3
+
+    for action in actions:
+        dispatcher.remove(action)
+
+    assert dispatcher.actions == ()
+    assert session.event_hub.subscriptions == {}
+
+
+def test_subscribe_with_lowest_priority(session):
+    '''Subscribe with the lowest priority and dispatch in priority order.'''
+    dispatcher = ActionDispatcher(session)
+    late = Action('late', ['task'], priority=200)
+    early = Action('early', ['task'], priority=10)
+
+    dispatcher.add(late)
+    dispatcher.add(early)
+
+    assert dispatcher.actions == (early, late)
+    assert set(
+        priority
+        for _, _, priority in session.event_hub.subscriptions.values()
+    ) == set([10])
+
+    dispatcher.remove(early)
+
+    assert set(
+        priority
+        for _, _, priority in session.event_hub.subscriptions.values()
+    ) == set([200])
+
+
+def test_discover_by_entity_type(session):
+    '''Merge items of the actions accepting the selected entity type.'''
+    dispatcher = ActionDispatcher(session)
+    task = Action('task', ['task'])
+    both = Action('both', ['task', 'shot'])
+    empty = Action('empty', [None])
+
+    for action in (task, both, empty):
+        dispatcher.add(action)
+
+    discover = session.event_hub.get_callback('ftrack.action.discover')
+
+    result = discover(make_event([('task', 'id')]))
+    assert result == {
+        'items': [{'actionIdentifier': 'task'}, {'actionIdentifier': 'both'}]
+    }
+
+    result = discover(make_event([('shot', 'id')]))
+    assert result == {'items': [{'actionIdentifier': 'both'}]}
+
+    result = discover(make_event())
+    assert result == {'items': [{'actionIdentifier': 'empty'}]}
+
+    assert discover(make_event([('asset', 'id')])) is None
+
+    assert task.discovered == ['task']
+    assert both.discovered == ['task', 'shot']
+    assert empty.discovered == [None]
+
+
+def test_discover_unresolved_selection(session):
+    '''Ignore discover events whose selection can not be resolved.'''
+    dispatcher = ActionDispatcher(session)
+    action = Action('task', ['task'])
+    dispatcher.add(action)
+
+    discover = session.event_hub.get_callback('ftrack.action.discover')
+
+    assert discover(make_event([('task', 'missing')])) is None
+    assert action.discovered == []
+
+
+def test_discover_isolates_failures(session):
+    '''Return items of other actions when one of them fails.'''
+    dispatcher = ActionDispatcher(session)
+    failing = Action('failing', ['task'])
+    working = Action('working', ['task'])
+
+    def fail(entity_type, event):
+        raise RuntimeError('Discovery failed.')
+
+    failing._dispatch_discover = fail
+
+    dispatcher.add(failing)
+    dispatcher.add(working)
+
+    discover = session.event_hub.get_callback('ftrack.action.discover')
+
+    assert discover(make_event([('task', 'id')])) == {
+        'items': [{'actionIdentifier': 'working'}]
+    }
+
+
+def test_launch_by_identifier(session):
+    '''Route launch events to the action they are for.'''
+    dispatcher = ActionDispatcher(session)
+    first = Action('first', ['task'])
+    second = Action('second', ['task'])
+
+    dispatcher.add(first)
+    dispatcher.add(second)
+
+    launch = session.event_hub.get_callback('ftrack.action.launch')
+    event = make_event([('task', 'id')], actionIdentifier='second')
+
+    assert launch(event) == {'success': True, 'message': 'second'}
+    assert second.launched == [event]
+    assert first.launched == []
+
+    assert launch(make_event(actionIdentifier='unknown')) is None
+
+
+def test_version_information_listed_once(session):
+    '''List integrations reported by several actions once.'''
+    dispatcher = ActionDispatcher(session)
+    first = Action('first', ['task'])
+    second = Action('second', ['task'])
+
+    first.information = [{'name': 'nuke', 'version': '1.0'}]
+    second.information = [
+        {'name': 'nuke', 'version': '1.0'},
+        {'name': 'maya', 'version': '2.0'},
+    ]
+
+    dispatcher.add(first)
+    dispatcher.add(second)
+
+    information = session.event_hub.get_callback(
+        'ftrack.connect.plugin.debug-information'
+    )
+
+    assert information(make_event()) == [
+        {'name': 'nuke', 'version': '1.0'},
+        {'name': 'maya', 'version': '2.0'},
+    ]
@@ -0,0 +1,179 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import re
+import types
+
+import pytest
+
+import ftrack_application_launcher.entity
+from ftrack_application_launcher.entity import (
+    EntityResolver,
+    get_entity_resolver,
+)
+
+
+class Entity(dict):
+    '''Entity returned by queries.'''
+
+    def __init__(self, entity_type, **data):
+        super(Entity, self).__init__(**data)
+        self.entity_type = entity_type
+
+
+class Query(object):
+    '''Query result.'''
+
+    def __init__(self, results):
+        super(Query, self).__init__()
+        self.results = results
+
+    def all(self):
+        return self.results
+
+
+class Session(object):
+    '''Session querying entities by id and recording queries.'''
+
+    def __init__(self):
+        super(Session, self).__init__()
+        self.queries = []
+        self.entities = {
+            'task': Entity('Task', id='task', parent_id='shot'),
+            'version': Entity(
+                'AssetVersion',
+                id='version',
+                task_id='task',
+                asset=Entity('Asset', context_id='shot'),
+            ),
+        }
+
+    def query(self, expression):
+        self.queries.append(expression)
+        return Query(
+            [
+                self.entities[identifier]
+                for identifier in re.findall(r'"(\w+)"', expression)
+                if identifier in self.entities
+            ]
+        )
+
+
+@pytest.fixture()
+def session():
+    '''Return session querying entities by id.'''
+    return Session()
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    '''Return clock controlling the expiry of resolved entities.'''
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        ftrack_application_launcher.entity,
+        'time',
+        types.SimpleNamespace(monotonic=lambda: clock.now),
+    )
+
+    return clock
+
+
+def test_shared_per_session(session):
+    '''Share a resolver between the actions of a session.'''
+    resolver = get_entity_resolver(session)
+
+    assert get_entity_resolver(session) is resolver
+    assert get_entity_resolver(Session()) is not resolver
+
+
+def test_resolve(session):
+    '''Resolve entities to their type, parent and task ids.'''
+    resolver = EntityResolver(session)
+
+    assert resolver.resolve('TypedContext', 'task') == {
+        'entity_type': 'Task',
+        'parent_id': 'shot',
+        'task_id': None,
+    }
+    assert resolver.resolve('AssetVersion', 'version') == {
+        'entity_type': 'AssetVersion',
+        'parent_id': 'shot',
+        'task_id': 'task',
+    }
+    assert resolver.resolve('TypedContext', 'missing') is None
+
+
+def test_resolve_once(session):
+    '''Fetch each entity once.'''
+    resolver = EntityResolver(session)
+
+    for _ in range(3):
+        resolver.resolve('TypedContext', 'task')
+
+    assert len(session.queries) == 1
+    assert resolver.hits == 2
+    assert resolver.misses == 1
+
+
+def test_prefetch_by_type(session):
+    '''Fetch entities of a same type with one query.'''
+    resolver = EntityResolver(session)
+    resolver.prefetch(
+        [
+            ('TypedContext', 'task'),
+            ('TypedContext', 'missing'),
+            ('AssetVersion', 'version'),
+        ]
+    )
+
+    assert len(session.queries) == 2
+
+    resolver.resolve('TypedContext', 'task')
+    resolver.resolve('AssetVersion', 'version')
+
+    assert len(session.queries) == 2
+
+
+def test_least_recently_used_dropped(session):
+    '''Remember at most the number of entities given.'''
+    resolver = EntityResolver(session, size=1)
+    resolver.resolve('TypedContext', 'task')
+    resolver.resolve('AssetVersion', 'version')
+    resolver.resolve('TypedContext', 'task')
+
+    assert len(session.queries) == 3
+
+
+def test_expired_entities_fetched_again(session, clock):
+    '''Fetch entities again once expired, as they may have moved.'''
+    resolver = EntityResolver(session, ttl=10)
+    resolver.resolve('TypedContext', 'task')
+
+    clock.now += 9
+    session.entities['task']['parent_id'] = 'sequence'
+    assert resolver.resolve('TypedContext', 'task')['parent_id'] == 'shot'
+
+    clock.now += 2
+    assert resolver.resolve('TypedContext', 'task')['parent_id'] == 'sequence'
+    assert len(session.queries) == 2
+
+
+def test_without_ttl(session, clock):
+    '''Keep entities until dropped without time to live.'''
+    resolver = EntityResolver(session, ttl=None)
+    resolver.resolve('TypedContext', 'task')
+
+    clock.now += 10**6
+    resolver.resolve('TypedContext', 'task')
+
+    assert len(session.queries) == 1
+
+
+def test_clear(session):
+    '''Fetch entities again once cleared.'''
+    resolver = EntityResolver(session)
+    resolver.resolve('TypedContext', 'task')
+    resolver.clear()
+    resolver.resolve('TypedContext', 'task')
+
+    assert len(session.queries) == 2
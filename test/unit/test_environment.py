@@ -0,0 +1,160 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+
+import pytest
+
+from ftrack_application_launcher.environment import (
+    EnvironmentPlan,
+    PathList,
+    compile_operations,
+    parse_variable,
+    split_path,
+)
+
+
+@pytest.mark.parametrize(
+    'name, expected',
+    [
+        ('PATH', ('PATH', 'append')),
+        ('PATH.prepend', ('PATH', 'prepend')),
+        ('FOO.set', ('FOO', 'set')),
+    ],
+    ids=['default', 'prepend', 'set'],
+)
+def test_parse_variable(name, expected):
+    '''Split exported variable names into name and action.'''
+    assert parse_variable(name) == expected
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [
+        (None, []),
+        ('', []),
+        ('a', ['a']),
+        ('a:b', ['a', 'b']),
+        ('a::b', ['a', '', 'b']),
+        ('a:', ['a', '']),
+    ],
+    ids=['none', 'empty', 'single', 'several', 'empty entry', 'trailing'],
+)
+def test_split_path(value, expected):
+    '''Split path lists keeping empty entries.'''
+    assert split_path(value, ':') == expected
+
+
+def test_path_list_removes_duplicates():
+    '''List entries equal once normalized a single time.'''
+    paths = PathList('/a:/b/:/a/./:/c/../b:/d', separator=':')
+
+    assert list(paths) == ['/a', '/b/', '/d']
+    assert len(paths) == 3
+    assert str(paths) == '/a:/b/:/d'
+
+
+def test_path_list_append():
+    '''Append new entries and keep the position of listed ones.'''
+    paths = PathList('/a:/b', separator=':')
+    paths.append('/c:/a')
+
+    assert str(paths) == '/a:/b:/c'
+
+
+def test_path_list_prepend():
+    '''Prepend entries in order, moving listed ones to the front.'''
+    paths = PathList('/a:/b:/c', separator=':')
+    paths.prepend('/c:/d')
+
+    assert str(paths) == '/c:/d:/a:/b'
+
+
+def test_path_list_remove():
+    '''Remove entries whatever their spelling.'''
+    paths = PathList('/a:/b:/c', separator=':')
+    paths.remove('/b/')
+    paths.remove('/missing')
+
+    assert str(paths) == '/a:/c'
+
+
+def test_path_list_keeps_empty_entries():
+    '''Keep empty entries standing for the current directory once.'''
+    paths = PathList('/a::/b', separator=':')
+    paths.append(':/c')
+
+    assert list(paths) == ['/a', '', '/b', '/c']
+
+
+def test_compile_operations(caplog):
+    '''Compile operations in order, skipping unknown actions.'''
+    operations = compile_operations(
+        {
+            'PATH.prepend': os.pathsep.join(['/a', '/b']),
+            'FOO.set': 1,
+            'BAR.unknown': 'x',
+            'LIB': '/c',
+        }
+    )
+
+    assert [operation[:2] for operation in operations] == [
+        ('prepend', 'PATH'),
+        ('set', 'FOO'),
+        ('append', 'LIB'),
+    ]
+    assert operations[0][2] == ('/a', '/b')
+    assert operations[1][2] == '1'
+    assert operations[2][2] == ('/c',)
+    assert 'unknown' in caplog.text
+
+
+def test_plan_apply():
+    '''Apply operations in order to the environment given.'''
+    plan = EnvironmentPlan(
+        [
+            ('prepend', 'PATH', ('/tools', '/usr/bin')),
+            ('append', 'PATH', ('/extra', '/tools')),
+            ('pop', 'PATH', '/bin'),
+            ('set', 'FOO', 'value'),
+            ('unset', 'BAR', ''),
+            ('append', 'NEW', ('/new',)),
+            ('pop', 'MISSING', '/x'),
+        ]
+    )
+    environment = {'PATH': os.pathsep.join(['/usr/bin', '/bin']), 'BAR': 'x'}
+
+    result = plan.apply(environment)
+
+    assert result is environment
+    assert environment == {
+        'PATH': os.pathsep.join(['/tools', '/usr/bin', '/extra']),
+        'FOO': 'value',
+        'NEW': '/new',
+    }
+
+
+def test_plan_apply_set_after_path_operations():
+    '''Replace path lists set after being extended.'''
+    plan = EnvironmentPlan(
+        [
+            ('append', 'PATH', ('/a',)),
+            ('set', 'PATH', '/b'),
+            ('append', 'PATH', ('/c',)),
+        ]
+    )
+
+    environment = plan.apply({})
+
+    assert environment['PATH'] == os.pathsep.join(['/b', '/c'])
+
+
+def test_plan_reused():
+    '''Apply the same plan to several environments.'''
+    plan = EnvironmentPlan([('append', 'PATH', ('/a',))])
+
+    first = plan.apply({})
+    second = plan.apply({'PATH': '/b'})
+
+    assert first == {'PATH': '/a'}
+    assert second['PATH'] == os.pathsep.join(['/b', '/a'])
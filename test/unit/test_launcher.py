@@ -0,0 +1,198 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+
+import pytest
+
+from ftrack_application_launcher import (
+    DISCOVER_BATCH_TOPIC,
+    ApplicationLauncher,
+    ApplicationStore,
+)
+
+
+class EventHub(object):
+    '''Event hub replying to discover events with the integrations set.'''
+
+    def __init__(self):
+        super(EventHub, self).__init__()
+        self.integrations = ['maya']
+        self.batch = True
+        self.published = []
+
+    def publish(self, event, synchronous=False):
+        self.published.append(event['topic'])
+
+        if event['topic'] == DISCOVER_BATCH_TOPIC:
+            if not self.batch:
+                return []
+
+            identifiers = [
+                application['identifier']
+                for application in event['data']['applications']
+            ]
+            return [
+                {'integration': {'name': name}, 'applications': identifiers}
+                for name in self.integrations
+            ]
+
+        return [{'integration': {'name': name}} for name in self.integrations]
+
+    def get_server_url(self):
+        return 'https://ftrack.example.com'
+
+
+class Session(object):
+    '''Session with an event hub replying to discover events.'''
+
+    def __init__(self):
+        super(Session, self).__init__()
+        self.api_key = 'key'
+        self.event_hub = EventHub()
+
+
+@pytest.fixture()
+def session():
+    '''Return session with an event hub replying to discover events.'''
+    return Session()
+
+
+@pytest.fixture()
+def store(session):
+    '''Return store of a session, discovering no application.'''
+    return ApplicationStore(session, loader=lambda: None)
+
+
+@pytest.fixture()
+def launcher(store):
+    '''Return launcher of *store* without integrations cache.'''
+    return ApplicationLauncher(store, integrations_ttl=0)
+
+
+#: Applications requiring the maya integration.
+APPLICATIONS = [
+    {'identifier': 'maya_{}'.format(version), 'integrations': {'g': ['maya']}}
+    for version in (2023, 2024, 2025)
+]
+
+
+def test_discover_batch(launcher, session):
+    '''Discover integrations of all applications with one event.'''
+    discovered = launcher.discover_integrations_batch(APPLICATIONS, {})
+
+    assert discovered == dict(
+        (application['identifier'], ([{'name': 'maya'}], []))
+        for application in APPLICATIONS
+    )
+    assert session.event_hub.published == [DISCOVER_BATCH_TOPIC]
+
+
+def test_discover_batch_unanswered(launcher, session):
+    '''Stop publishing batch events once unanswered.'''
+    session.event_hub.batch = False
+
+    for _ in range(2):
+        discovered = launcher.discover_integrations_batch(APPLICATIONS, {})
+
+        assert discovered['maya_2024'] == ([{'name': 'maya'}], [])
+
+    assert session.event_hub.published == (
+        [DISCOVER_BATCH_TOPIC]
+        + ['ftrack.connect.application.discover'] * len(APPLICATIONS) * 2
+    )
+
+    # Batch discovery is tried again once integrations changed.
+    session.event_hub.batch = True
+    session.event_hub.published = []
+    launcher.invalidate_integrations()
+
+    launcher.discover_integrations_batch(APPLICATIONS, {})
+
+    assert session.event_hub.published == [DISCOVER_BATCH_TOPIC]
+
+
+def test_discover_batch_answered_once(launcher, session):
+    '''Keep publishing batch events once answered.'''
+    launcher.discover_integrations_batch(APPLICATIONS, {})
+
+    session.event_hub.integrations = []
+    session.event_hub.published = []
+
+    discovered = launcher.discover_integrations_batch(APPLICATIONS, {})
+    launcher.discover_integrations_batch(APPLICATIONS, {})
+
+    assert discovered['maya_2024'] == ([], ['g'])
+    assert session.event_hub.published.count(DISCOVER_BATCH_TOPIC) == 2
+
+
+def test_base_environment_reused(launcher, monkeypatch):
+    '''Reuse base environment while the process environment is unchanged.'''
+    monkeypatch.setenv('FTRACK_TEST_VARIABLE', 'first')
+
+    environment = launcher._get_base_environment()
+
+    assert environment['FTRACK_TEST_VARIABLE'] == 'first'
+    assert environment['FTRACK_APIKEY'] == 'key'
+    assert launcher._get_base_environment() is environment
+
+
+@pytest.mark.parametrize(
+    'change',
+    [
+        lambda monkeypatch: monkeypatch.setenv('FTRACK_TEST_VARIABLE', 'new'),
+        lambda monkeypatch: monkeypatch.delenv('FTRACK_TEST_VARIABLE'),
+        lambda monkeypatch: monkeypatch.setenv('FTRACK_TEST_OTHER', 'added'),
+    ],
+    ids=['changed', 'removed', 'added'],
+)
+def test_base_environment_rebuilt(launcher, monkeypatch, change):
+    '''Rebuild base environment once the process environment changed.'''
+    monkeypatch.setenv('FTRACK_TEST_VARIABLE', 'first')
+    environment = launcher._get_base_environment()
+
+    change(monkeypatch)
+    rebuilt = launcher._get_base_environment()
+
+    assert rebuilt is not environment
+    assert rebuilt.get('FTRACK_TEST_VARIABLE') == os.environ.get(
+        'FTRACK_TEST_VARIABLE'
+    )
+    assert rebuilt.get('FTRACK_TEST_OTHER') == os.environ.get(
+        'FTRACK_TEST_OTHER'
+    )
+
+
+def test_base_environment_rebuilt_on_session_change(launcher, session):
+    '''Rebuild base environment once the API key changed.'''
+    environment = launcher._get_base_environment()
+    session.api_key = 'other'
+
+    assert launcher._get_base_environment()['FTRACK_APIKEY'] == 'other'
+    assert environment['FTRACK_APIKEY'] == 'key'
+
+
+@pytest.mark.parametrize(
+    'version_expression',
+    [
+        None,
+        'Nuke(?P<version>[\\d.v]+)/',
+        '^/opt/Foundry/Nuke(?P<version>[\\d.v]+)/',
+        '\\A/opt/Foundry/Nuke(?P<version>[\\d.v]+)/',
+    ],
+    ids=['default', 'unanchored', 'anchored', 'anchored to string'],
+)
+def test_create_applications_versions(store, version_expression):
+    '''Parse versions of paths found with a search expression.'''
+    applications = store._create_applications(
+        ['/opt/Foundry/Nuke13.2v1/Nuke13.2', '/opt/Foundry/Nuke14.0v3/Nuke14'],
+        'Nuke',
+        'nuke_{variant}',
+        versionExpression=version_expression,
+        expression=['/', 'opt', 'Foundry', 'Nuke.+', 'Nuke.+'],
+    )
+
+    assert [str(application['version']) for application in applications] == [
+        '14.0v3' if version_expression else '14',
+        '13.2v1' if version_expression else '13.2',
+    ]
@@ -0,0 +1,76 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import types
+
+import pytest
+
+import ftrack_application_launcher.metrics
+from ftrack_application_launcher.metrics import LaunchTimings, timed_hook
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    '''Return clock controlling the timings of :mod:`metrics`.'''
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        ftrack_application_launcher.metrics,
+        'time',
+        types.SimpleNamespace(monotonic=lambda: clock.now),
+    )
+
+    return clock
+
+
+def test_phases(clock):
+    '''Record phases in the order they ran.'''
+    timings = LaunchTimings('maya_2024')
+
+    with timings.phase('first'):
+        clock.now += 1
+
+    with pytest.raises(RuntimeError):
+        with timings.phase('second'):
+            clock.now += 2
+            raise RuntimeError('Phase failed.')
+
+    assert timings.to_dict() == {
+        'application': 'maya_2024',
+        'phases': {'first': 1, 'second': 2},
+        'total': 3,
+    }
+
+
+def test_timed_hook(clock):
+    '''Report time spent in hooks in the integration returned.'''
+
+    def hook(event):
+        clock.now += 2
+        return {'integration': {'name': 'maya', 'env': {}}}
+
+    wrapped = timed_hook(hook)
+
+    assert wrapped.__name__ == 'hook'
+    assert wrapped({}) == {
+        'integration': {'name': 'maya', 'env': {}, 'elapsed': 2}
+    }
+
+    # Replies without integration are returned unchanged.
+    assert timed_hook(lambda event: None)({}) is None
+
+
+def test_record_hooks(clock):
+    '''Record time of each hook reporting it by integration name.'''
+    timings = LaunchTimings('maya_2024')
+
+    timings.record_hooks(
+        [
+            {'integration': {'name': 'maya', 'elapsed': 2}},
+            {'integration': {'name': 'legacy'}},
+            {'integration': {'name': 'usd', 'elapsed': 'slow'}},
+            {'message': 'No integration.'},
+            None,
+        ]
+    )
+
+    assert timings.phases == {'launch_hooks.maya': 2}
@@ -0,0 +1,39 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import threading
+
+import pytest
+
+from ftrack_application_launcher.refresh import PeriodicRefresh
+
+
+def test_refresh_periodically():
+    '''Call the callback until stopped, surviving its failures.'''
+    calls = []
+    refreshed = threading.Event()
+
+    def callback():
+        calls.append(True)
+        if len(calls) == 1:
+            raise RuntimeError('Refresh failed.')
+
+        refreshed.set()
+
+    refresh = PeriodicRefresh(callback, interval=0.01)
+    refresh.start()
+
+    assert refreshed.wait(5)
+    refresh.stop()
+
+    with pytest.raises(RuntimeError):
+        refresh.start()
+
+
+@pytest.mark.parametrize(
+    'interval', [0, -1, float('nan')], ids=['zero', 'negative', 'nan']
+)
+def test_invalid_interval(interval):
+    '''Refuse intervals which would refresh continuously.'''
+    with pytest.raises(ValueError):
+        PeriodicRefresh(lambda: None, interval=interval)
@@ -0,0 +1,296 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import re
+import sys
+import textwrap
+import threading
+import subprocess
+
+import pytest
+
+from ftrack_application_launcher.search import (
+    SearchTree,
+    _DaemonExecutor,
+    _rescan,
+    find_executables,
+    get_version_offset,
+    is_literal,
+)
+
+
+#: Expressions searched below the root of the synthetic tree.
+EXPRESSIONS = [
+    ['Program Files.*', 'Autodesk', 'Maya.+', 'bin', 'maya.exe'],
+    ['Program Files.*', 'Autodesk', 'Maya.+', 'bin', 'maya.*\\.exe'],
+    ['Program Files', 'Vendor\\d+', 'App', 'lib.*'],
+    ['Program Files', 'Autodesk', 'Maya2023', 'bin', 'maya.exe'],
+    ['Program Files', 'Missing', 'bin', 'maya.exe'],
+]
+
+
+@pytest.fixture()
+def case_insensitive(monkeypatch):
+    '''Resolve paths whatever the case of their last segment, as on Windows.'''
+    stat = os.stat
+
+    def case_insensitive_stat(path, *args, **kwargs):
+        try:
+            return stat(path, *args, **kwargs)
+        except OSError:
+            directory, name = os.path.split(path)
+            for entry in os.listdir(directory):
+                if entry.lower() == name.lower():
+                    return stat(
+                        os.path.join(directory, entry), *args, **kwargs
+                    )
+
+            raise
+
+    monkeypatch.setattr(os, 'stat', case_insensitive_stat)
+
+
+def walk(expression):
+    '''Return paths matching *expression* found with :func:`os.walk`.
+
+    Reference implementation of the original filesystem search, with levels
+    counted from the root of *expression*.
+
+    '''
+    pieces = list(expression)
+    start = pieces.pop(0)
+
+    expressions = list(map(re.compile, pieces))
+    depth = start.rstrip(os.path.sep).count(os.path.sep)
+
+    paths = []
+    for location, folders, files in os.walk(
+        start, topdown=True, followlinks=True
+    ):
+        level = location.rstrip(os.path.sep).count(os.path.sep) - depth
+        expression = expressions[level]
+
+        if level < (len(expressions) - 1):
+            folders[:] = [
+                folder for folder in folders if expression.match(folder)
+            ]
+        else:
+            for entry in folders + files:
+                if expression.match(entry):
+                    paths.append(os.path.join(location, entry))
+
+            del folders[:]
+
+    return sorted(paths)
+
+
+@pytest.mark.parametrize(
+    'pattern, expected',
+    [
+        ('Autodesk', True),
+        ('Program Files (x86)', False),
+        ('Maya.+', False),
+        ('maya.exe', False),
+        ('bin', True),
+    ],
+    ids=['name', 'parentheses', 'pattern', 'dot', 'short name'],
+)
+def test_is_literal(pattern, expected):
+    '''Detect segments without regular expression syntax.'''
+    assert is_literal(pattern) is expected
+
+
+@pytest.mark.parametrize(
+    'siblings', [[], ['b.n']], ids=['literals', 'with patterns']
+)
+@pytest.mark.parametrize(
+    'current_os, expected',
+    [('windows', 0), ('darwin', 0), ('linux', 1)],
+    ids=['windows', 'darwin', 'linux'],
+)
+def test_walk_literal_case(
+    install_root, case_insensitive, current_os, expected, siblings
+):
+    '''Match literals with the case of entries on case insensitive systems.'''
+    autodesk = [install_root, 'Program Files', 'Autodesk']
+
+    tree = SearchTree(current_os)
+    tree.add(autodesk + ['Maya2023', 'BIN'])
+    tree.add(autodesk + ['Maya2023', 'bin'])
+
+    for sibling in siblings:
+        tree.add(autodesk + ['Maya2023', sibling])
+
+    results = tree.walk(max_workers=1)
+
+    assert len(results[0]['paths']) == expected
+    assert len(results[1]['paths']) == 1
+
+
+@pytest.mark.parametrize(
+    'current_os, expected',
+    [('windows', []), ('darwin', []), ('linux', ['BIN'])],
+    ids=['windows', 'darwin', 'linux'],
+)
+def test_rescan_literal_case(
+    install_root, case_insensitive, current_os, expected
+):
+    '''Rescan literals with the case of entries on case insensitive systems.'''
+    directory = os.path.join(
+        install_root, 'Program Files', 'Autodesk', 'Maya2023'
+    )
+
+    assert _rescan('bin', current_os, directory) == ['bin']
+    assert _rescan('BIN', current_os, directory) == expected
+
+
+@pytest.mark.parametrize('max_workers', [1, 4], ids=['serial', 'threads'])
+def test_walk_matches_os_walk(install_root, current_os, max_workers):
+    '''Find the same paths as os.walk for each expression.'''
+    expressions = [[install_root] + expression for expression in EXPRESSIONS]
+
+    tree = SearchTree(current_os)
+    for expression in expressions:
+        tree.add(expression)
+
+    results = tree.walk(max_workers=max_workers)
+
+    assert len(results) == len(expressions)
+    for expression, result in zip(expressions, results):
+        assert result['paths'] == walk(expression)
+        assert result['complete'] is True
+
+
+def test_walk_shares_directories(install_root, current_os):
+    '''Merge expressions starting with the same segments.'''
+    tree = SearchTree(current_os)
+    first = tree.add([install_root] + EXPRESSIONS[0])
+    second = tree.add([install_root] + EXPRESSIONS[1])
+
+    assert first != second
+    assert list(tree.roots) == [install_root]
+
+    node = tree.roots[install_root]
+    assert list(node.children) == ['Program Files.*']
+    assert node.through_expressions == [first, second]
+
+
+def test_walk_records_directories(install_root, current_os):
+    '''Record intermediate and install directories of the search.'''
+    tree = SearchTree(current_os)
+    tree.add([install_root] + EXPRESSIONS[0])
+
+    result = tree.walk(max_workers=1)[0]
+
+    autodesk = os.path.join(install_root, 'Program Files', 'Autodesk')
+    assert autodesk in result['directories']
+
+    install = os.path.join(autodesk, 'Maya2023', 'bin')
+    assert result['installs'][install]['names'] == ['maya.exe']
+    assert result['installs'][install]['signature'] is not None
+
+
+@pytest.mark.skipif(
+    not hasattr(os, 'symlink'), reason='Symbolic links not supported.'
+)
+def test_walk_skips_link_cycles(tmp_path, current_os):
+    '''Stop descending into directories linking back to a parent.'''
+    root = str(tmp_path)
+    directory = os.path.join(root, 'a')
+    os.makedirs(directory)
+    open(os.path.join(directory, 'tool'), 'w').close()
+
+    try:
+        os.symlink(root, os.path.join(directory, 'loop'))
+    except (OSError, NotImplementedError):
+        pytest.skip('Symbolic links can not be created.')
+
+    expression = [root, '.*', '.*', '.*', 'tool']
+    assert walk(expression) == [os.path.join(root, 'a', 'loop', 'a', 'tool')]
+
+    tree = SearchTree(current_os)
+    tree.add(expression)
+
+    assert tree.walk(max_workers=1)[0]['paths'] == []
+
+
+def test_walk_abandons_hung_directories(install_root, current_os):
+    '''Return once out of time and let the interpreter exit.'''
+    script = textwrap.dedent(
+        '''
+        import sys
+        import threading
+
+        from ftrack_application_launcher.search import SearchTree
+
+        # Listing directories hangs, as on an unresponsive network mount.
+        SearchTree._visit = lambda *args: threading.Event().wait()
+
+        tree = SearchTree({current_os!r})
+        tree.add([{root!r}, 'Program Files', 'Autodesk', 'Maya.+', 'bin'])
+
+        result = tree.walk(max_workers=2, root_budget=0.1)[0]
+        sys.exit(0 if result['complete'] is False else 1)
+        '''
+    ).format(current_os=current_os, root=install_root)
+
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.run(
+        [sys.executable, '-c', script], env=environment, timeout=60
+    )
+
+    assert process.returncode == 0
+
+
+def test_daemon_executor():
+    '''Return results and errors of calls run on daemon threads.'''
+    executor = _DaemonExecutor(max_workers=2, thread_name_prefix='Test')
+    release = threading.Event()
+
+    futures = [executor.submit(release.wait) for _ in range(3)]
+    failed = executor.submit(int, 'invalid')
+    release.set()
+
+    assert [future.result(timeout=5) for future in futures] == [True] * 3
+    assert isinstance(failed.exception(timeout=5), ValueError)
+
+    assert len(executor._threads) == 2
+    assert all(thread.daemon for thread in executor._threads)
+
+    executor.shutdown()
+
+    assert not any(thread.is_alive() for thread in executor._threads)
+    with pytest.raises(RuntimeError):
+        executor.submit(int, '1')
+
+
+def test_find_executables(install_root, current_os):
+    '''Return matching paths for each expression.'''
+    expressions = [[install_root] + expression for expression in EXPRESSIONS]
+
+    assert find_executables(expressions, current_os, max_workers=1) == [
+        walk(expression) for expression in expressions
+    ]
+
+
+def test_find_executables_missing_root(tmp_path, current_os):
+    '''Fail to search expressions whose root does not exist.'''
+    with pytest.raises(ValueError):
+        find_executables(
+            [[str(tmp_path / 'missing'), 'bin', 'tool']], current_os
+        )
+
+
+@pytest.mark.parametrize(
+    'expression, expected',
+    [
+        (['/', 'opt', 'Foundry', 'Nuke.+', 'Nuke.+'], len('/opt/Foundry')),
+        (['/', 'opt', 'Nuke13', 'bin', 'nuke'], len('/opt')),
+        (['/opt2', 'Foundry', 'Nuke.+', 'Nuke.+'], 0),
+    ],
+    ids=['literals', 'literal with digits', 'root with digits'],
+)
+def test_get_version_offset(expression, expected):
+    '''Skip root and literal segments without digits.'''
+    assert get_version_offset(expression, 'linux') == expected
@@ -0,0 +1,85 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import random
+
+import pytest
+
+from ftrack_application_launcher.version import Version
+
+
+@pytest.mark.parametrize(
+    'older, newer',
+    [
+        ('2023', '2024'),
+        ('9', '10'),
+        ('13.2v1', '13.2v10'),
+        ('13.2v9', '14.0v1'),
+        ('1.0', '1.0.0'),
+        ('5.0', '5.0b1'),
+        ('v2b1', '2023'),
+        ('2023', '2023.1'),
+        ('2023.beta', '2023.1'),
+    ],
+    ids=[
+        'years',
+        'numeric',
+        'revision',
+        'major',
+        'longer',
+        'suffix',
+        'name before number',
+        'release',
+        'name before number component',
+    ],
+)
+def test_ordering(older, newer):
+    '''Order versions by their components.'''
+    assert Version(older) < Version(newer)
+    assert Version(newer) > Version(older)
+    assert Version(older) <= Version(newer)
+    assert Version(newer) >= Version(older)
+    assert Version(older) != Version(newer)
+
+
+def test_sort_mixed_versions():
+    '''Sort versions mixing numbers and names newest first.'''
+    versions = ['13.2v1', '2023', 'v2b1', '14.0v3', '2022', '13.2v10']
+    random.Random(0).shuffle(versions)
+
+    assert [
+        str(version)
+        for version in sorted(map(Version, versions), reverse=True)
+    ] == ['2023', '2022', '14.0v3', '13.2v10', '13.2v1', 'v2b1']
+
+
+def test_equality():
+    '''Compare equal versions with the same components.'''
+    assert Version('2023.1') == Version('2023.1')
+    assert hash(Version('2023.1')) == hash(Version('2023.1'))
+    assert len(set([Version('2023'), Version('2023')])) == 1
+
+
+def test_compare_to_string():
+    '''Compare versions to version strings.'''
+    assert Version('2023') == '2023'
+    assert Version('2023') < '2024'
+    assert Version('13.2v1') > '13.1'
+
+
+def test_compare_to_other_types():
+    '''Refuse ordering against unrelated types.'''
+    assert Version('2023') != 2023
+
+    with pytest.raises(TypeError):
+        Version('2023') < 2023
+
+
+def test_components():
+    '''Parse components as LooseVersion does.'''
+    version = Version('13.2v10')
+
+    assert version.version == (13, 2, 'v', 10)
+    assert version.vstring == '13.2v10'
+    assert str(version) == '13.2v10'
+    assert repr(version) == "Version('13.2v10')"
@@ -0,0 +1,152 @@
+# :coding: utf-8
+# :copyright: Copyright (c) 2023 ftrack
+
+import os
+import sys
+import queue
+
+import pytest
+
+from ftrack_application_launcher.cache import stat_directory
+from ftrack_application_launcher.watcher import (
+    InotifyWatcher,
+    PollingWatcher,
+    create_watcher,
+)
+
+
+def change_directory(path):
+    '''Move modification time of directory at *path* forward.'''
+    result = os.stat(path)
+    os.utime(path, ns=(result.st_atime_ns, result.st_mtime_ns + 10**9))
+
+
+@pytest.fixture()
+def directories(tmp_path):
+    '''Return two watched directories.'''
+    paths = [str(tmp_path / 'first'), str(tmp_path / 'second')]
+    for path in paths:
+        os.makedirs(path)
+
+    return paths
+
+
+@pytest.fixture()
+def inotify_watcher():
+    '''Return factory of inotify watchers stopped after the test.'''
+    if not sys.platform.startswith('linux'):
+        pytest.skip('Inotify is only available on Linux.')
+
+    watchers = []
+
+    def factory(callback, **kwargs):
+        try:
+            watcher = InotifyWatcher(callback, **kwargs)
+        except (OSError, AttributeError) as error:
+            pytest.skip('Inotify not available: {}'.format(error))
+
+        watchers.append(watcher)
+        return watcher
+
+    yield factory
+
+    for watcher in watchers:
+        watcher.stop()
+
+
+def watch(watcher, paths):
+    '''Make *watcher* watch *paths* in their current state.'''
+    watcher.set_paths(dict((path, stat_directory(path)) for path in paths))
+
+
+def test_poll_changed_directories(directories):
+    '''Report directories whose signature changed since last checked.'''
+    watcher = PollingWatcher(lambda changed: None)
+    watch(watcher, directories)
+
+    assert watcher._poll() == set()
+
+    change_directory(directories[0])
+
+    assert watcher._poll() == set([directories[0]])
+    assert watcher._poll() == set()
+
+
+def test_report_directories_changed_before_watched(directories):
+    '''Report directories changed since the signature given.'''
+    watcher = PollingWatcher(lambda changed: None)
+    watcher.set_paths({directories[0]: None, directories[1]: None})
+
+    assert watcher._poll() == set(directories)
+
+
+def test_stop_watching_removed_paths(directories):
+    '''Stop checking directories no longer listed.'''
+    watcher = PollingWatcher(lambda changed: None)
+    watch(watcher, directories)
+    watch(watcher, directories[1:])
+
+    change_directory(directories[0])
+
+    assert watcher._poll() == set()
+
+
+def test_polling_thread(directories):
+    '''Call back with changed directories from the watcher thread.'''
+    changes = queue.Queue()
+    watcher = PollingWatcher(changes.put, interval=0.01)
+    watch(watcher, directories[:1])
+    watcher.start()
+
+    try:
+        change_directory(directories[0])
+        assert changes.get(timeout=5) == set([directories[0]])
+    finally:
+        watcher.stop()
+
+    with pytest.raises(RuntimeError):
+        watcher.start()
+
+
+def test_inotify_reports_new_entries(directories, inotify_watcher):
+    '''Report directories receiving new entries once settled.'''
+    changes = queue.Queue()
+    watcher = inotify_watcher(changes.put, interval=60, settle_delay=0.01)
+    watch(watcher, directories)
+    watcher.start()
+
+    os.makedirs(os.path.join(directories[1], 'Maya2025'))
+
+    assert changes.get(timeout=5) == set([directories[1]])
+
+
+def test_inotify_reports_removed_directory(directories, inotify_watcher):
+    '''Report watched directories which were removed.'''
+    changes = queue.Queue()
+    watcher = inotify_watcher(changes.put, interval=60, settle_delay=0.01)
+    watch(watcher, directories[:1])
+    watcher.start()
+
+    os.rmdir(directories[0])
+
+    assert directories[0] in changes.get(timeout=5)
+
+
+def test_inotify_closed_when_stopped(inotify_watcher):
+    '''Close the inotify descriptor of watchers never started.'''
+    watcher = inotify_watcher(lambda changed: None)
+    assert watcher._fd is not None
+
+    watcher.stop()
+
+    assert watcher._fd is None
+
+
+def test_create_watcher():
+    '''Return a watcher whatever the platform.'''
+    watcher = create_watcher(lambda changed: None)
+
+    try:
+        assert isinstance(watcher, PollingWatcher)
+    finally:
+        watcher.stop()